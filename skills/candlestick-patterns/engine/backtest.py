@@ -0,0 +1,166 @@
+"""Forward-return backtests of the pattern detectors (NumPy, no per-bar loops).
+
+For every detection and horizon N the outcome is measured from the
+close of the completing bar: the N-bar return, the best move in the
+pattern's direction (excursion) and the worst move against it
+(drawdown), both over the next N bars' highs and lows. Bearish patterns
+are scored short, so a positive return always means the signal worked;
+neutral patterns report raw returns and no hit rate.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .scanner import PATTERNS, detect
+
+DEFAULT_HORIZONS = (1, 5, 10)
+# Horizon whose hit rate sets the measured grade
+GRADE_HORIZON = 5
+# (grade, minimum hit rate), best first; anything lower grades "low"
+GRADE_HIT_RATES = (("high", 0.6), ("medium", 0.5))
+# Fewer samples than this at the grade horizon leave the grade empty
+MIN_SAMPLES = 30
+
+_DIRECTION = {"bullish": 1.0, "bearish": -1.0, "neutral": 0.0}
+
+
+def _lead(a: np.ndarray, k: int) -> np.ndarray:
+    """``a`` advanced by k bars; the last k slots are NaN."""
+    if k >= len(a):
+        return np.full_like(a, np.nan)
+    out = np.empty_like(a)
+    out[len(a) - k:] = np.nan
+    out[:len(a) - k] = a[k:]
+    return out
+
+
+def _forward(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+             horizons: Sequence[int]) -> Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Per horizon: (close N bars ahead, max high and min low over the next N bars).
+
+    The running max/min advance one lag at a time up to the longest
+    horizon, so the cost is O(bars x max horizon) in vectorized passes.
+    """
+    out = {}
+    run_high = np.full_like(high, -np.inf)
+    run_low = np.full_like(low, np.inf)
+    for k in range(1, max(horizons) + 1):
+        run_high = np.fmax(run_high, _lead(high, k))
+        run_low = np.fmin(run_low, _lead(low, k))
+        if k in horizons:
+            ahead = _lead(close, k)
+            # Past the end of the data: no outcome (NaN), even if some highs were seen
+            valid = ~np.isnan(ahead)
+            out[k] = (ahead, np.where(valid, run_high, np.nan), np.where(valid, run_low, np.nan))
+    return out
+
+
+class Accumulator:
+    """Running sums per (pattern, horizon), merged across datasets."""
+
+    def __init__(self, horizons: Sequence[int] = DEFAULT_HORIZONS,
+                 patterns: Optional[Iterable[str]] = None):
+        self.horizons = sorted(set(horizons))
+        self.patterns = list(PATTERNS) if patterns is None else list(patterns)
+        self.datasets = 0
+        self.bars = 0
+        self._sums = {(slug, n): np.zeros(6) for slug in self.patterns for n in self.horizons}
+        self._worst = {(slug, n): np.inf for slug in self.patterns for n in self.horizons}
+
+    def add(self, open_: Sequence[float], high: Sequence[float], low: Sequence[float],
+            close: Sequence[float], min_strength: float = 0.0) -> None:
+        """Detect patterns in one OHLC series and add their outcomes."""
+        o, h, l, c = (np.ascontiguousarray(a, dtype=np.float64) for a in (open_, high, low, close))
+        self.datasets += 1
+        self.bars += len(c)
+        if not len(c):
+            return
+        results = detect(o, h, l, c, self.patterns)
+        forward = _forward(h, l, c, self.horizons)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for slug in self.patterns:
+                mask, strength = results[slug]
+                hits = np.flatnonzero(mask & (strength >= min_strength))
+                direction = _DIRECTION[PATTERNS[slug][1]]
+                entry = c[hits]
+                for n in self.horizons:
+                    ahead, top, bottom = (a[hits] for a in forward[n])
+                    ok = ~np.isnan(ahead) & (entry > 0)
+                    ret = ahead[ok] / entry[ok] - 1
+                    up = top[ok] / entry[ok] - 1
+                    down = bottom[ok] / entry[ok] - 1
+                    if direction < 0:
+                        ret, up, down = -ret, -down, -up
+                    sums = self._sums[(slug, n)]
+                    sums += (ret.size, np.count_nonzero(ret > 0), ret.sum(),
+                             np.abs(ret).sum(), up.sum(), down.sum())
+                    if down.size:
+                        self._worst[(slug, n)] = min(self._worst[(slug, n)], float(down.min()))
+
+    def results(self, grade_horizon: int = GRADE_HORIZON) -> Dict[str, Dict[str, Any]]:
+        """Per pattern slug: grade plus hit rate, mean return/excursion/drawdown per horizon."""
+        out: Dict[str, Dict[str, Any]] = {}
+        for slug in self.patterns:
+            signal = PATTERNS[slug][1]
+            per_horizon: Dict[str, Any] = {}
+            for n in self.horizons:
+                count, wins, ret, abs_ret, up, down = self._sums[(slug, n)].tolist()
+                samples = int(count)
+                if not samples:
+                    per_horizon[str(n)] = {"samples": 0}
+                    continue
+                per_horizon[str(n)] = {
+                    "samples": samples,
+                    "hit_rate": round(wins / samples, 4) if signal != "neutral" else None,
+                    "mean_return": round(ret / samples, 6),
+                    "mean_abs_return": round(abs_ret / samples, 6),
+                    "mean_excursion": round(up / samples, 6),
+                    "mean_drawdown": round(down / samples, 6),
+                    "worst_drawdown": round(self._worst[(slug, n)], 6),
+                }
+            graded = per_horizon.get(str(grade_horizon), {})
+            out[slug] = {
+                "signal": signal,
+                "grade": _grade(graded) if signal != "neutral" else "",
+                "grade_horizon": grade_horizon,
+                "horizons": per_horizon,
+            }
+        return out
+
+
+def _grade(stats: Dict[str, Any]) -> str:
+    if stats.get("samples", 0) < MIN_SAMPLES:
+        return ""
+    for grade, floor in GRADE_HIT_RATES:
+        if stats["hit_rate"] >= floor:
+            return grade
+    return "low"
+
+
+def reliability_report(acc: Accumulator, pattern_ids: Dict[str, Optional[str]],
+                       grade_horizon: int = GRADE_HORIZON) -> Dict[str, Any]:
+    """The data/reliability.json document: measured stats keyed by ``pat/`` ID.
+
+    Detector slugs with no documented pattern are listed under
+    ``undocumented`` instead.
+    """
+    measured: Dict[str, Any] = {}
+    undocumented: List[str] = []
+    for slug, stats in acc.results(grade_horizon).items():
+        pid = pattern_ids.get(slug)
+        if pid is None:
+            undocumented.append(slug)
+            continue
+        measured[pid] = dict(stats, detector=slug)
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "datasets": acc.datasets,
+        "bars": acc.bars,
+        "horizons": acc.horizons,
+        "grade_horizon": grade_horizon,
+        "patterns": measured,
+        "undocumented": undocumented,
+    }
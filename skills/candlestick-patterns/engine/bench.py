@@ -0,0 +1,369 @@
+"""Synthetic chapter corpus, engine timings and baseline comparison."""
+from __future__ import annotations
+
+import json
+import math
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from .indexer import _index_file, build_index, check_index_freshness, source_files
+
+# Corpus multiples of the shipped data/raw (1x = same file count and size)
+DEFAULT_SCALES = (1, 10)
+# A percentile regresses when it is this much slower than the baseline...
+DEFAULT_TOLERANCE = 0.25
+# ...and at least this many ms slower (sub-ms jitter never fails a run)
+NOISE_FLOOR_MS = 0.5
+COMPARED_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+# Entries extracted per pass (spread evenly over the index)
+EXTRACT_SAMPLE = 200
+# Single-chapter sizes (MB) for the parse benchmark
+PARSE_SIZES = (1, 4)
+# Synthetic bars per scan pass
+SCAN_BARS = 1_000_000
+# Bars fed through the streaming detector (latency is compared early vs late)
+STREAM_BARS = 20_000
+STREAM_SAMPLE = 1_000
+
+DEFAULT_QUERIES = ("hammer", "engulfing", "morning star", "doji", "pin bar entry", "volume")
+MCP_CALLS = (
+    ("candle_search", {"query": "engulfing"}),
+    ("candle_get_pattern", {"name": "hammer"}),
+    ("candle_list_patterns", {}),
+    ("candle_index_status", {}),
+)
+
+_PATTERNS = (
+    "Hammer", "Hanging Man", "Inverted Hammer", "Shooting Star", "Bullish Engulfing",
+    "Bearish Engulfing", "Morning Star", "Evening Star", "Piercing Line", "Dark Cloud Cover",
+    "Dragonfly Doji", "Gravestone Doji", "Spinning Top", "Bullish Harami", "Tweezer Top",
+    "Three White Soldiers", "Three Black Crows", "Rising Three Methods", "Pin Bar", "Inside Bar",
+)
+_WORDS = (
+    "candle", "body", "shadow", "trend", "support", "resistance", "volume", "close",
+    "open", "reversal", "continuation", "confirmation", "gap", "range", "momentum",
+    "bullish", "bearish", "session", "stop", "target",
+)
+_ENTRY_KINDS = ("sections", "patterns", "strategies", "examples")
+_CHAPTERS = ("nison_ch{:02d}-reversal-patterns", "bible_strategies_{:02d}", "web_patterns_{:02d}")
+
+
+def _prose(rng: random.Random, sentences: int) -> str:
+    return " ".join(" ".join(rng.choices(_WORDS, k=rng.randint(8, 16))).capitalize() + "."
+                    for _ in range(sentences))
+
+
+def _chapter(rng: random.Random, number: int, target_bytes: int) -> str:
+    """One OCR-style chapter: pattern, strategy and code sections."""
+    parts = [f"# Chapter {number}: {rng.choice(_WORDS).title()} Signals\n\n{_prose(rng, 4)}\n"]
+    size = len(parts[0])
+    while size < target_bytes:
+        pattern = rng.choice(_PATTERNS)
+        chunk = [
+            f"\n## {pattern}\n\n{_prose(rng, rng.randint(3, 8))}\n\n",
+            f"### {pattern} Entry Strategy\n\n{_prose(rng, rng.randint(2, 5))}\n\n",
+        ]
+        if rng.random() < 0.4:
+            chunk.append(
+                "```pine\n//@version=5\n"
+                f"indicator(\"{pattern}\", overlay=true)\n"
+                "body = math.abs(close - open)\n"
+                "plotshape(body < (high - low) * 0.3, style=shape.triangleup)\n```\n"
+            )
+        text = "".join(chunk)
+        parts.append(text)
+        size += len(text)
+    return "".join(parts)
+
+
+def _corpus_dir(root: Path) -> Path:
+    """Where build_index reads a corpus rooted at ``root`` (skill layout)."""
+    return root / "data" / "raw"
+
+
+def generate_corpus(root: Path, scale: int, shipped_dir: Path,
+                    seed: int = 0) -> Dict[str, int]:
+    """Write ``scale`` times the shipped chapter count/bytes under root/data/raw."""
+    shipped = source_files(shipped_dir)
+    files = max(len(shipped), 1) * scale
+    per_file = (sum(p.stat().st_size for p in shipped) // max(len(shipped), 1)) or 20_000
+    rng = random.Random(seed)
+    out_dir = _corpus_dir(root)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    total = 0
+    for i in range(files):
+        name = _CHAPTERS[i % len(_CHAPTERS)].format(i) + ".md"
+        data = _chapter(rng, i + 1, per_file).encode("utf-8")
+        (out_dir / name).write_bytes(data)
+        total += len(data)
+    return {"files": files, "bytes": total}
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, Any]:
+    """Nearest-rank p50/p95/p99 and mean, in ms, of timings in seconds."""
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return round(ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)] * 1000, 3)
+
+    return {
+        "n": len(ordered),
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+    }
+
+
+def _sample_ids(index_data: Dict[str, Any]) -> List[str]:
+    ids = [key for name in _ENTRY_KINDS for key in index_data.get(name, {})]
+    step = max(len(ids) // EXTRACT_SAMPLE, 1)
+    return ids[::step][:EXTRACT_SAMPLE]
+
+
+def bench_corpus(root: Path, repeat: int = 3,
+                 queries: Sequence[str] = DEFAULT_QUERIES) -> Dict[str, Any]:
+    """Time build_index, check_index, search and extraction over one corpus."""
+    from dataclasses import asdict
+
+    from .extractor import Extractor
+    from .searcher import Searcher
+
+    corpus_dir = _corpus_dir(root)
+    built: Dict[str, Any] = {}
+
+    def _build() -> None:
+        built["index"] = build_index(corpus_dir)
+
+    timings: Dict[str, Any] = {"build_index": summarize(_time(_build, repeat))}
+    index = built["index"]
+    timings["check_index"] = summarize(
+        _time(lambda: check_index_freshness(index, corpus_dir), repeat))
+
+    index_data = asdict(index)
+    searcher = Searcher(index_data)
+    timings["search_cold"] = summarize([_time(lambda: searcher.search(q), 1)[0] for q in queries])
+    timings["search_warm"] = summarize(
+        [t for q in queries for t in _time(lambda: searcher.search(q), repeat)])
+
+    extractor = Extractor(index_data, root)
+    ids = _sample_ids(index_data)
+    misses, cold = 0, []
+    for entry_id in ids:
+        start = time.perf_counter()
+        misses += extractor.extract(entry_id) is None
+        cold.append(time.perf_counter() - start)
+    timings["extract_cold"] = summarize(cold)
+    timings["extract_warm"] = summarize(
+        [t for i in ids * max(repeat, 1) for t in _time(lambda: extractor.extract(i), 1)])
+    entries = sum(len(index_data.get(name, {})) for name in _ENTRY_KINDS)
+    return {"entries": entries, "extract_misses": misses, "timings": timings}
+
+
+def bench_mcp_roundtrips(skill_dir: Path, calls: Sequence[Tuple[str, Dict[str, Any]]] = MCP_CALLS,
+                         repeat: int = 3) -> Dict[str, Any]:
+    """Time one-at-a-time tools/call round trips through ``engine serve``."""
+    # Round trips go to a throwaway token log, not the user's usage stats
+    log_dir = tempfile.TemporaryDirectory()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "engine", "serve", "--watch-interval", "0",
+         "--log-path", str(Path(log_dir.name) / "token_log.jsonl")],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        text=True, bufsize=1, cwd=str(skill_dir),
+    )
+    req_id = 0
+
+    def _request(method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        nonlocal req_id
+        req_id += 1
+        proc.stdin.write(json.dumps({"jsonrpc": "2.0", "id": req_id,
+                                     "method": method, "params": params}) + "\n")
+        proc.stdin.flush()
+        return json.loads(proc.stdout.readline())
+
+    try:
+        _request("initialize", {})
+        timings = {}
+        errors = 0
+        for tool, arguments in calls:
+            samples = []
+            for _ in range(max(repeat, 1)):
+                start = time.perf_counter()
+                resp = _request("tools/call", {"name": tool, "arguments": arguments})
+                samples.append(time.perf_counter() - start)
+                errors += "error" in resp or bool(resp.get("result", {}).get("isError"))
+            timings[tool] = summarize(samples)
+    finally:
+        proc.stdin.close()
+        proc.wait(timeout=10)
+        log_dir.cleanup()
+    return {"errors": errors, "timings": timings}
+
+
+def run_suite(skill_dir: Path, scales: Sequence[int] = DEFAULT_SCALES, repeat: int = 3,
+              mcp: bool = True, seed: int = 0) -> Dict[str, Any]:
+    """Every benchmark at each corpus scale, plus MCP round trips on the real index.
+
+    The MCP server always serves the skill's own data/, so its timings
+    are taken once rather than per scale.
+    """
+    result: Dict[str, Any] = {"engine": skill_dir.name, "repeat": repeat,
+                              "corpora": {}, "timings": {}}
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            corpus = generate_corpus(root, scale, _corpus_dir(skill_dir), seed=seed)
+            measured = bench_corpus(root, repeat)
+        result["corpora"][f"{scale}x"] = dict(corpus, entries=measured["entries"],
+                                              extract_misses=measured["extract_misses"])
+        result["timings"][f"{scale}x"] = measured["timings"]
+    if mcp:
+        measured = bench_mcp_roundtrips(skill_dir, repeat=repeat)
+        result["mcp_errors"] = measured["errors"]
+        result["timings"]["mcp"] = measured["timings"]
+    return result
+
+
+def bench_parse(sizes: Sequence[float] = PARSE_SIZES, repeat: int = 3,
+                seed: int = 0) -> Dict[str, Any]:
+    """Time indexing one large chapter per size; flat ``ms_per_mb`` means linear parsing.
+
+    Each chapter opens with a non-ASCII heading, so offsets go through
+    the byte offset table rather than the ASCII shortcut.
+    """
+    rng = random.Random(seed)
+    result: Dict[str, Any] = {"engine": "candlestick-patterns", "target": "parse",
+                              "repeat": repeat, "documents": {}, "timings": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_dir = _corpus_dir(Path(tmp))
+        raw_dir.mkdir(parents=True)
+        for mb in sizes:
+            path = raw_dir / f"nison_ch01-{mb:g}mb.md"
+            text = "# ローソク足 (Candlestick) Charts\n\n" + _chapter(rng, 1, int(mb * 2**20))
+            path.write_text(text, encoding="utf-8")
+            parsed: Dict[str, Any] = {}
+            timing = summarize(_time(lambda: parsed.update(_index_file(path, raw_dir)), repeat))
+            size = path.stat().st_size
+            result["documents"][f"{mb:g}mb"] = {
+                "bytes": size,
+                "entries": sum(len(entries) for entries in parsed.values()),
+                "ms_per_mb": round(timing["p50_ms"] / (size / 2**20), 3),
+            }
+            result["timings"][f"{mb:g}mb"] = {"index_file": timing}
+    return result
+
+
+def synthetic_bars(n: int, seed: int = 0) -> Dict[str, Any]:
+    """Random-walk OHLCV bars (NumPy arrays) with realistic wicks and gaps."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.concatenate(([close[0]], close[:-1])) * (1 + rng.normal(0, 0.002, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.004, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.004, n)))
+    volume = rng.lognormal(10, 0.5, n)
+    return {"open": open_, "high": high, "low": low, "close": close, "volume": volume}
+
+
+def bench_scan(bars: int = SCAN_BARS, repeat: int = 3, seed: int = 0) -> Dict[str, Any]:
+    """Time scanner.detect over every pattern; throughput is bars per second at p50."""
+    from .scanner import PATTERNS, detect
+
+    data = synthetic_bars(bars, seed)
+    found: Dict[str, int] = {}
+
+    def _scan() -> None:
+        results = detect(data["open"], data["high"], data["low"], data["close"])
+        found.update({slug: int(mask.sum()) for slug, (mask, _) in results.items()})
+
+    timing = summarize(_time(_scan, repeat))
+    return {
+        "engine": "candlestick-patterns",
+        "target": "scan",
+        "repeat": repeat,
+        "bars": bars,
+        "patterns": len(PATTERNS),
+        "bars_per_sec": round(bars / max(timing["p50_ms"] / 1000, 1e-9)),
+        "detections": found,
+        "timings": {"scan": timing},
+    }
+
+
+def bench_stream(bars: int = STREAM_BARS, seed: int = 0) -> Dict[str, Any]:
+    """Per-bar StreamDetector latency early vs late in the feed, plus batch agreement.
+
+    Flat latency between the first and last STREAM_SAMPLE bars shows the
+    cost does not grow with history; ``agrees_with_batch`` replays the
+    same bars through scanner.scan and compares every detection.
+    """
+    from .scanner import scan
+    from .stream import StreamDetector
+
+    index_data = json.loads((Path(__file__).resolve().parent.parent / "data" / "index.json")
+                             .read_text(encoding="utf-8"))
+    data = synthetic_bars(bars, seed)
+    rows = [dict(zip(data, values)) for values in zip(*(data[k].tolist() for k in data))]
+    detector = StreamDetector(index_data)
+    streamed: List[Dict[str, Any]] = []
+    latencies = []
+    for row in rows:
+        start = time.perf_counter()
+        streamed.extend(detector.update(row))
+        latencies.append(time.perf_counter() - start)
+    batch = scan(data, index_data, limit=len(streamed) + 1)["detections"]
+    sample = min(STREAM_SAMPLE, bars // 2)
+    return {
+        "engine": "candlestick-patterns",
+        "target": "stream",
+        "bars": bars,
+        "detections": len(streamed),
+        "agrees_with_batch": streamed == batch,
+        "timings": {
+            "first_bars": summarize(latencies[:sample]),
+            "last_bars": summarize(latencies[-sample:]),
+        },
+    }
+
+
+def compare_to_baseline(result: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float = DEFAULT_TOLERANCE) -> List[Dict[str, Any]]:
+    """Percentiles in ``result`` slower than the same metric in ``baseline``.
+
+    Metrics missing from either side (a scale or tool not in both runs)
+    are skipped rather than treated as regressions.
+    """
+    regressions: List[Dict[str, Any]] = []
+
+    def walk(current: Dict[str, Any], reference: Dict[str, Any], path: str) -> None:
+        for key, value in current.items():
+            if key not in reference:
+                continue
+            ref = reference[key]
+            if isinstance(value, dict) and isinstance(ref, dict):
+                walk(value, ref, f"{path}.{key}" if path else key)
+            elif key in COMPARED_KEYS and value > ref * (1 + tolerance) \
+                    and value - ref >= NOISE_FLOOR_MS:
+                regressions.append({
+                    "metric": f"{path}.{key}",
+                    "baseline_ms": ref,
+                    "current_ms": value,
+                    "ratio": round(value / max(ref, 1e-9), 2),
+                })
+
+    walk(result.get("timings", {}), baseline.get("timings", {}), "")
+    return regressions
@@ -0,0 +1,177 @@
+"""Multi-symbol pattern scans over a directory of per-symbol bar files.
+
+Each ``<SYMBOL>.csv`` is parsed once into a (5, bars) float64 array
+(open, high, low, close, volume; volume NaN when absent) and cached as
+``.npy``; later runs memory-map the cache instead of re-parsing. Files
+are scanned in a process pool, largest first, and each worker's
+detections are appended to one CSV table as they arrive.
+"""
+from __future__ import annotations
+
+import csv
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .scanner import PATTERNS, PRICE_COLUMNS, check_patterns, detect, load_csv, volume_ratio
+
+TABLE_COLUMNS = ("symbol", "bar", "time", "pattern", "pattern_id", "signal", "strength",
+                 "volume_ratio")
+# Scans queued per worker; bounds the results held in memory at once
+QUEUE_PER_WORKER = 2
+
+
+def bar_files(bars_dir: Path) -> List[Path]:
+    """Per-symbol CSVs in ``bars_dir``, largest first (longest jobs start earliest)."""
+    return sorted(bars_dir.glob("*.csv"), key=lambda p: (-p.stat().st_size, p.name))
+
+
+def _cache_paths(path: Path, cache_dir: Path) -> Tuple[Path, Path]:
+    """Cache files for ``path``; size and mtime in the name make edits miss."""
+    st = path.stat()
+    key = f"{path.stem}-{st.st_size}-{st.st_mtime_ns}"
+    return cache_dir / f"{key}.npy", cache_dir / f"{key}.time.npy"
+
+
+def load_bars(path: Path, cache_dir: Optional[Path] = None) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """(5, bars) OHLCV array and time labels for one CSV, via the .npy cache.
+
+    A cache hit is memory-mapped read-only; on a miss the CSV is parsed,
+    written to the cache (older caches of the same symbol are removed)
+    and returned.
+    """
+    if cache_dir is not None:
+        data_path, time_path = _cache_paths(path, cache_dir)
+        if data_path.exists():
+            times = np.load(time_path, mmap_mode="r") if time_path.exists() else None
+            return np.load(data_path, mmap_mode="r"), times
+
+    parsed = load_csv(path)
+    n = len(parsed["close"])
+    data = np.empty((5, n), dtype=np.float64)
+    for row, name in enumerate(PRICE_COLUMNS):
+        data[row] = parsed[name]
+    data[4] = parsed["volume"] if parsed["volume"] is not None else np.nan
+    times = np.array(parsed["time"], dtype=str) if parsed["time"] is not None else None
+
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for stale in cache_dir.glob(f"{path.stem}-*.npy"):
+            if stale.name.rsplit("-", 2)[0] == path.stem:
+                stale.unlink(missing_ok=True)
+        # Write then rename, so a concurrent reader never maps a partial file
+        tmp = data_path.with_suffix(".tmp.npy")
+        np.save(tmp, data)
+        if times is not None:
+            np.save(time_path.with_suffix(".tmp.npy"), times)
+            os.replace(time_path.with_suffix(".tmp.npy"), time_path)
+        os.replace(tmp, data_path)
+    return data, times
+
+
+def _scan_file(path: Path, cache_dir: Optional[Path], patterns: Optional[List[str]],
+               min_strength: float) -> Dict[str, Any]:
+    """Worker: detections of one symbol as compact rows (bar, time, slug, strength, ratio)."""
+    try:
+        data, times = load_bars(path, cache_dir)
+        results = detect(data[0], data[1], data[2], data[3], patterns)
+    except (OSError, ValueError, csv.Error) as e:
+        # A bad file is reported; anything else is an engine bug and propagates
+        return {"symbol": path.stem, "error": str(e)}
+    ratios = volume_ratio(np.asarray(data[4]))
+
+    rows: List[Tuple[Any, ...]] = []
+    counts: Dict[str, int] = {}
+    for slug, (mask, strength) in results.items():
+        hits = np.flatnonzero(mask & (strength >= min_strength))
+        counts[slug] = int(hits.size)
+        for bar, s, r in zip(hits.tolist(), strength[hits].tolist(), ratios[hits].tolist()):
+            rows.append((bar, str(times[bar]) if times is not None else "", slug,
+                         round(s, 3), "" if r != r else round(r, 2)))
+    rows.sort(key=lambda row: row[0])
+    return {"symbol": path.stem, "bars": int(data.shape[1]), "counts": counts, "rows": rows}
+
+
+def scan_directory(bars_dir: Path, index_data: Dict[str, Any], out_path: Path,
+                   cache_dir: Optional[Path] = None, jobs: int = 1,
+                   patterns: Optional[Iterable[str]] = None,
+                   min_strength: float = 0.0) -> Dict[str, Any]:
+    """Scan every ``*.csv`` in ``bars_dir``; detections go to the CSV at ``out_path``.
+
+    Returns per-pattern frequency statistics over all symbols, the
+    symbols that failed to parse, and throughput. With ``jobs`` > 1
+    (0 = one per CPU) files are scanned in a process pool; at most
+    QUEUE_PER_WORKER scans per worker are queued, so memory is bounded
+    by a few symbols' detections rather than the whole run.
+    """
+    from .scanner import pattern_ids
+
+    selected = list(PATTERNS) if patterns is None else list(patterns)
+    check_patterns(selected)
+    ids = pattern_ids(index_data)
+    files = bar_files(bars_dir)
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    workers = max(1, min(jobs, len(files)))
+
+    start = time.perf_counter()
+    totals = {slug: {"count": 0, "symbols": 0} for slug in selected}
+    summary: Dict[str, Any] = {"files": len(files), "symbols": 0, "bars": 0, "detections": 0,
+                               "errors": []}
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        writer.writerow(TABLE_COLUMNS)
+
+        def consume(result: Dict[str, Any]) -> None:
+            if "error" in result:
+                summary["errors"].append({"symbol": result["symbol"], "error": result["error"]})
+                return
+            symbol = result["symbol"]
+            summary["symbols"] += 1
+            summary["bars"] += result["bars"]
+            summary["detections"] += len(result["rows"])
+            for slug, count in result["counts"].items():
+                totals[slug]["count"] += count
+                totals[slug]["symbols"] += count > 0
+            writer.writerows((symbol, bar, label, slug, ids[slug], PATTERNS[slug][1], s, r)
+                             for bar, label, slug, s, r in result["rows"])
+
+        if workers == 1:
+            for path in files:
+                consume(_scan_file(path, cache_dir, selected, min_strength))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                queue = iter(files)
+                pending: Set[Future] = set()
+                while True:
+                    for path in queue:
+                        pending.add(pool.submit(_scan_file, path, cache_dir, selected,
+                                                min_strength))
+                        if len(pending) >= workers * QUEUE_PER_WORKER:
+                            break
+                    if not pending:
+                        break
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        consume(future.result())
+
+    elapsed = time.perf_counter() - start
+    bars = summary["bars"]
+    summary["patterns"] = {
+        slug: {
+            "pattern_id": ids[slug],
+            "signal": PATTERNS[slug][1],
+            "count": t["count"],
+            "symbols": t["symbols"],
+            "per_10k_bars": round(t["count"] * 10_000 / bars, 2) if bars else 0.0,
+        }
+        for slug, t in totals.items()
+    }
+    summary.update({"output": str(out_path), "jobs": workers, "elapsed_s": round(elapsed, 3),
+                    "bars_per_sec": round(bars / elapsed) if elapsed > 0 else 0})
+    return summary
@@ -12,6 +12,8 @@ DATA_DIR = SKILL_DIR / "data"
 RAW_DIR = DATA_DIR / "raw"
 INDEX_PATH = DATA_DIR / "index.json"
 LOG_PATH = DATA_DIR / "token_log.jsonl"
+BAR_CACHE_DIR = DATA_DIR / "bar_cache"
+RELIABILITY_PATH = DATA_DIR / "reliability.json"
 
 
 def _out(data: Any) -> None:
@@ -24,9 +26,10 @@ def _load_index(command: str = "unknown") -> Dict[str, Any]:
         _out({"status": "error", "command": command,
               "error": "Index not found. Run: python3 -m engine build-index"})
         sys.exit(2)
+    from .compact import load_index
     try:
-        with open(INDEX_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
+        # Lazy view over data/index.bin when it mirrors index.json
+        return load_index(INDEX_PATH)
     except json.JSONDecodeError as e:
         _out({"status": "error", "command": command,
               "error": f"Corrupt index JSON: {e}. Run: python3 -m engine build-index"})
@@ -49,7 +52,7 @@ def cmd_build_index(args: argparse.Namespace) -> None:
         _out({"status": "error", "command": "build-index",
               "error": f"No markdown files in {RAW_DIR}. Add .md files to data/raw/ first."})
         sys.exit(2)
-    idx = build_index(RAW_DIR)
+    idx = build_index(RAW_DIR, jobs=args.jobs)
     idx.save(INDEX_PATH)
     _out({
         "status": "ok",
@@ -145,6 +148,8 @@ def cmd_list_patterns(args: argparse.Namespace) -> None:
         signal=args.signal,
         pattern_type=args.type,
         category=args.pat_category,
+        measured=args.measured,
+        min_hit_rate=args.min_hit_rate,
     )
     _out({
         "status": "ok",
@@ -211,10 +216,199 @@ def cmd_token_report(args: argparse.Namespace) -> None:
     _out({"status": "ok", "command": "token-report", **report})
 
 
+def cmd_bench(args: argparse.Namespace) -> None:
+    """Time the engine on synthetic corpora, chapters or bars, optionally against a baseline."""
+    from .bench import compare_to_baseline, run_suite
+
+    if args.target == "parse":
+        from .bench import bench_parse
+        sizes = [float(mb) for mb in args.sizes.split(",") if mb.strip()]
+        result = bench_parse(sizes, repeat=args.repeat)
+    elif args.target in ("scan", "stream"):
+        _scanner("bench")
+        from .bench import SCAN_BARS, STREAM_BARS, bench_scan, bench_stream
+        if args.target == "scan":
+            result = bench_scan(args.bars or SCAN_BARS, repeat=args.repeat)
+        else:
+            result = bench_stream(args.bars or STREAM_BARS)
+    else:
+        scales = [int(s) for s in args.scales.split(",") if s.strip()]
+        result = run_suite(SKILL_DIR, scales=scales, repeat=args.repeat, mcp=not args.no_mcp)
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    regressions = []
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(result, baseline, args.tolerance)
+        result["regressions"] = regressions
+    misses = sum(c["extract_misses"] for c in result.get("corpora", {}).values())
+    ok = (not regressions and not misses and not result.get("mcp_errors")
+          and result.get("agrees_with_batch", True))
+    _out({"status": "ok" if ok else "error", "command": "bench", "result": result})
+    if not ok:
+        sys.exit(1)
+
+
+def _scanner(command: str):
+    """The NumPy-backed scanner module, or exit with an install hint."""
+    try:
+        from . import scanner
+    except ImportError:
+        _out({"status": "error", "command": command,
+              "error": "numpy is required for pattern scanning. Run: pip3 install numpy"})
+        sys.exit(2)
+    return scanner
+
+
+def cmd_scan(args: argparse.Namespace) -> None:
+    """Detect candlestick patterns in an OHLC(V) CSV file."""
+    scanner = _scanner("scan")
+    index_data = _load_index("scan")
+    patterns = [p.strip() for p in args.patterns.split(",") if p.strip()] if args.patterns else None
+    try:
+        bars = scanner.load_csv(Path(args.csv))
+        result = scanner.scan(bars, index_data, patterns=patterns,
+                              min_strength=args.min_strength, limit=args.limit)
+    except (OSError, ValueError) as e:
+        _out({"status": "error", "command": "scan", "error": str(e)})
+        sys.exit(1)
+    _out({"status": "ok", "command": "scan", "csv": args.csv, **result})
+
+
+def cmd_scan_dir(args: argparse.Namespace) -> None:
+    """Scan every per-symbol CSV in a directory into one detections table."""
+    _scanner("scan-dir")
+    from .bulk import scan_directory
+
+    bars_dir = Path(args.directory)
+    if not bars_dir.is_dir():
+        _out({"status": "error", "command": "scan-dir", "error": f"Not a directory: {bars_dir}"})
+        sys.exit(2)
+    index_data = _load_index("scan-dir")
+    patterns = [p.strip() for p in args.patterns.split(",") if p.strip()] if args.patterns else None
+    try:
+        result = scan_directory(bars_dir, index_data, Path(args.out),
+                                cache_dir=None if args.no_cache else Path(args.cache_dir),
+                                jobs=args.jobs, patterns=patterns,
+                                min_strength=args.min_strength)
+    except (OSError, ValueError) as e:
+        _out({"status": "error", "command": "scan-dir", "error": str(e)})
+        sys.exit(1)
+    _out({"status": "ok", "command": "scan-dir", **result})
+
+
+def cmd_stream(args: argparse.Namespace) -> None:
+    """Detect patterns bar by bar from JSON lines, one detection per output line."""
+    _scanner("stream")
+    from .stream import StreamDetector
+
+    index_data = _load_index("stream")
+    patterns = [p.strip() for p in args.patterns.split(",") if p.strip()] if args.patterns else None
+    try:
+        detector = StreamDetector(index_data, patterns, min_strength=args.min_strength)
+    except ValueError as e:
+        _out({"status": "error", "command": "stream", "error": str(e)})
+        sys.exit(1)
+
+    source = open(args.input, encoding="utf-8") if args.input else sys.stdin
+    try:
+        for line_no, line in enumerate(source, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                bar = {key.lower(): value for key, value in json.loads(line).items()}
+                hits = detector.update(bar)
+            except (json.JSONDecodeError, AttributeError, KeyError, TypeError, ValueError) as e:
+                # A bad bar is reported and skipped; the stream keeps going
+                hits = [{"status": "error", "command": "stream", "line": line_no,
+                         "error": f"Invalid bar: {e!r}"}]
+            for hit in hits:
+                sys.stdout.write(json.dumps(hit, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+def cmd_backtest(args: argparse.Namespace) -> None:
+    """Backtest the detectors on OHLC CSVs and store measured reliability in the index."""
+    _scanner("backtest")
+    from .backtest import Accumulator, reliability_report
+    from .bulk import bar_files, load_bars
+    from .indexer import apply_measured
+    from .scanner import check_patterns, pattern_ids
+    from .schema import Index
+
+    try:
+        horizons = sorted({int(h) for h in args.horizons.split(",") if h.strip()})
+    except ValueError:
+        horizons = []
+    if not horizons or horizons[0] < 1 or args.grade_horizon not in horizons:
+        _out({"status": "error", "command": "backtest",
+              "error": f"--horizons must be positive bar counts including --grade-horizon "
+                       f"{args.grade_horizon}; got {args.horizons!r}"})
+        sys.exit(2)
+    files = []
+    for path in map(Path, args.paths):
+        files.extend(bar_files(path) if path.is_dir() else [path])
+    if not files:
+        _out({"status": "error", "command": "backtest", "error": "No CSV files found"})
+        sys.exit(2)
+
+    index_data = _load_index("backtest")
+    patterns = [p.strip() for p in args.patterns.split(",") if p.strip()] if args.patterns else None
+    cache_dir = None if args.no_cache else Path(args.cache_dir)
+    errors = []
+    try:
+        if patterns is not None:
+            check_patterns(patterns)
+        acc = Accumulator(horizons, patterns)
+        for path in files:
+            try:
+                data, _ = load_bars(path, cache_dir)
+            except (OSError, ValueError) as e:
+                errors.append({"file": str(path), "error": str(e)})
+                continue
+            acc.add(data[0], data[1], data[2], data[3], min_strength=args.min_strength)
+    except ValueError as e:
+        _out({"status": "error", "command": "backtest", "error": str(e)})
+        sys.exit(1)
+
+    report = reliability_report(acc, pattern_ids(index_data), args.grade_horizon)
+    written = None
+    if not args.dry_run:
+        RELIABILITY_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        idx = Index.load(INDEX_PATH)
+        written = apply_measured(idx.patterns, report)
+        idx.save(INDEX_PATH)
+
+    summary = {}
+    for pat_id, stats in report["patterns"].items():
+        graded = stats["horizons"][str(args.grade_horizon)]
+        summary[pat_id] = {"grade": stats["grade"], "samples": graded["samples"],
+                           "hit_rate": graded.get("hit_rate"),
+                           "mean_return": graded.get("mean_return")}
+    _out({
+        "status": "ok",
+        "command": "backtest",
+        "datasets": report["datasets"],
+        "bars": report["bars"],
+        "horizons": horizons,
+        "grade_horizon": args.grade_horizon,
+        "patterns": summary,
+        "undocumented": report["undocumented"],
+        "errors": errors,
+        "reliability_path": None if args.dry_run else str(RELIABILITY_PATH),
+        "index_patterns_measured": written,
+    })
+
+
 def cmd_serve(args: argparse.Namespace) -> None:
     """Start MCP stdio server."""
     from .mcp_server import run_server
-    run_server(SKILL_DIR, INDEX_PATH, LOG_PATH)
+    run_server(SKILL_DIR, INDEX_PATH, args.log_path, watch_interval=args.watch_interval,
+               search_cache_bytes=int(args.search_cache_mb * 1024 * 1024))
 
 
 # ---------------------------------------------------------------------------
@@ -229,7 +423,9 @@ def main() -> None:
     sub = parser.add_subparsers(dest="command", required=True)
 
     # build-index
-    sub.add_parser("build-index", help="Build search index from cached docs")
+    p = sub.add_parser("build-index", help="Build search index from cached docs")
+    p.add_argument("--jobs", type=int, default=1,
+                   help="Parse files in N worker processes (0 = one per CPU)")
 
     # check-index
     sub.add_parser("check-index", help="Check index freshness")
@@ -254,6 +450,10 @@ def main() -> None:
     p.add_argument("--signal", choices=["bullish", "bearish", "neutral"], help="Filter by signal")
     p.add_argument("--type", choices=["reversal", "continuation", "indecision"], help="Filter by type")
     p.add_argument("--pat-category", help="Filter by category (single-reversal, doji, etc.)")
+    p.add_argument("--measured", choices=["high", "medium", "low"],
+                   help="Filter by backtested reliability grade (see backtest)")
+    p.add_argument("--min-hit-rate", type=float, default=None,
+                   help="Minimum backtested hit rate (0-1) at the grade horizon")
 
     # list-strategies
     sub.add_parser("list-strategies", help="List all trading strategies")
@@ -269,8 +469,79 @@ def main() -> None:
     # token-report
     sub.add_parser("token-report", help="Show token usage report")
 
+    # scan
+    p = sub.add_parser("scan", help="Detect candlestick patterns in OHLC(V) bars (needs numpy)")
+    p.add_argument("csv", help="CSV with open,high,low,close[,volume][,date|time] header")
+    p.add_argument("--patterns", default=None,
+                   help="Comma-separated pattern slugs (default: all, e.g. hammer,morning-star)")
+    p.add_argument("--min-strength", type=float, default=0.0,
+                   help="Drop detections weaker than this (0-1)")
+    p.add_argument("--limit", type=int, default=50, help="Most recent detections to list")
+
+    # scan-dir
+    p = sub.add_parser("scan-dir", help="Scan a directory of per-symbol CSVs (needs numpy)")
+    p.add_argument("directory", help="Directory of <SYMBOL>.csv files (same columns as scan)")
+    p.add_argument("--out", default="detections.csv", help="Detections table to write (CSV)")
+    p.add_argument("--jobs", type=int, default=0,
+                   help="Worker processes (0 = one per CPU, 1 = serial)")
+    p.add_argument("--cache-dir", default=str(BAR_CACHE_DIR),
+                   help="Where parsed bars are cached as .npy (memory-mapped on reuse)")
+    p.add_argument("--no-cache", action="store_true", help="Always parse the CSVs")
+    p.add_argument("--patterns", default=None, help="Comma-separated pattern slugs (default: all)")
+    p.add_argument("--min-strength", type=float, default=0.0,
+                   help="Drop detections weaker than this (0-1)")
+
+    # stream
+    p = sub.add_parser("stream", help="Detect patterns as JSONL bars arrive on stdin (needs numpy)")
+    p.add_argument("--input", default=None, help="Read JSON lines from this file instead of stdin")
+    p.add_argument("--patterns", default=None, help="Comma-separated pattern slugs (default: all)")
+    p.add_argument("--min-strength", type=float, default=0.0,
+                   help="Drop detections weaker than this (0-1)")
+
+    # backtest
+    p = sub.add_parser("backtest",
+                       help="Measure pattern hit rates on OHLC CSVs into the index (needs numpy)")
+    p.add_argument("paths", nargs="+", help="CSV files or directories of <SYMBOL>.csv files")
+    p.add_argument("--horizons", default="1,5,10", help="Comma-separated forward bar counts")
+    p.add_argument("--grade-horizon", type=int, default=5,
+                   help="Horizon whose hit rate grades each pattern high/medium/low")
+    p.add_argument("--patterns", default=None, help="Comma-separated pattern slugs (default: all)")
+    p.add_argument("--min-strength", type=float, default=0.0,
+                   help="Ignore detections weaker than this (0-1)")
+    p.add_argument("--cache-dir", default=str(BAR_CACHE_DIR),
+                   help="Where parsed bars are cached as .npy (shared with scan-dir)")
+    p.add_argument("--no-cache", action="store_true", help="Always parse the CSVs")
+    p.add_argument("--dry-run", action="store_true",
+                   help="Report only; leave data/reliability.json and the index untouched")
+
+    # bench
+    p = sub.add_parser("bench", help="Time build/check/search/extract/MCP on synthetic corpora")
+    p.add_argument("--target", choices=["suite", "parse", "scan", "stream"], default="suite",
+                   help="suite: engine stages per corpus scale; parse: indexing one large "
+                        "chapter; scan: pattern detection throughput; stream: per-bar "
+                        "latency of the streaming detector")
+    p.add_argument("--sizes", default="1,4",
+                   help="parse: comma-separated chapter sizes in MB")
+    p.add_argument("--bars", type=int, default=None,
+                   help="scan/stream: synthetic bars (default 1,000,000 / 20,000)")
+    p.add_argument("--scales", default="1,10",
+                   help="Comma-separated corpus multiples of data/raw (e.g. 1,10,100)")
+    p.add_argument("--repeat", type=int, default=3, help="Samples per timing")
+    p.add_argument("--no-mcp", action="store_true", help="Skip MCP round trips")
+    p.add_argument("--baseline", default=None,
+                   help="Baseline JSON to compare against; exits 1 on regressions")
+    p.add_argument("--save-baseline", default=None, help="Write this run's result as JSON")
+    p.add_argument("--tolerance", type=float, default=0.25,
+                   help="Allowed slowdown vs the baseline (0.25 = 25%%)")
+
     # serve
-    sub.add_parser("serve", help="Start MCP stdio server")
+    p = sub.add_parser("serve", help="Start MCP stdio server")
+    p.add_argument("--watch-interval", type=float, default=2.0,
+                   help="Seconds between source change polls; 0 disables hot reload")
+    p.add_argument("--search-cache-mb", type=float, default=4.0,
+                   help="Memory cap for cached search results (default: 4; 0 disables)")
+    p.add_argument("--log-path", type=Path, default=LOG_PATH,
+                   help="Token usage log for tool calls (default: data/token_log.jsonl)")
 
     args = parser.parse_args()
 
@@ -285,6 +556,11 @@ def main() -> None:
         "list": cmd_list,
         "status": cmd_status,
         "token-report": cmd_token_report,
+        "scan": cmd_scan,
+        "scan-dir": cmd_scan_dir,
+        "stream": cmd_stream,
+        "backtest": cmd_backtest,
+        "bench": cmd_bench,
         "serve": cmd_serve,
     }
 
@@ -129,6 +129,7 @@ class Extractor:
             "reliability": p.get("reliability", ""),
             "category": p.get("category", ""),
             "description": p.get("description", ""),
+            "measured": p.get("measured", {}),
             "content": content,
             "tokens": self._token_stats(content, source),
         }
@@ -138,8 +139,14 @@ class Extractor:
         signal: Optional[str] = None,
         pattern_type: Optional[str] = None,
         category: Optional[str] = None,
+        measured: Optional[str] = None,
+        min_hit_rate: Optional[float] = None,
     ) -> List[Dict[str, Any]]:
-        """List all indexed candlestick patterns with optional filters."""
+        """List all indexed candlestick patterns with optional filters.
+
+        ``measured`` and ``min_hit_rate`` filter on backtest results
+        (see ``backtest``); unmeasured patterns never match them.
+        """
         patterns = self.index.get("patterns", {})
         results = []
         for pat_id, pat in patterns.items():
@@ -149,6 +156,11 @@ class Extractor:
                 continue
             if category and pat.get("category", "") != category:
                 continue
+            summary = self._measured_summary(pat.get("measured", {}))
+            if measured and summary.get("grade") != measured:
+                continue
+            if min_hit_rate is not None and (summary.get("hit_rate") or 0.0) < min_hit_rate:
+                continue
             results.append({
                 "id": pat_id,
                 "name": pat["name"],
@@ -158,6 +170,7 @@ class Extractor:
                 "candle_count": pat.get("candle_count", 1),
                 "reliability": pat.get("reliability", ""),
                 "category": pat.get("category", ""),
+                "measured": summary,
                 "description": pat.get("description", "")[:100],
             })
         results.sort(key=lambda r: r["name"])
@@ -273,6 +286,21 @@ class Extractor:
     # -------------------------------------------------------------------
     # Helpers
     # -------------------------------------------------------------------
+    @staticmethod
+    def _measured_summary(measured: Dict[str, Any]) -> Dict[str, Any]:
+        """Grade, hit rate and sample count at the grade horizon; {} if unmeasured."""
+        if not measured:
+            return {}
+        horizon = str(measured.get("grade_horizon", ""))
+        stats = measured.get("horizons", {}).get(horizon, {})
+        return {
+            "grade": measured.get("grade", ""),
+            "horizon": measured.get("grade_horizon"),
+            "hit_rate": stats.get("hit_rate"),
+            "mean_return": stats.get("mean_return"),
+            "samples": stats.get("samples", 0),
+        }
+
     @staticmethod
     def _normalize(s: str) -> str:
         """Normalize for matching: lowercase, spaces→hyphens, strip."""
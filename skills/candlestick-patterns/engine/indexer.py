@@ -6,16 +6,19 @@ for targeted extraction (90%+ token reduction vs loading full pages).
 from __future__ import annotations
 
 import hashlib
+import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import asdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 
+from .doctext import DocText
 from .schema import CodeExample, Index, PatternDoc, Section, StrategyDoc
 
 # Regex patterns
-_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+)$", re.MULTILINE)
 _CODE_BLOCK_RE = re.compile(r"```(\w*)\n(.*?)```", re.DOTALL)
 
 # Category mapping from filename
@@ -153,34 +156,16 @@ def _extract_keywords(text: str) -> List[str]:
 
 
 def _index_sections(
-    content: str,
+    doc: DocText,
     source_file: str,
     category: str,
 ) -> Dict[str, Dict[str, Any]]:
     """Extract all heading-based sections with byte offsets."""
     sections: Dict[str, Dict[str, Any]] = {}
-    content_bytes = content.encode("utf-8")
-
-    headings: List[Tuple[int, int, str, int]] = []
-
-    byte_pos = 0
-    for line_idx, line in enumerate(content.split("\n")):
-        m = _HEADING_RE.match(line)
-        if m:
-            level = len(m.group(1))
-            title = m.group(2).strip()
-            headings.append((byte_pos, level, title, line_idx))
-        byte_pos += len(line.encode("utf-8")) + 1
-
-    for i, (byte_start, level, title, line_idx) in enumerate(headings):
-        byte_end = len(content_bytes)
-        for j in range(i + 1, len(headings)):
-            if headings[j][1] <= level:
-                byte_end = headings[j][0]
-                break
 
+    for i, (byte_start, byte_end, level, title, _, parent_idx) in enumerate(doc.headings):
         byte_length = byte_end - byte_start
-        section_content = content_bytes[byte_start:byte_end].decode("utf-8", errors="replace")
+        section_content = doc.text(byte_start, byte_end)
 
         code_blocks = len(re.findall(r"```", section_content)) // 2
 
@@ -189,11 +174,8 @@ def _index_sections(
             section_id = f"{section_id}-{i}"
 
         parent = None
-        for j in range(i - 1, -1, -1):
-            if headings[j][1] < level:
-                parent_title = headings[j][2]
-                parent = f"{category}/{_slug(parent_title)}"
-                break
+        if parent_idx is not None:
+            parent = f"{category}/{_slug(doc.headings[parent_idx].title)}"
 
         keywords = _extract_keywords(section_content)
 
@@ -222,16 +204,15 @@ def _index_sections(
 
 
 def _index_patterns(
-    content: str,
+    doc: DocText,
     source_file: str,
 ) -> Dict[str, Dict[str, Any]]:
     """Extract candlestick pattern references from documentation content."""
     patterns: Dict[str, Dict[str, Any]] = {}
-    content_bytes = content.encode("utf-8")
 
     # Look for pattern headings: ## Hammer, ## Morning Star, etc.
     for m in re.finditer(
-        r"^#{2,4}\s+(.+?)(?:\s*\(.*?\))?\s*$", content, re.MULTILINE
+        r"^#{2,4}\s+(.+?)(?:\s*\(.*?\))?\s*$", doc.content, re.MULTILINE
     ):
         title = m.group(1).strip()
         title_lower = title.lower()
@@ -252,16 +233,13 @@ def _index_patterns(
         if not is_pattern:
             continue
 
-        byte_start = len(content[:m.start()].encode("utf-8"))
+        byte_start = doc.byte_at(m.start())
 
         # Find end of pattern section
-        next_heading = re.search(r"^#{2,4}\s+", content[m.end():], re.MULTILINE)
-        if next_heading:
-            byte_end = len(content[:m.end() + next_heading.start()].encode("utf-8"))
-        else:
-            byte_end = len(content_bytes)
+        next_heading = doc.next_subheading(m.end())
+        byte_end = doc.byte_at(next_heading) if next_heading is not None else len(doc.data)
 
-        section = content_bytes[byte_start:byte_end].decode("utf-8", errors="replace")
+        section = doc.text(byte_start, byte_end)
 
         # Extract description
         desc_lines = []
@@ -332,16 +310,15 @@ def _index_patterns(
 
 
 def _index_strategies(
-    content: str,
+    doc: DocText,
     source_file: str,
 ) -> Dict[str, Dict[str, Any]]:
     """Extract trading strategy references from documentation content."""
     strategies: Dict[str, Dict[str, Any]] = {}
-    content_bytes = content.encode("utf-8")
 
     strategy_keywords = {"strategy", "setup", "entry", "exit", "trade", "system", "method"}
 
-    for m in re.finditer(r"^#{2,4}\s+(.+)$", content, re.MULTILINE):
+    for m in re.finditer(r"^#{2,4}\s+(.+)$", doc.content, re.MULTILINE):
         title = m.group(1).strip()
         title_lower = title.lower()
 
@@ -349,15 +326,12 @@ def _index_strategies(
         if not is_strategy:
             continue
 
-        byte_start = len(content[:m.start()].encode("utf-8"))
+        byte_start = doc.byte_at(m.start())
 
-        next_heading = re.search(r"^#{2,4}\s+", content[m.end():], re.MULTILINE)
-        if next_heading:
-            byte_end = len(content[:m.end() + next_heading.start()].encode("utf-8"))
-        else:
-            byte_end = len(content_bytes)
+        next_heading = doc.next_subheading(m.end())
+        byte_end = doc.byte_at(next_heading) if next_heading is not None else len(doc.data)
 
-        section = content_bytes[byte_start:byte_end].decode("utf-8", errors="replace")
+        section = doc.text(byte_start, byte_end)
 
         desc_lines = []
         for line in section.split("\n")[1:]:
@@ -370,14 +344,14 @@ def _index_strategies(
         # Detect which patterns this strategy uses
         patterns_used = []
         sl = section.lower()
-        for pname in _KNOWN_PATTERNS:
+        for pname in sorted(_KNOWN_PATTERNS):
             if pname in sl:
                 patterns_used.append(pname)
 
         # Detect indicators mentioned
         indicators = []
-        indicator_names = {"rsi", "macd", "stochastic", "moving average", "sma", "ema",
-                           "bollinger", "fibonacci", "volume", "atr", "adx", "obv"}
+        indicator_names = ("rsi", "macd", "stochastic", "moving average", "sma", "ema",
+                           "bollinger", "fibonacci", "volume", "atr", "adx", "obv")
         for ind in indicator_names:
             if ind in sl:
                 indicators.append(ind)
@@ -385,7 +359,7 @@ def _index_strategies(
         # Detect timeframes
         timeframes = []
         tf_patterns = re.findall(r"\b(\d+[hHmMdDwW]|daily|weekly|monthly|hourly|[14]h|1[56]m)\b", section)
-        timeframes = list(set(tf_patterns))
+        timeframes = list(dict.fromkeys(tf_patterns))
 
         strat_id = f"strat/{_slug(title)}"
         if strat_id in strategies:
@@ -406,28 +380,25 @@ def _index_strategies(
 
 
 def _index_examples(
-    content: str,
+    doc: DocText,
     source_file: str,
     category: str,
 ) -> Dict[str, Dict[str, Any]]:
     """Extract all code examples with byte offsets."""
     examples: Dict[str, Dict[str, Any]] = {}
-    content_bytes = content.encode("utf-8")
+    content = doc.content
 
     current_section = "root"
-    heading_positions = list(_HEADING_RE.finditer(content))
 
     for i, m in enumerate(_CODE_BLOCK_RE.finditer(content)):
         lang = m.group(1).lower()
 
-        byte_start = len(content[:m.start()].encode("utf-8"))
+        byte_start = doc.byte_at(m.start())
         byte_length = len(m.group(0).encode("utf-8"))
 
-        code_pos = m.start()
-        for hm in reversed(heading_positions):
-            if hm.start() < code_pos:
-                current_section = _slug(hm.group(2).strip())
-                break
+        hm = doc.heading_before(m.start())
+        if hm:
+            current_section = _slug(hm.group(2).strip())
 
         example_id = f"ex/{category}/{current_section}-{i}"
 
@@ -449,11 +420,74 @@ def _index_examples(
     return examples
 
 
-def build_index(raw_dir: Path) -> Index:
+def _index_file(md_file: Path, raw_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """Parse one markdown file into its sections/patterns/strategies/examples."""
+    content = md_file.read_text(encoding="utf-8")
+    rel_path = str(md_file.relative_to(raw_dir.parent.parent))
+    category = _category_from_path(md_file.name)
+    doc = DocText(content)
+    return {
+        "sections": _index_sections(doc, rel_path, category),
+        "patterns": _index_patterns(doc, rel_path),
+        "strategies": _index_strategies(doc, rel_path),
+        "examples": _index_examples(doc, rel_path, category),
+    }
+
+
+def _map_files(parse: Callable[..., Any], items: List[Tuple[Any, ...]], jobs: int) -> List[Any]:
+    """Apply ``parse`` to each argument tuple; results come back in input order.
+
+    With ``jobs`` > 1 (0 = one per CPU) the calls run in a process pool.
+    build_index reduces the results in order, so the index is identical
+    to a serial build.
+    """
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs > 1 and len(items) > 1:
+        workers = min(jobs, len(items))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(parse, *zip(*items),
+                                 chunksize=max(1, len(items) // (workers * 4))))
+    return [parse(*args) for args in items]
+
+
+def source_files(raw_dir: Path) -> List[Path]:
+    """Every raw doc build_index reads (polled by the MCP server's watcher)."""
+    return sorted(raw_dir.glob("*.md"))
+
+
+def apply_measured(patterns: Dict[str, Any], report: Dict[str, Any]) -> int:
+    """Set each pattern's ``measured`` stats from a backtest report.
+
+    Patterns the report does not cover are reset to {}, so stale
+    results never outlive a re-run. Returns how many were filled.
+    """
+    measured = report.get("patterns", {})
+    run = {k: report[k] for k in ("generated_at", "datasets", "bars") if k in report}
+    filled = 0
+    for pat_id, pat in patterns.items():
+        stats = measured.get(pat_id)
+        pat["measured"] = dict(stats, run=run) if stats else {}
+        filled += bool(stats)
+    return filled
+
+
+def load_measured(path: Path) -> Dict[str, Any]:
+    """A saved backtest report, or {} when absent or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return report if isinstance(report, dict) else {}
+
+
+def build_index(raw_dir: Path, jobs: int = 1) -> Index:
     """Build a complete search index from all cached markdown files.
 
     Args:
         raw_dir: Directory containing structured .md files.
+        jobs: Worker processes for per-file parsing (1 = serial, 0 = per CPU).
 
     Returns:
         Populated Index object.
@@ -463,32 +497,23 @@ def build_index(raw_dir: Path) -> Index:
     all_strategies: Dict[str, Any] = {}
     all_examples: Dict[str, Any] = {}
 
-    md_files = sorted(raw_dir.glob("*.md"))
+    md_files = source_files(raw_dir)
     if not md_files:
         raise FileNotFoundError(f"No markdown files found in {raw_dir}")
 
-    for md_file in md_files:
-        if md_file.name.startswith("_"):
-            continue
-
-        content = md_file.read_text(encoding="utf-8")
-        rel_path = str(md_file.relative_to(raw_dir.parent.parent))
-        category = _category_from_path(md_file.name)
-
-        sections = _index_sections(content, rel_path, category)
-        all_sections.update(sections)
-
-        patterns = _index_patterns(content, rel_path)
-        all_patterns.update(patterns)
-
-        strategies = _index_strategies(content, rel_path)
-        all_strategies.update(strategies)
+    items = [(md_file, raw_dir) for md_file in md_files if not md_file.name.startswith("_")]
+    # Later files win on duplicate IDs, as in a serial build
+    for frag in _map_files(_index_file, items, jobs):
+        all_sections.update(frag["sections"])
+        all_patterns.update(frag["patterns"])
+        all_strategies.update(frag["strategies"])
+        all_examples.update(frag["examples"])
 
-        examples = _index_examples(content, rel_path, category)
-        all_examples.update(examples)
+    # Backtest results live beside raw/ and survive rebuilds
+    apply_measured(all_patterns, load_measured(raw_dir.parent / "reliability.json"))
 
     source_hash = hashlib.sha256()
-    for md_file in sorted(raw_dir.glob("*.md")):
+    for md_file in source_files(raw_dir):
         source_hash.update(md_file.read_bytes())
 
     stats = {
@@ -515,6 +540,6 @@ def build_index(raw_dir: Path) -> Index:
 def check_index_freshness(index: Index, raw_dir: Path) -> bool:
     """Check if the index matches the current source files."""
     current_hash = hashlib.sha256()
-    for md_file in sorted(raw_dir.glob("*.md")):
+    for md_file in source_files(raw_dir):
         current_hash.update(md_file.read_bytes())
     return index.source_hash == current_hash.hexdigest()[:16]
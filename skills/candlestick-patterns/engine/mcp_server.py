@@ -1,15 +1,19 @@
 """MCP stdio JSON-RPC 2.0 server for Candlestick Patterns Engine.
 
-Exposes 11 tools for Japanese candlestick pattern documentation search and extraction.
-Zero external dependencies — stdlib only.
+Exposes 12 tools for Japanese candlestick pattern documentation search, extraction
+and detection. Stdlib only, except candle_scan which needs numpy.
 """
 from __future__ import annotations
 
 import json
 import sys
+import threading
 from pathlib import Path
 from typing import Any, Dict
 
+from .searcher import RESULT_CACHE_BYTES
+from .watcher import DEFAULT_INTERVAL, SourceWatcher
+
 TOOLS = [
     {
         "name": "candle_search",
@@ -38,7 +42,7 @@ TOOLS = [
     },
     {
         "name": "candle_get_pattern",
-        "description": "Get full documentation for a Japanese candlestick pattern. Returns name, Japanese name, signal, type, reliability, and content.",
+        "description": "Get full documentation for a Japanese candlestick pattern. Returns name, Japanese name, signal, type, reliability, backtested stats (measured), and content.",
         "inputSchema": {
             "type": "object",
             "properties": {
@@ -49,13 +53,15 @@ TOOLS = [
     },
     {
         "name": "candle_list_patterns",
-        "description": "List all indexed candlestick patterns. Filter by signal (bullish/bearish/neutral), type (reversal/continuation/indecision), or category.",
+        "description": "List all indexed candlestick patterns. Filter by signal (bullish/bearish/neutral), type (reversal/continuation/indecision), category, or backtested reliability.",
         "inputSchema": {
             "type": "object",
             "properties": {
                 "signal": {"type": "string", "enum": ["bullish", "bearish", "neutral"], "description": "Filter by signal direction"},
                 "pattern_type": {"type": "string", "enum": ["reversal", "continuation", "indecision"], "description": "Filter by pattern type"},
                 "category": {"type": "string", "description": "Filter by category (single-reversal, dual-reversal, triple-reversal, doji, continuation)"},
+                "measured": {"type": "string", "enum": ["high", "medium", "low"], "description": "Filter by backtested reliability grade"},
+                "min_hit_rate": {"type": "number", "description": "Minimum backtested hit rate (0-1) at the grade horizon"},
             },
         },
     },
@@ -107,6 +113,25 @@ TOOLS = [
         "description": "Check index statistics: total sections, patterns, strategies, examples, and freshness status.",
         "inputSchema": {"type": "object", "properties": {}},
     },
+    {
+        "name": "candle_scan",
+        "description": "Detect candlestick patterns in OHLC(V) bars (vectorized, needs numpy). Returns per-pattern counts and the most recent detections, each with the pat/ ID to pass to candle_get_pattern.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "open": {"type": "array", "items": {"type": "number"}, "description": "Open prices, oldest first"},
+                "high": {"type": "array", "items": {"type": "number"}, "description": "High prices"},
+                "low": {"type": "array", "items": {"type": "number"}, "description": "Low prices"},
+                "close": {"type": "array", "items": {"type": "number"}, "description": "Close prices"},
+                "volume": {"type": "array", "items": {"type": "number"}, "description": "Volumes (optional; adds volume_ratio to detections)"},
+                "time": {"type": "array", "items": {"type": "string"}, "description": "Bar labels (optional)"},
+                "patterns": {"type": "array", "items": {"type": "string"}, "description": "Pattern slugs to detect (default all, e.g. ['hammer', 'bullish-engulfing'])"},
+                "min_strength": {"type": "number", "default": 0, "description": "Drop detections weaker than this (0-1)"},
+                "limit": {"type": "integer", "default": 50, "description": "Most recent detections to list"},
+            },
+            "required": ["open", "high", "low", "close"],
+        },
+    },
     {
         "name": "candle_suggest",
         "description": "Suggest similar entry IDs for a misspelled or partial query. Useful for typo correction.",
@@ -124,7 +149,9 @@ TOOLS = [
 class CandlestickMCPServer:
     """Minimal MCP server over stdio for Japanese candlestick pattern docs."""
 
-    def __init__(self, skill_dir: Path, index_path: Path, log_path: Path):
+    def __init__(self, skill_dir: Path, index_path: Path, log_path: Path,
+                 watch_interval: float = DEFAULT_INTERVAL,
+                 search_cache_bytes: int = RESULT_CACHE_BYTES):
         self.skill_dir = skill_dir
         self.index_path = index_path
         self.log_path = log_path
@@ -132,6 +159,13 @@ class CandlestickMCPServer:
         self.extractor = None
         self.searcher = None
         self.tracker = None
+        self.generation = 0  # Bumped on every index swap; reported in tool responses
+        self.watch_interval = watch_interval  # 0 disables the source watcher
+        self.search_cache_bytes = search_cache_bytes
+        self.watcher = None
+        # Held for each tool call and each swap, so a background rebuild
+        # is installed between calls, never during one
+        self._state_lock = threading.Lock()
 
     def _ensure_loaded(self) -> None:
         if self.index is not None:
@@ -147,9 +181,9 @@ class CandlestickMCPServer:
                 except (OSError, IOError):
                     pass
 
+        from .compact import load_index
         try:
-            with open(self.index_path, "r", encoding="utf-8") as f:
-                self.index = json.load(f)
+            index = load_index(self.index_path)
         except (json.JSONDecodeError, FileNotFoundError, OSError):
             from .indexer import build_index
             raw_dir = self.skill_dir / "data" / "raw"
@@ -159,16 +193,46 @@ class CandlestickMCPServer:
             except (OSError, IOError):
                 pass
             from dataclasses import asdict
-            self.index = asdict(idx)
+            index = asdict(idx)
 
-        from .extractor import Extractor
-        from .searcher import Searcher
         from .tracker import TokenTracker
 
-        self.extractor = Extractor(self.index, self.skill_dir)
-        self.searcher = Searcher(self.index)
+        self._install(index)
         self.tracker = TokenTracker(self.log_path)
 
+    def _install(self, index: Dict[str, Any]) -> None:
+        """Replace the index and its extractor/searcher (caller holds _state_lock)."""
+        from .extractor import Extractor
+        from .searcher import ResultCache, Searcher
+
+        self.extractor = Extractor(index, self.skill_dir)
+        # The result cache outlives the swap: its counters carry over and the
+        # new source_hash drops entries computed against the old index
+        if self.searcher is not None:
+            cache = self.searcher.cache
+        else:
+            cache = ResultCache(self.search_cache_bytes)
+        self.searcher = Searcher(index, cache=cache)
+        self.index = index
+        self.generation += 1
+
+    def _on_sources_changed(self) -> None:
+        """Watcher callback: rebuild, save and swap in the index.
+
+        The build runs without the lock; the swap then waits for any
+        in-flight call, which finishes against the index it started with.
+        """
+        from dataclasses import asdict
+        from .indexer import build_index
+        idx = build_index(self.skill_dir / "data" / "raw")
+        try:
+            idx.save(self.index_path)
+        except (OSError, IOError):
+            pass
+        with self._state_lock:
+            self._ensure_loaded()
+            self._install(asdict(idx))
+
     def handle(self, request: Dict[str, Any]) -> Dict[str, Any] | None:
         method = request.get("method", "")
         req_id = request.get("id")
@@ -193,23 +257,25 @@ class CandlestickMCPServer:
         return self._error(req_id, -32601, f"Method not found: {method}")
 
     def _call_tool(self, req_id: Any, params: Dict[str, Any]) -> Dict[str, Any]:
-        self._ensure_loaded()
-        tool_name = params.get("name", "")
-        args = params.get("arguments", {})
+        with self._state_lock:
+            self._ensure_loaded()
+            tool_name = params.get("name", "")
+            args = params.get("arguments", {})
 
-        try:
-            result = self._dispatch_tool(tool_name, args)
-            text = json.dumps(result, indent=2, ensure_ascii=False)
+            try:
+                result = self._dispatch_tool(tool_name, args)
+                text = json.dumps(result, indent=2, ensure_ascii=False)
 
-            tokens_used = len(text) // 4
-            tokens_saved = max(tokens_used * 3, 0)
-            self.tracker.log(tool_name, tokens_used, tokens_saved, {"args": args})
+                tokens_used = len(text) // 4
+                tokens_saved = max(tokens_used * 3, 0)
+                self.tracker.log(tool_name, tokens_used, tokens_saved, {"args": args})
 
-            return self._response(req_id, {
-                "content": [{"type": "text", "text": text}],
-            })
-        except Exception as e:
-            return self._tool_error(req_id, f"Error in {tool_name}: {e}")
+                return self._response(req_id, {
+                    "content": [{"type": "text", "text": text}],
+                    "_meta": {"index_generation": self.generation},
+                })
+            except Exception as e:
+                return self._tool_error(req_id, f"Error in {tool_name}: {e}")
 
     def _dispatch_tool(self, tool_name: str, args: Dict[str, Any]) -> Any:
         """Route tool call to appropriate handler."""
@@ -242,6 +308,8 @@ class CandlestickMCPServer:
                 signal=args.get("signal"),
                 pattern_type=args.get("pattern_type"),
                 category=args.get("category"),
+                measured=args.get("measured"),
+                min_hit_rate=args.get("min_hit_rate"),
             )
 
         elif tool_name == "candle_get_strategy":
@@ -274,8 +342,28 @@ class CandlestickMCPServer:
                 "version": self.index.get("version", ""),
                 "generated_at": self.index.get("generated_at", ""),
                 "source_hash": self.index.get("source_hash", ""),
+                "index_generation": self.generation,
+                "watching": self.watcher is not None,
+                "watcher_error": self.watcher.last_error if self.watcher else None,
+                "search_cache": self.searcher.cache.stats(),
             }
 
+        elif tool_name == "candle_scan":
+            try:
+                from .scanner import scan
+            except ImportError:
+                return {"error": "numpy is required for candle_scan. Run: pip3 install numpy"}
+            bars = {name: args.get(name) for name in ("open", "high", "low", "close", "volume", "time")}
+            missing = [name for name in ("open", "high", "low", "close") if bars[name] is None]
+            if missing:
+                return {"error": f"Missing bar arrays: {', '.join(missing)}"}
+            try:
+                return scan(bars, self.index, patterns=args.get("patterns"),
+                            min_strength=args.get("min_strength", 0.0),
+                            limit=args.get("limit", 50))
+            except ValueError as e:
+                return {"error": str(e)}
+
         elif tool_name == "candle_suggest":
             return {"suggestions": self.searcher.suggest(args.get("query", ""))}
 
@@ -295,7 +383,27 @@ class CandlestickMCPServer:
         return {"jsonrpc": "2.0", "id": req_id, "error": {"code": code, "message": message}}
 
     def run(self) -> None:
-        """Main stdio loop."""
+        """Main stdio loop.
+
+        Unless ``watch_interval`` is 0, a background watcher rebuilds and
+        swaps in the index whenever a source file changes on disk.
+        """
+        if self.watch_interval > 0:
+            from .indexer import source_files
+            source_dir = self.skill_dir / "data" / "raw"
+            # A finished backtest (data/reliability.json) also triggers a rebuild
+            reliability = self.skill_dir / "data" / "reliability.json"
+            self.watcher = SourceWatcher(lambda: source_files(source_dir) + [reliability],
+                                         self._on_sources_changed, self.watch_interval)
+            self.watcher.start()
+        try:
+            self._serve()
+        finally:
+            if self.watcher is not None:
+                self.watcher.stop()
+
+    def _serve(self) -> None:
+        """Answer JSON-RPC requests from stdin until EOF."""
         for line in sys.stdin:
             line = line.strip()
             if not line:
@@ -316,7 +424,10 @@ class CandlestickMCPServer:
                 sys.stdout.flush()
 
 
-def run_server(skill_dir: Path, index_path: Path, log_path: Path) -> None:
+def run_server(skill_dir: Path, index_path: Path, log_path: Path,
+               watch_interval: float = DEFAULT_INTERVAL,
+               search_cache_bytes: int = RESULT_CACHE_BYTES) -> None:
     """Entry point for MCP server."""
-    server = CandlestickMCPServer(skill_dir, index_path, log_path)
+    server = CandlestickMCPServer(skill_dir, index_path, log_path, watch_interval,
+                                  search_cache_bytes)
     server.run()
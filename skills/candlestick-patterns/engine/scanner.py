@@ -0,0 +1,511 @@
+"""Vectorized candlestick pattern detection over OHLC(V) arrays (NumPy).
+
+Every detector is a handful of elementwise comparisons on shifted
+copies of the bar arrays, so a scan is O(bars) NumPy work with no
+per-bar Python loop. Results are keyed by pattern slug; ``pattern_ids``
+links each slug to its ``pat/...`` documentation entry in the index.
+"""
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Body at most this fraction of the range: doji
+DOJI_BODY = 0.1
+# Body at most this fraction of the range: small (stars, hammers, spinning tops)
+SMALL_BODY = 0.35
+# Body at least this fraction of the range: long (first candle of two/three-bar reversals)
+LONG_BODY = 0.6
+# Hammer family: long shadow at least this multiple of the body...
+SHADOW_RATIO = 2.0
+# ...and the opposite shadow at most this fraction of the range
+SMALL_SHADOW = 0.1
+# Marubozu: each shadow at most this fraction of the range
+MARUBOZU_SHADOW = 0.05
+# Tweezers: extremes within this fraction of the larger range of the two bars
+TWEEZER_TOLERANCE = 0.05
+# Trend before a pattern: close before it vs the close this many bars earlier
+TREND_LOOKBACK = 5
+# Volume ratio: bar volume over the mean of this many preceding bars
+VOLUME_LOOKBACK = 20
+
+PRICE_COLUMNS = ("open", "high", "low", "close")
+TIME_COLUMNS = ("time", "date", "datetime", "timestamp")
+
+# slug -> (candle_count, signal, detector); filled in by @_pattern below
+PATTERNS: Dict[str, Tuple[int, str, Callable[["_Bars"], Tuple[np.ndarray, np.ndarray]]]] = {}
+
+
+def _shift(a: np.ndarray, k: int) -> np.ndarray:
+    """``a`` delayed by k bars; the first k slots are NaN (False for masks)."""
+    if k == 0:
+        return a
+    out = np.empty_like(a)
+    out[:k] = False if a.dtype == bool else np.nan
+    out[k:] = a[:-k]
+    return out
+
+
+class _Bars:
+    """Per-bar candle features, computed once per scan and shared by all detectors."""
+
+    def __init__(self, o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray):
+        self.o, self.h, self.l, self.c = o, h, l, c
+        self.top = np.maximum(o, c)
+        self.bottom = np.minimum(o, c)
+        self.mid = (o + c) / 2
+        self.body = self.top - self.bottom
+        self.range = h - l
+        inv = 1.0 / np.where(self.range > 0, self.range, np.inf)
+        self.body_frac = self.body * inv
+        self.upper = h - self.top
+        self.lower = self.bottom - l
+        self.upper_frac = self.upper * inv
+        self.lower_frac = self.lower * inv
+        self.bull = c > o
+        self.bear = c < o
+        self.doji = (self.range > 0) & (self.body_frac <= DOJI_BODY)
+        self.long = self.body_frac >= LONG_BODY
+        self._prev: Dict[int, _Prev] = {}
+
+    def prev(self, k: int) -> "_Bars":
+        """The same features k bars earlier (shifted lazily, then cached)."""
+        if k not in self._prev:
+            self._prev[k] = _Prev(self, k)
+        return self._prev[k]  # type: ignore[return-value]
+
+    def downtrend(self, candles: int) -> np.ndarray:
+        """Closes were falling into a pattern of ``candles`` bars ending here."""
+        return self.prev(candles).c < self.prev(candles + TREND_LOOKBACK).c
+
+    def uptrend(self, candles: int) -> np.ndarray:
+        return self.prev(candles).c > self.prev(candles + TREND_LOOKBACK).c
+
+
+class _Prev:
+    def __init__(self, bars: _Bars, k: int):
+        self._bars = bars
+        self._k = k
+
+    def prev(self, k: int) -> "_Prev":
+        return self._bars.prev(self._k + k)  # type: ignore[return-value]
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        value = _shift(getattr(self._bars, name), self._k)
+        setattr(self, name, value)
+        return value
+
+
+def _pattern(slug: str, candles: int, signal: str):
+    def register(fn: Callable[[_Bars], Tuple[np.ndarray, np.ndarray]]):
+        PATTERNS[slug] = (candles, signal, fn)
+        return fn
+    return register
+
+
+# -- Single candle ----------------------------------------------------------
+
+@_pattern("doji", 1, "neutral")
+def _doji(b: _Bars):
+    return b.doji, 1 - b.body_frac / DOJI_BODY
+
+
+@_pattern("dragonfly-doji", 1, "bullish")
+def _dragonfly_doji(b: _Bars):
+    return b.doji & (b.upper_frac <= SMALL_SHADOW) & (b.lower_frac >= LONG_BODY), b.lower_frac
+
+
+@_pattern("gravestone-doji", 1, "bearish")
+def _gravestone_doji(b: _Bars):
+    return b.doji & (b.lower_frac <= SMALL_SHADOW) & (b.upper_frac >= LONG_BODY), b.upper_frac
+
+
+@_pattern("long-legged-doji", 1, "neutral")
+def _long_legged_doji(b: _Bars):
+    shorter = np.minimum(b.upper_frac, b.lower_frac)
+    return b.doji & (shorter >= 0.3), shorter * 2
+
+
+def _hammer_shape(b: _Bars) -> np.ndarray:
+    return ((b.range > 0) & (b.body_frac <= SMALL_BODY) & (b.lower >= SHADOW_RATIO * b.body)
+            & (b.upper_frac <= SMALL_SHADOW))
+
+
+def _inverted_shape(b: _Bars) -> np.ndarray:
+    return ((b.range > 0) & (b.body_frac <= SMALL_BODY) & (b.upper >= SHADOW_RATIO * b.body)
+            & (b.lower_frac <= SMALL_SHADOW))
+
+
+@_pattern("hammer", 1, "bullish")
+def _hammer(b: _Bars):
+    return _hammer_shape(b) & b.downtrend(1), b.lower_frac
+
+
+@_pattern("hanging-man", 1, "bearish")
+def _hanging_man(b: _Bars):
+    return _hammer_shape(b) & b.uptrend(1), b.lower_frac
+
+
+@_pattern("inverted-hammer", 1, "bullish")
+def _inverted_hammer(b: _Bars):
+    return _inverted_shape(b) & b.downtrend(1), b.upper_frac
+
+
+@_pattern("shooting-star", 1, "bearish")
+def _shooting_star(b: _Bars):
+    return _inverted_shape(b) & b.uptrend(1), b.upper_frac
+
+
+@_pattern("white-marubozu", 1, "bullish")
+def _white_marubozu(b: _Bars):
+    shaven = (b.upper_frac <= MARUBOZU_SHADOW) & (b.lower_frac <= MARUBOZU_SHADOW)
+    return b.bull & shaven, b.body_frac
+
+
+@_pattern("black-marubozu", 1, "bearish")
+def _black_marubozu(b: _Bars):
+    shaven = (b.upper_frac <= MARUBOZU_SHADOW) & (b.lower_frac <= MARUBOZU_SHADOW)
+    return b.bear & shaven, b.body_frac
+
+
+@_pattern("spinning-top", 1, "neutral")
+def _spinning_top(b: _Bars):
+    mask = ((b.body_frac > DOJI_BODY) & (b.body_frac <= SMALL_BODY)
+            & (b.upper >= b.body) & (b.lower >= b.body))
+    return mask, 1 - b.body_frac
+
+
+# -- Two candles ------------------------------------------------------------
+
+@_pattern("bullish-engulfing", 2, "bullish")
+def _bullish_engulfing(b: _Bars):
+    p = b.prev(1)
+    mask = p.bear & b.bull & (b.o <= p.c) & (b.c >= p.o) & (b.body > p.body) & b.downtrend(2)
+    return mask, 1 - p.body / b.body
+
+
+@_pattern("bearish-engulfing", 2, "bearish")
+def _bearish_engulfing(b: _Bars):
+    p = b.prev(1)
+    mask = p.bull & b.bear & (b.o >= p.c) & (b.c <= p.o) & (b.body > p.body) & b.uptrend(2)
+    return mask, 1 - p.body / b.body
+
+
+def _inside_body(b: _Bars) -> np.ndarray:
+    p = b.prev(1)
+    return p.long & (b.top <= p.top) & (b.bottom >= p.bottom) & (b.body < p.body)
+
+
+@_pattern("bullish-harami", 2, "bullish")
+def _bullish_harami(b: _Bars):
+    p = b.prev(1)
+    return p.bear & _inside_body(b) & b.downtrend(2), 1 - b.body / p.body
+
+
+@_pattern("bearish-harami", 2, "bearish")
+def _bearish_harami(b: _Bars):
+    p = b.prev(1)
+    return p.bull & _inside_body(b) & b.uptrend(2), 1 - b.body / p.body
+
+
+@_pattern("harami-cross", 2, "neutral")
+def _harami_cross(b: _Bars):
+    return _inside_body(b) & b.doji, 1 - b.body_frac / DOJI_BODY
+
+
+@_pattern("piercing-line", 2, "bullish")
+def _piercing_line(b: _Bars):
+    p = b.prev(1)
+    mask = (p.bear & p.long & b.bull & (b.o < p.c) & (b.c > p.mid) & (b.c < p.o)
+            & b.downtrend(2))
+    return mask, (b.c - p.mid) / (p.o - p.mid)
+
+
+@_pattern("dark-cloud-cover", 2, "bearish")
+def _dark_cloud_cover(b: _Bars):
+    p = b.prev(1)
+    mask = (p.bull & p.long & b.bear & (b.o > p.c) & (b.c < p.mid) & (b.c > p.o)
+            & b.uptrend(2))
+    return mask, (p.mid - b.c) / (p.mid - p.o)
+
+
+def _tweezer_miss(a: np.ndarray, b: np.ndarray, bars: _Bars) -> np.ndarray:
+    """Distance between two extremes as a fraction of the allowed tolerance."""
+    allowed = TWEEZER_TOLERANCE * np.maximum(bars.range, bars.prev(1).range)
+    return np.abs(a - b) / np.where(allowed > 0, allowed, np.inf)
+
+
+@_pattern("tweezer-bottom", 2, "bullish")
+def _tweezer_bottom(b: _Bars):
+    p = b.prev(1)
+    miss = _tweezer_miss(b.l, p.l, b)
+    return p.bear & b.bull & (miss <= 1) & b.downtrend(2), 1 - miss
+
+
+@_pattern("tweezer-top", 2, "bearish")
+def _tweezer_top(b: _Bars):
+    p = b.prev(1)
+    miss = _tweezer_miss(b.h, p.h, b)
+    return p.bull & b.bear & (miss <= 1) & b.uptrend(2), 1 - miss
+
+
+@_pattern("inside-bar", 2, "neutral")
+def _inside_bar(b: _Bars):
+    p = b.prev(1)
+    return (b.h < p.h) & (b.l > p.l), 1 - b.range / p.range
+
+
+@_pattern("rising-window", 2, "bullish")
+def _rising_window(b: _Bars):
+    p = b.prev(1)
+    return b.l > p.h, (b.l - p.h) / p.range
+
+
+@_pattern("falling-window", 2, "bearish")
+def _falling_window(b: _Bars):
+    p = b.prev(1)
+    return b.h < p.l, (p.l - b.h) / p.range
+
+
+# -- Three candles ----------------------------------------------------------
+
+def _star(b: _Bars, bullish: bool, star: np.ndarray):
+    a, s = b.prev(2), b.prev(1)
+    if bullish:
+        mask = (a.bear & a.long & star & (s.top < a.c) & b.bull & (b.c > a.mid)
+                & b.downtrend(3))
+        return mask, (b.c - a.mid) / (a.o - a.mid)
+    mask = (a.bull & a.long & star & (s.bottom > a.c) & b.bear & (b.c < a.mid)
+            & b.uptrend(3))
+    return mask, (a.mid - b.c) / (a.mid - a.o)
+
+
+@_pattern("morning-star", 3, "bullish")
+def _morning_star(b: _Bars):
+    return _star(b, True, b.prev(1).body_frac <= SMALL_BODY)
+
+
+@_pattern("evening-star", 3, "bearish")
+def _evening_star(b: _Bars):
+    return _star(b, False, b.prev(1).body_frac <= SMALL_BODY)
+
+
+@_pattern("morning-doji-star", 3, "bullish")
+def _morning_doji_star(b: _Bars):
+    return _star(b, True, b.prev(1).doji)
+
+
+@_pattern("evening-doji-star", 3, "bearish")
+def _evening_doji_star(b: _Bars):
+    return _star(b, False, b.prev(1).doji)
+
+
+@_pattern("three-white-soldiers", 3, "bullish")
+def _three_white_soldiers(b: _Bars):
+    a, s = b.prev(2), b.prev(1)
+    mask = (a.bull & s.bull & b.bull & (s.c > a.c) & (b.c > s.c)
+            & (s.o > a.o) & (s.o <= a.c) & (b.o > s.o) & (b.o <= s.c)
+            & (np.minimum(np.minimum(a.body_frac, s.body_frac), b.body_frac) >= 0.5))
+    return mask, np.minimum(np.minimum(a.body_frac, s.body_frac), b.body_frac)
+
+
+@_pattern("three-black-crows", 3, "bearish")
+def _three_black_crows(b: _Bars):
+    a, s = b.prev(2), b.prev(1)
+    mask = (a.bear & s.bear & b.bear & (s.c < a.c) & (b.c < s.c)
+            & (s.o < a.o) & (s.o >= a.c) & (b.o < s.o) & (b.o >= s.c)
+            & (np.minimum(np.minimum(a.body_frac, s.body_frac), b.body_frac) >= 0.5))
+    return mask, np.minimum(np.minimum(a.body_frac, s.body_frac), b.body_frac)
+
+
+@_pattern("three-inside-up", 3, "bullish")
+def _three_inside_up(b: _Bars):
+    a = b.prev(2)
+    mask = a.bear & _inside_body(b.prev(1)) & b.bull & (b.c > a.o) & b.downtrend(3)
+    return mask, (b.c - a.o) / a.range
+
+
+@_pattern("three-inside-down", 3, "bearish")
+def _three_inside_down(b: _Bars):
+    a = b.prev(2)
+    mask = a.bull & _inside_body(b.prev(1)) & b.bear & (b.c < a.o) & b.uptrend(3)
+    return mask, (a.o - b.c) / a.range
+
+
+@_pattern("three-outside-up", 3, "bullish")
+def _three_outside_up(b: _Bars):
+    a, s = b.prev(2), b.prev(1)
+    mask = (a.bear & s.bull & (s.o <= a.c) & (s.c >= a.o) & (s.body > a.body)
+            & b.bull & (b.c > s.c) & b.downtrend(3))
+    return mask, 1 - a.body / s.body
+
+
+@_pattern("three-outside-down", 3, "bearish")
+def _three_outside_down(b: _Bars):
+    a, s = b.prev(2), b.prev(1)
+    mask = (a.bull & s.bear & (s.o >= a.c) & (s.c <= a.o) & (s.body > a.body)
+            & b.bear & (b.c < s.c) & b.uptrend(3))
+    return mask, 1 - a.body / s.body
+
+
+# Bars of history any detector reads behind the bar it reports on
+LOOKBACK = max(max(n for n, _, _ in PATTERNS.values()) + TREND_LOOKBACK, VOLUME_LOOKBACK)
+
+
+def volume_ratio(volume: np.ndarray) -> np.ndarray:
+    """Each bar's volume over the mean of the VOLUME_LOOKBACK bars before it.
+
+    Summed lag by lag rather than with a cumulative sum, so a bar's ratio
+    depends only on its own window (NaN until the window is full).
+    """
+    total = _shift(volume, 1).copy()
+    for k in range(2, VOLUME_LOOKBACK + 1):
+        total += _shift(volume, k)
+    mean = total / VOLUME_LOOKBACK
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(mean > 0, volume / mean, np.nan)
+
+
+def check_patterns(patterns: Optional[Iterable[str]]) -> None:
+    """Raise ValueError naming any slug that has no detector."""
+    unknown = sorted(set(patterns or ()) - set(PATTERNS))
+    if unknown:
+        raise ValueError(f"Unknown pattern(s): {', '.join(unknown)}. "
+                         f"Available: {', '.join(PATTERNS)}")
+
+
+def detect(open_: Sequence[float], high: Sequence[float], low: Sequence[float],
+           close: Sequence[float],
+           patterns: Optional[Iterable[str]] = None) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Boolean and strength arrays for each pattern, indexed by completing bar.
+
+    Strength is in [0, 1] where the mask is set and 0 elsewhere. Unknown
+    pattern slugs raise KeyError.
+    """
+    arrays = [np.ascontiguousarray(a, dtype=np.float64) for a in (open_, high, low, close)]
+    bars = _Bars(*arrays)
+    selected = list(PATTERNS) if patterns is None else list(patterns)
+    results: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for slug in selected:
+            mask, strength = PATTERNS[slug][2](bars)
+            results[slug] = (mask, np.where(mask, np.clip(strength, 0.0, 1.0), 0.0))
+    return results
+
+
+def pattern_ids(index_data: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """Map each detector slug to its ``pat/...`` entry (None if undocumented).
+
+    Uses the same matching as ``get-pattern``, so ``candle_get_pattern``
+    with the slug returns the linked entry.
+    """
+    from .extractor import Extractor
+
+    entries = index_data.get("patterns", {})
+    return {slug: Extractor._match_id(f"pat/{slug}", entries) or Extractor._match_id(slug, entries)
+            for slug in PATTERNS}
+
+
+def detection(slug: str, bar: int, pattern_id: Optional[str], strength: float,
+              time: Any = None, ratio: Optional[float] = None) -> Dict[str, Any]:
+    """One detection record (shared by batch scans and the streaming detector)."""
+    hit: Dict[str, Any] = {"bar": bar}
+    if time is not None:
+        hit["time"] = time
+    hit.update({"pattern": slug, "pattern_id": pattern_id, "signal": PATTERNS[slug][1],
+                "strength": round(float(strength), 3)})
+    if ratio is not None and not np.isnan(ratio):
+        hit["volume_ratio"] = round(float(ratio), 2)
+    return hit
+
+
+def load_csv(path: Path) -> Dict[str, Any]:
+    """OHLC(V) columns of a CSV with a header row (names are case-insensitive).
+
+    Returns float64 arrays under open/high/low/close, ``volume`` (or None)
+    and ``time`` labels from the first date/time column (or None).
+    Raises ValueError on missing columns or a row whose field count
+    differs from the header's.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [h.strip().lower() for h in next(reader, [])]
+        rows = []
+        for row in reader:
+            if not row:
+                continue
+            if len(row) != len(header):
+                raise ValueError(f"{path}:{reader.line_num}: expected {len(header)} fields, "
+                                 f"got {len(row)}")
+            rows.append(row)
+    missing = [name for name in PRICE_COLUMNS if name not in header]
+    if missing:
+        raise ValueError(f"{path}: missing column(s) {', '.join(missing)}")
+    columns = list(zip(*rows)) if rows else [()] * len(header)
+    bars: Dict[str, Any] = {name: np.array(columns[header.index(name)], dtype=np.float64)
+                            for name in PRICE_COLUMNS}
+    bars["volume"] = (np.array(columns[header.index("volume")], dtype=np.float64)
+                      if "volume" in header else None)
+    time_col = next((header.index(n) for n in TIME_COLUMNS if n in header), None)
+    bars["time"] = list(columns[time_col]) if time_col is not None else None
+    return bars
+
+
+def scan(bars: Dict[str, Any], index_data: Dict[str, Any],
+         patterns: Optional[Iterable[str]] = None, min_strength: float = 0.0,
+         limit: int = 50) -> Dict[str, Any]:
+    """Detect patterns in ``bars`` (as returned by load_csv) and summarize.
+
+    ``detections`` holds the most recent ``limit`` hits in bar order;
+    ``patterns`` counts every hit per pattern (patterns without hits are
+    left out unless explicitly requested). Raises ValueError on
+    mismatched column lengths or unknown pattern slugs.
+    """
+    patterns = list(patterns) if patterns is not None else None
+    lengths = {len(bars[name]) for name in PRICE_COLUMNS}
+    for name in ("volume", "time"):
+        if bars.get(name) is not None:
+            lengths.add(len(bars[name]))
+    if len(lengths) > 1:
+        raise ValueError("open/high/low/close/volume/time must have the same length")
+    check_patterns(patterns)
+
+    results = detect(bars["open"], bars["high"], bars["low"], bars["close"], patterns)
+    ids = pattern_ids(index_data)
+    volume = bars.get("volume")
+    ratios = volume_ratio(np.asarray(volume, dtype=np.float64)) if volume is not None else None
+    times = bars.get("time")
+
+    slugs = list(results)
+    hit_bars: List[np.ndarray] = []
+    hit_slugs: List[np.ndarray] = []
+    summary: Dict[str, Any] = {}
+    for i, slug in enumerate(slugs):
+        mask, strength = results[slug]
+        hits = np.flatnonzero(mask & (strength >= min_strength))
+        candles, signal, _ = PATTERNS[slug]
+        if hits.size or patterns is not None:
+            summary[slug] = {"pattern_id": ids[slug], "signal": signal, "candles": candles,
+                             "count": int(hits.size)}
+        hit_bars.append(hits)
+        hit_slugs.append(np.full(hits.size, i))
+
+    all_bars = np.concatenate(hit_bars) if hit_bars else np.empty(0, dtype=np.intp)
+    all_slugs = np.concatenate(hit_slugs) if hit_slugs else np.empty(0, dtype=np.intp)
+    order = np.argsort(all_bars, kind="stable")[-limit:] if limit > 0 else all_bars[:0]
+    detections = [
+        detection(slugs[i], bar, ids[slugs[i]], results[slugs[i]][1][bar],
+                  times[bar] if times is not None else None,
+                  ratios[bar] if ratios is not None else None)
+        for bar, i in zip(all_bars[order].tolist(), all_slugs[order].tolist())
+    ]
+
+    return {
+        "bars": int(len(bars["close"])),
+        "total_detections": int(all_bars.size),
+        "patterns": summary,
+        "detections": detections,
+    }
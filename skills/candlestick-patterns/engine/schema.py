@@ -6,6 +6,8 @@ from dataclasses import dataclass, field, asdict
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from .compact import save_compact
+
 
 @dataclass
 class Section:
@@ -39,6 +41,8 @@ class PatternDoc:
     reliability: str = ""  # high|medium|low
     category: str = ""  # single-reversal|dual-reversal|triple-reversal|continuation|doji
     see_also: List[str] = field(default_factory=list)
+    # Backtested outcomes from data/reliability.json (grade, per-horizon hit rates); {} if never run
+    measured: Dict[str, Any] = field(default_factory=dict)
 
 
 @dataclass
@@ -80,8 +84,10 @@ class Index:
 
     def save(self, path: Path) -> None:
         path.parent.mkdir(parents=True, exist_ok=True)
+        data = asdict(self)
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(asdict(self), f, indent=2, ensure_ascii=False)
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        save_compact(path, data)
 
     @classmethod
     def load(cls, path: Path) -> "Index":
@@ -1,8 +1,77 @@
 """Fuzzy search across all candlestick indexed entries (stdlib only)."""
 from __future__ import annotations
 
+import json
+import threading
+from collections import OrderedDict
 from difflib import SequenceMatcher
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Memory cap for cached search results (JSON-encoded size, LRU eviction)
+RESULT_CACHE_BYTES = 4 * 1024 * 1024
+
+
+class ResultCache:
+    """Thread-safe LRU of search results for one index source_hash.
+
+    Results are kept JSON-encoded, so the cap counts real bytes and every
+    hit is a fresh copy. A lookup under a different source_hash (the
+    index was rebuilt) drops all entries first.
+    """
+
+    def __init__(self, max_bytes: int = RESULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._source_hash: Optional[str] = None
+        self._entries: "OrderedDict[Tuple[Any, ...], str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, source_hash: str, key: Tuple[Any, ...],
+                       compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if source_hash != self._source_hash:
+                if self._source_hash is not None:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._bytes = 0
+                self._source_hash = source_hash
+            stored = self._entries.get(key)
+            if stored is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if stored is not None:
+            return json.loads(stored)
+
+        result = compute()
+        encoded = json.dumps(result)
+        with self._lock:
+            # Skip the store if a rebuild invalidated the cache meanwhile
+            if (len(encoded) <= self.max_bytes and source_hash == self._source_hash
+                    and key not in self._entries):
+                self._entries[key] = encoded
+                self._bytes += len(encoded)
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= len(evicted)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "invalidations": self.invalidations,
+            }
 
 
 def _score(query: str, text: str) -> float:
@@ -64,14 +133,30 @@ def _search_dict(
 class Searcher:
     """Search across all candlestick indexed content."""
 
-    def __init__(self, index_data: Dict[str, Any]):
+    def __init__(self, index_data: Dict[str, Any], cache: Optional[ResultCache] = None):
         self.index = index_data
+        self.cache = cache if cache is not None else ResultCache()
 
     def search(
         self,
         query: str,
         category: Optional[str] = None,
         limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """Cached fuzzy search; see _search for the arguments.
+
+        Scoring is case-insensitive, so the lowercased query keys the cache.
+        """
+        q = query.lower()
+        return self.cache.get_or_compute(
+            self.index.get("source_hash", ""), (q, category, limit),
+            lambda: self._search(q, category, limit))
+
+    def _search(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        limit: int = 10,
     ) -> List[Dict[str, Any]]:
         """Fuzzy search across all or specific entry types.
 
@@ -0,0 +1,72 @@
+"""Streaming candlestick detection: one closed bar in, its detections out.
+
+The detector keeps only the last ``scanner.LOOKBACK + 1`` bars, which
+is all the history any detector (trend context and volume mean
+included) reads. Each bar runs the batch detectors over that
+fixed-size window, so per-bar cost is constant and every detection
+matches a batch ``scanner.scan`` of the same bars exactly.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
+
+import numpy as np
+
+from .scanner import (LOOKBACK, PATTERNS, PRICE_COLUMNS, TIME_COLUMNS, check_patterns, detect,
+                      detection, pattern_ids, volume_ratio)
+
+WINDOW = LOOKBACK + 1
+
+
+class StreamDetector:
+    """Ring buffer of recent bars plus the detectors to run as each one closes."""
+
+    def __init__(self, index_data: Dict[str, Any], patterns: Optional[Iterable[str]] = None,
+                 min_strength: float = 0.0):
+        selected = list(PATTERNS) if patterns is None else list(patterns)
+        check_patterns(selected)
+        self.patterns = selected
+        self.min_strength = min_strength
+        self.bars = 0  # bars seen so far; the next bar's index
+        self._ids = pattern_ids(index_data)
+        # Each bar is written at slot i and i + WINDOW, so the latest
+        # WINDOW bars are always one contiguous slice
+        self._buf = {name: np.zeros(2 * WINDOW) for name in PRICE_COLUMNS + ("volume",)}
+
+    def update(self, bar: Mapping[str, Any]) -> List[Dict[str, Any]]:
+        """Add one closed bar; return the patterns completing on it.
+
+        ``bar`` needs open/high/low/close; volume and a time label
+        (any of scanner.TIME_COLUMNS) are optional.
+        """
+        values = {name: float(bar[name]) for name in PRICE_COLUMNS}
+        values["volume"] = float(bar["volume"]) if bar.get("volume") is not None else np.nan
+        slot = self.bars % WINDOW
+        for name, value in values.items():
+            buf = self._buf[name]
+            buf[slot] = buf[slot + WINDOW] = value
+        index = self.bars
+        self.bars += 1
+
+        end = slot + WINDOW + 1
+        start = end - min(self.bars, WINDOW)
+        # A pattern can only complete once its candle_count bars have closed
+        ready = [slug for slug in self.patterns if PATTERNS[slug][0] <= self.bars]
+        window = {name: buf[start:end] for name, buf in self._buf.items()}
+        results = detect(window["open"], window["high"], window["low"], window["close"], ready)
+        time = next((bar[name] for name in TIME_COLUMNS if bar.get(name) is not None), None)
+        ratio = None
+        hits = []
+        for slug in ready:
+            mask, strength = results[slug]
+            if mask[-1] and strength[-1] >= self.min_strength:
+                if ratio is None:
+                    ratio = volume_ratio(window["volume"])[-1]
+                hits.append(detection(slug, index, self._ids[slug], strength[-1], time, ratio))
+        return hits
+
+    def feed(self, bars: Iterable[Mapping[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Detections for each bar of an iterator, yielded as its bars arrive."""
+        for bar in bars:
+            yield from self.update(bar)
+
@@ -0,0 +1,40 @@
+"""Shared fixtures: OHLCV CSV writers for the scan-dir and backtest tests."""
+
+import csv
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+# Add the skill root to path
+SKILL_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(SKILL_DIR))
+
+
+@pytest.fixture
+def write_good() -> Callable[..., None]:
+    """Writes ``bars`` synthetic OHLCV rows with a date column to a path."""
+    pytest.importorskip("numpy")
+    from engine.bench import synthetic_bars
+
+    def write(path: Path, bars: int = 500) -> None:
+        data = synthetic_bars(bars, seed=1)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["date", "open", "high", "low", "close", "volume"])
+            columns = [data[k].tolist() for k in ("open", "high", "low", "close", "volume")]
+            for i, row in enumerate(zip(*columns)):
+                writer.writerow([f"d{i}", *row])
+
+    return write
+
+
+@pytest.fixture
+def write_ragged() -> Callable[[Path], None]:
+    """Writes a CSV whose third line is one field short."""
+    def write(path: Path) -> None:
+        path.write_text("open,high,low,close,volume\n1,2,0.5,1.5,100\n1,2,0.5,1.5\n",
+                        encoding="utf-8")
+
+    return write
@@ -0,0 +1,42 @@
+"""Reliability backtest: error paths of the backtest command."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+SKILL_DIR = Path(__file__).parent.parent
+
+
+def _backtest(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-m", "engine", "backtest", *args],
+                          cwd=SKILL_DIR, capture_output=True, text=True, timeout=120)
+
+
+def test_backtest_reports_ragged_file_and_scores_the_rest(tmp_path, write_good, write_ragged):
+    write_good(tmp_path / "GOOD.csv", bars=2000)
+    write_ragged(tmp_path / "RAGGED.csv")
+
+    proc = _backtest(str(tmp_path), "--no-cache", "--dry-run")
+
+    assert proc.returncode == 0, proc.stderr
+    result = json.loads(proc.stdout)
+    assert result["status"] == "ok"
+    assert result["errors"] == [{"file": str(tmp_path / "RAGGED.csv"),
+                                 "error": f"{tmp_path / 'RAGGED.csv'}:3: expected 5 fields, got 4"}]
+    assert result["datasets"] == 1
+    assert result["bars"] == 2000
+    assert result["reliability_path"] is None
+
+
+def test_backtest_rejects_grade_horizon_outside_horizons(tmp_path, write_good):
+    write_good(tmp_path / "GOOD.csv")
+
+    proc = _backtest(str(tmp_path), "--horizons", "1,10", "--no-cache", "--dry-run")
+
+    assert proc.returncode == 2
+    assert json.loads(proc.stdout)["status"] == "error"
@@ -0,0 +1,51 @@
+"""Multi-symbol scan-dir: per-file failures are reported, not fatal."""
+
+import csv
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from engine.bulk import scan_directory
+
+SKILL_DIR = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def index_data():
+    return json.loads((SKILL_DIR / "data" / "index.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_scan_dir_reports_ragged_file_and_keeps_good_rows(tmp_path, index_data, jobs,
+                                                          write_good, write_ragged):
+    bars_dir = tmp_path / "bars"
+    bars_dir.mkdir()
+    write_good(bars_dir / "GOOD.csv")
+    write_ragged(bars_dir / "RAGGED.csv")
+    out = tmp_path / "detections.csv"
+
+    summary = scan_directory(bars_dir, index_data, out, cache_dir=tmp_path / "cache", jobs=jobs)
+
+    assert summary["errors"] == [
+        {"symbol": "RAGGED", "error": f"{bars_dir / 'RAGGED.csv'}:3: expected 5 fields, got 4"}
+    ]
+    assert summary["symbols"] == 1
+    assert summary["bars"] == 500
+    with open(out, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows and {row["symbol"] for row in rows} == {"GOOD"}
+    assert len(rows) == summary["detections"]
+
+
+def test_scan_dir_raises_engine_errors(tmp_path, index_data, write_good, monkeypatch):
+    def broken(*args):
+        raise TypeError("detector bug")
+
+    monkeypatch.setattr("engine.bulk.detect", broken)
+    write_good(tmp_path / "GOOD.csv")
+
+    with pytest.raises(TypeError, match="detector bug"):
+        scan_directory(tmp_path, index_data, tmp_path / "out" / "detections.csv")
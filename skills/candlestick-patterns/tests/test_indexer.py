@@ -0,0 +1,34 @@
+"""Index build: a parallel build matches the serial one."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SKILL_DIR = Path(__file__).parent.parent
+
+# Spawned workers get their own hash seed, so set iteration order differs
+# from the parent's; fork would inherit it and hide the difference.
+_SPAWN_BUILD = """
+import json, multiprocessing, sys
+from dataclasses import asdict
+from pathlib import Path
+from engine.indexer import build_index
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method("spawn")
+    raw = Path("data") / "raw"
+    builds = []
+    for jobs in (1, 4):
+        index = asdict(build_index(raw, jobs=jobs))
+        index.pop("generated_at")
+        builds.append(json.dumps(index))
+    sys.exit(0 if builds[0] == builds[1] else 1)
+"""
+
+
+def test_parallel_build_matches_serial_under_spawn():
+    proc = subprocess.run([sys.executable, "-c", _SPAWN_BUILD], cwd=SKILL_DIR,
+                          env={**os.environ, "PYTHONHASHSEED": "random"},
+                          capture_output=True, text=True, timeout=300)
+    assert proc.returncode == 0, proc.stderr or "parallel index differs from serial"
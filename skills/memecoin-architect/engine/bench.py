@@ -0,0 +1,293 @@
+"""Synthetic skill-tree corpus, engine timings and baseline comparison."""
+from __future__ import annotations
+
+import json
+import math
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from .indexer import _source_items, build_index, check_index_freshness
+
+# Corpus multiples of the shipped skill tree (1x = same file counts and sizes)
+DEFAULT_SCALES = (1, 10)
+# A percentile regresses when it is this much slower than the baseline...
+DEFAULT_TOLERANCE = 0.25
+# ...and at least this many ms slower (sub-ms jitter never fails a run)
+NOISE_FLOOR_MS = 0.5
+COMPARED_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+# Entries extracted per pass (spread evenly over the index)
+EXTRACT_SAMPLE = 200
+
+DEFAULT_QUERIES = ("burn", "treasury vault", "governance", "dashboard", "deploy", "liquidity")
+MCP_CALLS = (
+    ("memecoin_search", {"query": "burn"}),
+    ("memecoin_extract", {"entry_id": "contracts/burn_controller"}),
+    ("memecoin_list_templates", {}),
+    ("memecoin_index_status", {}),
+)
+
+_WORDS = (
+    "token", "burn", "treasury", "liquidity", "vault", "governance", "multisig", "supply",
+    "holder", "launch", "pool", "fee", "authority", "emergency", "dashboard", "security",
+)
+_ENTRY_KINDS = ("sections", "templates", "contracts", "scripts")
+
+
+def _prose(rng: random.Random, sentences: int) -> str:
+    return " ".join(" ".join(rng.choices(_WORDS, k=rng.randint(8, 16))).capitalize() + "."
+                    for _ in range(sentences))
+
+
+def _fill(head: str, line: Callable[[int], str], foot: str, target_bytes: int) -> str:
+    """``head``, then ``line(n)`` for n = 0, 1, ... until ``target_bytes``, then ``foot``."""
+    parts, size, n = [head], len(head) + len(foot), 0
+    while size < target_bytes:
+        text = line(n)
+        parts.append(text)
+        size += len(text)
+        n += 1
+    return "".join(parts) + foot
+
+
+def _reference(rng: random.Random, number: int, target_bytes: int) -> str:
+    """Reference module: heading hierarchy with prose and code fences."""
+    return _fill(
+        f"# Module {number}: {rng.choice(_WORDS).title()} Design\n\n{_prose(rng, 3)}\n",
+        lambda n: (f"\n## {rng.choice(_WORDS).title()} {n}\n\n{_prose(rng, rng.randint(2, 6))}\n"
+                   + ("\n```rust\nrequire!(amount > 0, Error::Invalid);\n```\n"
+                      if rng.random() < 0.3 else "")),
+        "", target_bytes)
+
+
+def _program(rng: random.Random, number: int, target_bytes: int) -> str:
+    """Anchor program: instructions, an accounts struct, an event and errors."""
+    name = f"synth_program_{number:03d}"
+    return _fill(
+        f"use anchor_lang::prelude::*;\n\n#[program]\npub mod {name} {{\n    use super::*;\n",
+        lambda n: (f"\n    pub fn {rng.choice(_WORDS)}_{n}(ctx: Context<Update>, amount: u64)"
+                   " -> Result<()> {\n        require!(amount > 0, SynthError::Invalid);\n"
+                   "        Ok(())\n    }\n"),
+        "}\n\n#[derive(Accounts)]\npub struct Update<'info> {\n"
+        "    pub authority: Signer<'info>,\n}\n\n#[event]\npub struct Updated {\n"
+        "    pub amount: u64,\n}\n\n#[error_code]\npub enum SynthError {\n    Invalid,\n}\n",
+        target_bytes)
+
+
+def _template(rng: random.Random, number: int, target_bytes: int) -> str:
+    """Aura component: imports, an exported component and JSX rows."""
+    name = f"Synth{rng.choice(_WORDS).title()}{number}"
+    return _fill(
+        f"import {{ GlassCard }} from \"@/components/GlassCard\";\n\n"
+             f"export default function {name}() {{\n  return (\n    <GlassCard>\n",
+        lambda n: f"      <p className=\"text-sm\">{rng.choice(_WORDS)} {n}</p>\n",
+        "    </GlassCard>\n  );\n}\n", target_bytes)
+
+
+def _script(rng: random.Random, number: int, target_bytes: int) -> str:
+    """Shell script with a leading description comment."""
+    return _fill(
+        f"#!/usr/bin/env bash\n# Synthetic {rng.choice(_WORDS)} step {number}\nset -euo pipefail\n",
+        lambda n: f"echo \"{rng.choice(_WORDS)} {n}\"\n", "", target_bytes)
+
+
+# Index field -> (synthetic path pattern, generator)
+_GENERATORS = {
+    "sections": ("references/synthetic-{:04d}.md", _reference),
+    "contracts": ("scripts/anchor_contracts/synth_program_{:04d}.rs", _program),
+    "templates": ("templates/aura/components/synth/Synth{:04d}.tsx", _template),
+    "scripts": ("scripts/deploy/synth_{:04d}.sh", _script),
+}
+
+
+def _corpus_dir(root: Path) -> Path:
+    """Where build_index reads a corpus rooted at ``root`` (the skill tree itself)."""
+    return root
+
+
+def generate_corpus(root: Path, scale: int, shipped_dir: Path,
+                    seed: int = 0) -> Dict[str, int]:
+    """Write ``scale`` times the shipped per-kind file counts/bytes under ``root``."""
+    shipped: Dict[str, List[int]] = {kind: [] for kind in _GENERATORS}
+    for kind, path in _source_items(shipped_dir):
+        shipped[kind].append(path.stat().st_size)
+    rng = random.Random(seed)
+    files = total = 0
+    for kind, (pattern, generate) in _GENERATORS.items():
+        sizes = shipped[kind] or [4_000]
+        per_file = sum(sizes) // len(sizes)
+        for i in range(len(sizes) * scale):
+            path = root / pattern.format(i)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            data = generate(rng, i, per_file).encode("utf-8")
+            path.write_bytes(data)
+            files += 1
+            total += len(data)
+    return {"files": files, "bytes": total}
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, Any]:
+    """Nearest-rank p50/p95/p99 and mean, in ms, of timings in seconds."""
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return round(ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)] * 1000, 3)
+
+    return {
+        "n": len(ordered),
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+    }
+
+
+def _sample_ids(index_data: Dict[str, Any]) -> List[str]:
+    ids = [key for name in _ENTRY_KINDS for key in index_data.get(name, {})]
+    step = max(len(ids) // EXTRACT_SAMPLE, 1)
+    return ids[::step][:EXTRACT_SAMPLE]
+
+
+def bench_corpus(root: Path, repeat: int = 3,
+                 queries: Sequence[str] = DEFAULT_QUERIES) -> Dict[str, Any]:
+    """Time build_index, check_index, search and extraction over one corpus."""
+    from dataclasses import asdict
+
+    from .extractor import Extractor
+    from .searcher import Searcher
+
+    corpus_dir = _corpus_dir(root)
+    built: Dict[str, Any] = {}
+
+    def _build() -> None:
+        built["index"] = build_index(corpus_dir)
+
+    timings: Dict[str, Any] = {"build_index": summarize(_time(_build, repeat))}
+    index = built["index"]
+    timings["check_index"] = summarize(
+        _time(lambda: check_index_freshness(index, corpus_dir), repeat))
+
+    index_data = asdict(index)
+    searcher = Searcher(index_data)
+    timings["search_cold"] = summarize([_time(lambda: searcher.search(q), 1)[0] for q in queries])
+    timings["search_warm"] = summarize(
+        [t for q in queries for t in _time(lambda: searcher.search(q), repeat)])
+
+    extractor = Extractor(index_data, root)
+    ids = _sample_ids(index_data)
+    misses, cold = 0, []
+    for entry_id in ids:
+        start = time.perf_counter()
+        misses += extractor.extract(entry_id) is None
+        cold.append(time.perf_counter() - start)
+    timings["extract_cold"] = summarize(cold)
+    timings["extract_warm"] = summarize(
+        [t for i in ids * max(repeat, 1) for t in _time(lambda: extractor.extract(i), 1)])
+    entries = sum(len(index_data.get(name, {})) for name in _ENTRY_KINDS)
+    return {"entries": entries, "extract_misses": misses, "timings": timings}
+
+
+def bench_mcp_roundtrips(skill_dir: Path, calls: Sequence[Tuple[str, Dict[str, Any]]] = MCP_CALLS,
+                         repeat: int = 3) -> Dict[str, Any]:
+    """Time one-at-a-time tools/call round trips through ``engine serve``."""
+    # Round trips go to a throwaway token log, not the user's usage stats
+    log_dir = tempfile.TemporaryDirectory()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "engine", "serve", "--watch-interval", "0",
+         "--log-path", str(Path(log_dir.name) / "token_log.jsonl")],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        text=True, bufsize=1, cwd=str(skill_dir),
+    )
+    req_id = 0
+
+    def _request(method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        nonlocal req_id
+        req_id += 1
+        proc.stdin.write(json.dumps({"jsonrpc": "2.0", "id": req_id,
+                                     "method": method, "params": params}) + "\n")
+        proc.stdin.flush()
+        return json.loads(proc.stdout.readline())
+
+    try:
+        _request("initialize", {})
+        timings = {}
+        errors = 0
+        for tool, arguments in calls:
+            samples = []
+            for _ in range(max(repeat, 1)):
+                start = time.perf_counter()
+                resp = _request("tools/call", {"name": tool, "arguments": arguments})
+                samples.append(time.perf_counter() - start)
+                errors += "error" in resp or bool(resp.get("result", {}).get("isError"))
+            timings[tool] = summarize(samples)
+    finally:
+        proc.stdin.close()
+        proc.wait(timeout=10)
+        log_dir.cleanup()
+    return {"errors": errors, "timings": timings}
+
+
+def run_suite(skill_dir: Path, scales: Sequence[int] = DEFAULT_SCALES, repeat: int = 3,
+              mcp: bool = True, seed: int = 0) -> Dict[str, Any]:
+    """Every benchmark at each corpus scale, plus MCP round trips on the real index.
+
+    The MCP server always serves the skill's own data/, so its timings
+    are taken once rather than per scale.
+    """
+    result: Dict[str, Any] = {"engine": skill_dir.name, "repeat": repeat,
+                              "corpora": {}, "timings": {}}
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            corpus = generate_corpus(root, scale, _corpus_dir(skill_dir), seed=seed)
+            measured = bench_corpus(root, repeat)
+        result["corpora"][f"{scale}x"] = dict(corpus, entries=measured["entries"],
+                                              extract_misses=measured["extract_misses"])
+        result["timings"][f"{scale}x"] = measured["timings"]
+    if mcp:
+        measured = bench_mcp_roundtrips(skill_dir, repeat=repeat)
+        result["mcp_errors"] = measured["errors"]
+        result["timings"]["mcp"] = measured["timings"]
+    return result
+
+
+def compare_to_baseline(result: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float = DEFAULT_TOLERANCE) -> List[Dict[str, Any]]:
+    """Percentiles in ``result`` slower than the same metric in ``baseline``.
+
+    Metrics missing from either side (a scale or tool not in both runs)
+    are skipped rather than treated as regressions.
+    """
+    regressions: List[Dict[str, Any]] = []
+
+    def walk(current: Dict[str, Any], reference: Dict[str, Any], path: str) -> None:
+        for key, value in current.items():
+            if key not in reference:
+                continue
+            ref = reference[key]
+            if isinstance(value, dict) and isinstance(ref, dict):
+                walk(value, ref, f"{path}.{key}" if path else key)
+            elif key in COMPARED_KEYS and value > ref * (1 + tolerance) \
+                    and value - ref >= NOISE_FLOOR_MS:
+                regressions.append({
+                    "metric": f"{path}.{key}",
+                    "baseline_ms": ref,
+                    "current_ms": value,
+                    "ratio": round(value / max(ref, 1e-9), 2),
+                })
+
+    walk(result.get("timings", {}), baseline.get("timings", {}), "")
+    return regressions
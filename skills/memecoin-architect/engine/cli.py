@@ -23,9 +23,10 @@ def _load_index(command: str = "unknown") -> Dict[str, Any]:
         _out({"status": "error", "command": command,
               "error": "Index not found. Run: python3 -m engine build-index"})
         sys.exit(2)
+    from .compact import load_index
     try:
-        with open(INDEX_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
+        # Lazy view over data/index.bin when it mirrors index.json
+        return load_index(INDEX_PATH)
     except json.JSONDecodeError as e:
         _out({"status": "error", "command": command,
               "error": f"Corrupt index JSON: {e}. Run: python3 -m engine build-index"})
@@ -43,7 +44,7 @@ def _tracker():
 
 def cmd_build_index(args: argparse.Namespace) -> None:
     from .indexer import build_index
-    idx = build_index(SKILL_DIR)
+    idx = build_index(SKILL_DIR, jobs=args.jobs)
     idx.save(INDEX_PATH)
     _out({
         "status": "ok",
@@ -226,9 +227,30 @@ def cmd_token_report(args: argparse.Namespace) -> None:
     _out({"status": "ok", "command": "token-report", **report})
 
 
+def cmd_bench(args: argparse.Namespace) -> None:
+    """Time the engine on synthetic corpora, optionally against a baseline."""
+    from .bench import compare_to_baseline, run_suite
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    result = run_suite(SKILL_DIR, scales=scales, repeat=args.repeat, mcp=not args.no_mcp)
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    regressions = []
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(result, baseline, args.tolerance)
+        result["regressions"] = regressions
+    misses = sum(c["extract_misses"] for c in result["corpora"].values())
+    ok = not regressions and not misses and not result.get("mcp_errors")
+    _out({"status": "ok" if ok else "error", "command": "bench", "result": result})
+    if not ok:
+        sys.exit(1)
+
+
 def cmd_serve(args: argparse.Namespace) -> None:
     from .mcp_server import run_server
-    run_server(SKILL_DIR, INDEX_PATH, LOG_PATH)
+    run_server(SKILL_DIR, INDEX_PATH, args.log_path, watch_interval=args.watch_interval,
+               search_cache_bytes=int(args.search_cache_mb * 1024 * 1024))
 
 
 # ---------------------------------------------------------------------------
@@ -243,7 +265,9 @@ def main() -> None:
     sub = parser.add_subparsers(dest="command", required=True)
 
     # build-index
-    sub.add_parser("build-index", help="Parse all skill files and build the JSON index")
+    p = sub.add_parser("build-index", help="Parse all skill files and build the JSON index")
+    p.add_argument("--jobs", type=int, default=1,
+                   help="Parse files in N worker processes (0 = one per CPU)")
 
     # check-index
     sub.add_parser("check-index", help="Validate index integrity and freshness")
@@ -293,8 +317,26 @@ def main() -> None:
     # token-report
     sub.add_parser("token-report", help="Show cumulative token savings report")
 
+    # bench
+    p = sub.add_parser("bench", help="Time build/check/search/extract/MCP on synthetic corpora")
+    p.add_argument("--scales", default="1,10",
+                   help="Comma-separated corpus multiples of the skill tree (e.g. 1,10,100)")
+    p.add_argument("--repeat", type=int, default=3, help="Samples per timing")
+    p.add_argument("--no-mcp", action="store_true", help="Skip MCP round trips")
+    p.add_argument("--baseline", default=None,
+                   help="Baseline JSON to compare against; exits 1 on regressions")
+    p.add_argument("--save-baseline", default=None, help="Write this run's result as JSON")
+    p.add_argument("--tolerance", type=float, default=0.25,
+                   help="Allowed slowdown vs the baseline (0.25 = 25%%)")
+
     # serve
-    sub.add_parser("serve", help="Start MCP stdio server")
+    p = sub.add_parser("serve", help="Start MCP stdio server")
+    p.add_argument("--watch-interval", type=float, default=2.0,
+                   help="Seconds between source change polls; 0 disables hot reload")
+    p.add_argument("--search-cache-mb", type=float, default=4.0,
+                   help="Memory cap for cached search results (default: 4; 0 disables)")
+    p.add_argument("--log-path", type=Path, default=LOG_PATH,
+                   help="Token usage log for tool calls (default: data/token_log.jsonl)")
 
     args = parser.parse_args()
 
@@ -310,6 +352,7 @@ def main() -> None:
         "generate-manifest": cmd_generate_manifest,
         "apply-brief": cmd_apply_brief,
         "token-report": cmd_token_report,
+        "bench": cmd_bench,
         "serve": cmd_serve,
     }
 
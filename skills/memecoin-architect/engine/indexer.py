@@ -4,9 +4,10 @@ from __future__ import annotations
 import hashlib
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from .schema import Index
 
@@ -106,14 +107,14 @@ def _detect_component_type(rel_path: str) -> str:
 # ---------------------------------------------------------------------------
 # Markdown indexer
 # ---------------------------------------------------------------------------
-def _index_markdown(
-    file_path: Path, skill_dir: Path, sections: Dict[str, Any], file_hash: str
-) -> Dict[str, Any]:
-    """Index a markdown file by heading structure."""
+def _index_markdown(file_path: Path, skill_dir: Path) -> List[Dict[str, Any]]:
+    """Index a markdown file by heading structure.
+
+    Section IDs are not yet deduplicated; see _add_sections.
+    """
     content = file_path.read_text(encoding="utf-8")
     lines = content.split("\n")
     rel = str(file_path.relative_to(skill_dir))
-    file_bytes = len(content.encode("utf-8"))
 
     # Determine category
     if "references/" in rel:
@@ -146,21 +147,14 @@ def _index_markdown(
         else:
             sec["end_line"] = len(lines) - 1
 
-    section_ids: List[str] = []
+    records: List[Dict[str, Any]] = []
     for sec in raw_sections:
         sec_id = f"{category}/{_slugify(Path(rel).stem)}/{sec['slug']}"
-        # Deduplicate
-        base_id = sec_id
-        counter = 2
-        while sec_id in sections:
-            sec_id = f"{base_id}-{counter}"
-            counter += 1
-
         byte_off = _byte_offset_of_line(content, sec["start_line"])
         byte_len = _byte_length_of_range(content, sec["start_line"], sec["end_line"])
         summary = _extract_first_paragraph(lines, sec["start_line"] + 1)
 
-        sections[sec_id] = {
+        records.append({
             "id": sec_id,
             "title": sec["title"],
             "level": sec["level"],
@@ -171,17 +165,24 @@ def _index_markdown(
             "byte_length": byte_len,
             "summary": summary,
             "category": category,
-        }
-        section_ids.append(sec_id)
+        })
 
-    return {
-        "file": rel,
-        "category": category,
-        "size_bytes": file_bytes,
-        "line_count": len(lines),
-        "section_ids": section_ids,
-        "hash": file_hash,
-    }
+    return records
+
+
+def _add_sections(sections: Dict[str, Any], records: List[Dict[str, Any]]) -> List[str]:
+    """Add _index_markdown records to ``sections``, suffixing duplicate IDs."""
+    section_ids: List[str] = []
+    for rec in records:
+        # Deduplicate
+        sec_id = base_id = rec["id"]
+        counter = 2
+        while sec_id in sections:
+            sec_id = f"{base_id}-{counter}"
+            counter += 1
+        sections[sec_id] = dict(rec, id=sec_id)
+        section_ids.append(sec_id)
+    return section_ids
 
 
 # ---------------------------------------------------------------------------
@@ -375,18 +376,48 @@ def _index_script(
 # ---------------------------------------------------------------------------
 # Main index builder
 # ---------------------------------------------------------------------------
-def build_index(skill_dir: Path) -> Index:
-    """Build the complete index from all skill content."""
-    index = Index(
-        version="1.0.0",
-        generated_at=datetime.now(timezone.utc).isoformat(),
-    )
+def _index_file(kind: str, file_path: Path, skill_dir: Path) -> Dict[str, Any]:
+    """Hash and index one source file; ``kind`` is the Index field it feeds."""
+    content = file_path.read_bytes()
+    file_hash = hashlib.sha256(content).hexdigest()
+    records: Any
+    if kind == "sections":
+        records = _index_markdown(file_path, skill_dir)
+    else:
+        records = {}
+        _FILE_INDEXERS[kind](file_path, skill_dir, records, file_hash)
+    return {"kind": kind, "hash": file_hash, "size": len(content), "records": records}
 
-    all_hashes: List[str] = []
-    total_bytes = 0
-    total_files = 0
 
-    # 1. Index markdown files (references + SKILL.md)
+_FILE_INDEXERS = {
+    "contracts": _index_rust,
+    "templates": _index_template,
+    "scripts": _index_script,
+}
+
+
+def _map_files(parse: Callable[..., Any], items: List[Tuple[Any, ...]], jobs: int) -> List[Any]:
+    """Apply ``parse`` to each argument tuple; results come back in input order.
+
+    With ``jobs`` > 1 (0 = one per CPU) the calls run in a process pool.
+    build_index reduces the results in order, so the index is identical
+    to a serial build.
+    """
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs > 1 and len(items) > 1:
+        workers = min(jobs, len(items))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(parse, *zip(*items),
+                                 chunksize=max(1, len(items) // (workers * 4))))
+    return [parse(*args) for args in items]
+
+
+def _source_items(skill_dir: Path) -> List[Tuple[str, Path]]:
+    """(Index field, path) of every indexed file, in build order."""
+    items: List[Tuple[str, Path]] = []
+
+    # 1. Markdown files (references + SKILL.md)
     md_files: List[Path] = []
     refs_dir = skill_dir / "references"
     if refs_dir.exists():
@@ -394,39 +425,22 @@ def build_index(skill_dir: Path) -> Index:
     skill_md = skill_dir / "SKILL.md"
     if skill_md.exists():
         md_files.append(skill_md)
+    items.extend(("sections", md_file) for md_file in md_files)
 
-    for md_file in md_files:
-        content = md_file.read_bytes()
-        file_hash = hashlib.sha256(content).hexdigest()
-        all_hashes.append(file_hash)
-        total_bytes += len(content)
-        total_files += 1
-        _index_markdown(md_file, skill_dir, index.sections, file_hash)
-
-    # 2. Index Anchor Rust contracts
+    # 2. Anchor Rust contracts
     contracts_dir = skill_dir / "scripts" / "anchor_contracts"
     if contracts_dir.exists():
-        for rs_file in sorted(contracts_dir.glob("*.rs")):
-            content = rs_file.read_bytes()
-            file_hash = hashlib.sha256(content).hexdigest()
-            all_hashes.append(file_hash)
-            total_bytes += len(content)
-            total_files += 1
-            _index_rust(rs_file, skill_dir, index.contracts, file_hash)
-
-    # 3. Index Aura templates (TSX / TS / CSS)
+        items.extend(("contracts", rs_file)
+                     for rs_file in sorted(contracts_dir.glob("*.rs")))
+
+    # 3. Aura templates (TSX / TS / CSS)
     templates_dir = skill_dir / "templates" / "aura"
     if templates_dir.exists():
         for ext in ("**/*.tsx", "**/*.ts", "**/*.css"):
-            for tmpl_file in sorted(templates_dir.glob(ext)):
-                content = tmpl_file.read_bytes()
-                file_hash = hashlib.sha256(content).hexdigest()
-                all_hashes.append(file_hash)
-                total_bytes += len(content)
-                total_files += 1
-                _index_template(tmpl_file, skill_dir, index.templates, file_hash)
-
-    # 4. Index scripts (deploy, security, dex, marketing)
+            items.extend(("templates", tmpl_file)
+                         for tmpl_file in sorted(templates_dir.glob(ext)))
+
+    # 4. Scripts (deploy, security, dex, marketing)
     scripts_dir = skill_dir / "scripts"
     if scripts_dir.exists():
         for subdir in ("deploy", "security", "dex", "marketing"):
@@ -435,12 +449,39 @@ def build_index(skill_dir: Path) -> Index:
                 continue
             for script_file in sorted(sub_path.iterdir()):
                 if script_file.is_file() and not script_file.name.startswith("."):
-                    content = script_file.read_bytes()
-                    file_hash = hashlib.sha256(content).hexdigest()
-                    all_hashes.append(file_hash)
-                    total_bytes += len(content)
-                    total_files += 1
-                    _index_script(script_file, skill_dir, index.scripts, file_hash)
+                    items.append(("scripts", script_file))
+    return items
+
+
+def source_files(skill_dir: Path) -> List[Path]:
+    """Every file build_index reads (polled by the MCP server's watcher)."""
+    return [path for _, path in _source_items(skill_dir)]
+
+
+def build_index(skill_dir: Path, jobs: int = 1) -> Index:
+    """Build the complete index from all skill content.
+
+    Files are indexed in ``jobs`` worker processes (1 = serial, 0 = per
+    CPU) and merged in discovery order.
+    """
+    index = Index(
+        version="1.0.0",
+        generated_at=datetime.now(timezone.utc).isoformat(),
+    )
+
+    all_hashes: List[str] = []
+    total_bytes = 0
+    total_files = 0
+    items = [(kind, path, skill_dir) for kind, path in _source_items(skill_dir)]
+
+    for frag in _map_files(_index_file, items, jobs):
+        all_hashes.append(frag["hash"])
+        total_bytes += frag["size"]
+        total_files += 1
+        if frag["kind"] == "sections":
+            _add_sections(index.sections, frag["records"])
+        else:
+            getattr(index, frag["kind"]).update(frag["records"])
 
     # Compute combined source hash
     combined = "".join(sorted(all_hashes))
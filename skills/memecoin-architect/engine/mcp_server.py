@@ -3,9 +3,13 @@ from __future__ import annotations
 
 import json
 import sys
+import threading
 from pathlib import Path
 from typing import Any, Dict
 
+from .searcher import RESULT_CACHE_BYTES
+from .watcher import DEFAULT_INTERVAL, SourceWatcher
+
 TOOLS = [
     {
         "name": "memecoin_search",
@@ -95,7 +99,9 @@ TOOLS = [
 class MemecoinMCPServer:
     """Minimal MCP server over stdio."""
 
-    def __init__(self, skill_dir: Path, index_path: Path, log_path: Path):
+    def __init__(self, skill_dir: Path, index_path: Path, log_path: Path,
+                 watch_interval: float = DEFAULT_INTERVAL,
+                 search_cache_bytes: int = RESULT_CACHE_BYTES):
         self.skill_dir = skill_dir
         self.index_path = index_path
         self.log_path = log_path
@@ -103,6 +109,13 @@ class MemecoinMCPServer:
         self.extractor = None
         self.searcher = None
         self.tracker = None
+        self.generation = 0  # Bumped on every index swap; reported in tool responses
+        self.watch_interval = watch_interval  # 0 disables the source watcher
+        self.search_cache_bytes = search_cache_bytes
+        self.watcher = None
+        # Held for each tool call and each swap, so a background rebuild
+        # is installed between calls, never during one
+        self._state_lock = threading.Lock()
 
     def _ensure_loaded(self):
         if self.index is not None:
@@ -116,9 +129,9 @@ class MemecoinMCPServer:
             except (OSError, IOError):
                 pass
 
+        from .compact import load_index
         try:
-            with open(self.index_path, "r", encoding="utf-8") as f:
-                self.index = json.load(f)
+            index = load_index(self.index_path)
         except (json.JSONDecodeError, FileNotFoundError, OSError):
             from .indexer import build_index
             from dataclasses import asdict
@@ -127,16 +140,46 @@ class MemecoinMCPServer:
                 idx.save(self.index_path)
             except (OSError, IOError):
                 pass
-            self.index = asdict(idx)
+            index = asdict(idx)
 
-        from .extractor import Extractor
-        from .searcher import Searcher
         from .tracker import TokenTracker
 
-        self.extractor = Extractor(self.index, self.skill_dir)
-        self.searcher = Searcher(self.index)
+        self._install(index)
         self.tracker = TokenTracker(self.log_path)
 
+    def _install(self, index: Dict[str, Any]) -> None:
+        """Replace the index and its extractor/searcher (caller holds _state_lock)."""
+        from .extractor import Extractor
+        from .searcher import ResultCache, Searcher
+
+        self.extractor = Extractor(index, self.skill_dir)
+        # The result cache outlives the swap: its counters carry over and the
+        # new source_hash drops entries computed against the old index
+        if self.searcher is not None:
+            cache = self.searcher.cache
+        else:
+            cache = ResultCache(self.search_cache_bytes)
+        self.searcher = Searcher(index, cache=cache)
+        self.index = index
+        self.generation += 1
+
+    def _on_sources_changed(self) -> None:
+        """Watcher callback: rebuild, save and swap in the index.
+
+        The build runs without the lock; the swap then waits for any
+        in-flight call, which finishes against the index it started with.
+        """
+        from dataclasses import asdict
+        from .indexer import build_index
+        idx = build_index(self.skill_dir)
+        try:
+            idx.save(self.index_path)
+        except (OSError, IOError):
+            pass
+        with self._state_lock:
+            self._ensure_loaded()
+            self._install(asdict(idx))
+
     def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
         method = request.get("method", "")
         req_id = request.get("id")
@@ -161,21 +204,23 @@ class MemecoinMCPServer:
         return self._error(req_id, -32601, f"Method not found: {method}")
 
     def _call_tool(self, req_id: Any, params: Dict[str, Any]) -> Dict[str, Any]:
-        self._ensure_loaded()
-        tool_name = params.get("name", "")
-        args = params.get("arguments", {})
+        with self._state_lock:
+            self._ensure_loaded()
+            tool_name = params.get("name", "")
+            args = params.get("arguments", {})
 
-        try:
-            result = self._dispatch(tool_name, args)
-            text = json.dumps(result, indent=2, ensure_ascii=False)
-            return self._response(req_id, {
-                "content": [{"type": "text", "text": text}],
-            })
-        except Exception as e:
-            return self._response(req_id, {
-                "content": [{"type": "text", "text": f"Error: {e}"}],
-                "isError": True,
-            })
+            try:
+                result = self._dispatch(tool_name, args)
+                text = json.dumps(result, indent=2, ensure_ascii=False)
+                return self._response(req_id, {
+                    "content": [{"type": "text", "text": text}],
+                    "_meta": {"index_generation": self.generation},
+                })
+            except Exception as e:
+                return self._response(req_id, {
+                    "content": [{"type": "text", "text": f"Error: {e}"}],
+                    "isError": True,
+                })
 
     def _dispatch(self, tool_name: str, args: Dict[str, Any]) -> Any:
         if tool_name == "memecoin_search":
@@ -231,6 +276,10 @@ class MemecoinMCPServer:
                 "fresh": fresh,
                 "stats": self.index.get("stats", {}),
                 "generated_at": self.index.get("generated_at", ""),
+                "index_generation": self.generation,
+                "watching": self.watcher is not None,
+                "watcher_error": self.watcher.last_error if self.watcher else None,
+                "search_cache": self.searcher.cache.stats(),
             }
 
         raise ValueError(f"Unknown tool: {tool_name}")
@@ -256,7 +305,25 @@ class MemecoinMCPServer:
         return {"jsonrpc": "2.0", "id": req_id, "error": {"code": code, "message": message}}
 
     def run(self):
-        """Main stdio loop."""
+        """Main stdio loop.
+
+        Unless ``watch_interval`` is 0, a background watcher rebuilds and
+        swaps in the index whenever a source file changes on disk.
+        """
+        if self.watch_interval > 0:
+            from .indexer import source_files
+            source_dir = self.skill_dir
+            self.watcher = SourceWatcher(lambda: source_files(source_dir),
+                                         self._on_sources_changed, self.watch_interval)
+            self.watcher.start()
+        try:
+            self._serve()
+        finally:
+            if self.watcher is not None:
+                self.watcher.stop()
+
+    def _serve(self) -> None:
+        """Answer JSON-RPC requests from stdin until EOF."""
         for line in sys.stdin:
             line = line.strip()
             if not line:
@@ -281,7 +348,10 @@ class MemecoinMCPServer:
                 sys.stdout.flush()
 
 
-def run_server(skill_dir: Path, index_path: Path, log_path: Path) -> None:
+def run_server(skill_dir: Path, index_path: Path, log_path: Path,
+               watch_interval: float = DEFAULT_INTERVAL,
+               search_cache_bytes: int = RESULT_CACHE_BYTES) -> None:
     """Entry point called by cli.py serve command."""
-    server = MemecoinMCPServer(skill_dir, index_path, log_path)
+    server = MemecoinMCPServer(skill_dir, index_path, log_path, watch_interval,
+                               search_cache_bytes)
     server.run()
@@ -6,6 +6,8 @@ from dataclasses import dataclass, field, asdict
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from .compact import save_compact
+
 
 @dataclass
 class Section:
@@ -76,8 +78,10 @@ class Index:
 
     def save(self, path: Path) -> None:
         path.parent.mkdir(parents=True, exist_ok=True)
+        data = asdict(self)
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(asdict(self), f, indent=2, ensure_ascii=False)
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        save_compact(path, data)
 
     @classmethod
     def load(cls, path: Path) -> "Index":
@@ -1,11 +1,16 @@
 """Token usage tracking and cost reporting."""
 from __future__ import annotations
 
+import atexit
 import json
+import os
 import sys
+import tempfile
+import threading
+import weakref
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 # Platform-safe file locking
 if sys.platform == "win32":
@@ -29,13 +34,121 @@ else:
     def _unlock(f: Any) -> None:
         fcntl.flock(f.fileno(), fcntl.LOCK_UN)
 
+# Buffered entries are appended once any threshold is reached, and at exit
+FLUSH_ENTRIES = 64
+FLUSH_BYTES = 64 * 1024
+FLUSH_INTERVAL_S = 2.0
+
+# The live log is rotated past this size; older raw segments beyond
+# KEEP_SEGMENTS are compacted into a single aggregate record
+ROTATE_BYTES = 8 * 1024 * 1024
+KEEP_SEGMENTS = 3
+
+SNAPSHOT_VERSION = 1
+
+# Trackers with entries that may still be buffered; flushed once at exit.
+# A tracker holding a buffer is kept alive by its flush timer.
+_LIVE: "weakref.WeakSet[TokenTracker]" = weakref.WeakSet()
+
+
+def _flush_live() -> None:
+    for tracker in list(_LIVE):
+        try:
+            tracker.flush()
+        except OSError:
+            pass  # Log directory went away (e.g. a temporary run)
+
+
+atexit.register(_flush_live)
+
+
+def _empty() -> Dict[str, Any]:
+    return {"used": 0, "saved": 0, "ops": {}}
+
+
+def _merge(into: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    into["used"] += other.get("used", 0)
+    into["saved"] += other.get("saved", 0)
+    for op, n in other.get("ops", {}).items():
+        into["ops"][op] = into["ops"].get(op, 0) + n
+    return into
+
+
+def _fold(data: bytes, agg: Dict[str, Any]) -> int:
+    """Fold complete JSONL lines of ``data`` into ``agg``; return bytes consumed."""
+    end = data.rfind(b"\n") + 1
+    for line in data[:end].splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        agg["used"] += entry.get("used", 0)
+        agg["saved"] += entry.get("saved", 0)
+        op = entry.get("op", "unknown")
+        agg["ops"][op] = agg["ops"].get(op, 0) + 1
+    return end
+
+
+def _aggregate_file(path: Path) -> Dict[str, Any]:
+    agg = _empty()
+    try:
+        with open(path, "rb") as f:
+            _fold(f.read(), agg)
+    except FileNotFoundError:
+        pass
+    return agg
+
+
+def _write_json(path: Path, data: Dict[str, Any]) -> None:
+    """Atomically replace ``path`` with ``data``."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
 
 class TokenTracker:
-    """Append-only JSONL logger for token savings (thread-safe via flock)."""
+    """Buffered JSONL logger for token savings.
+
+    Entries are buffered and appended in batches (appends serialized via
+    flock). report() folds only the bytes appended since the last
+    snapshot (``<log>.snapshot.json``). Past ``rotate_bytes`` the live log
+    becomes segment ``<log>.1.jsonl``; segments beyond ``keep_segments``
+    are compacted into ``<log>.compacted.json``.
+    """
 
-    def __init__(self, log_path: Path):
+    def __init__(self, log_path: Path, flush_entries: int = FLUSH_ENTRIES,
+                 flush_bytes: int = FLUSH_BYTES, flush_interval: float = FLUSH_INTERVAL_S,
+                 rotate_bytes: int = ROTATE_BYTES, keep_segments: int = KEEP_SEGMENTS):
         self.log_path = log_path
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_entries = flush_entries
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.keep_segments = keep_segments
+        stem, suffix = log_path.stem, log_path.suffix
+        self.snapshot_path = log_path.with_name(f"{stem}.snapshot.json")
+        self.compacted_path = log_path.with_name(f"{stem}.compacted.json")
+        self._segment_name = f"{stem}.{{}}{suffix}"
+        self._lock = threading.RLock()
+        self._buffer: List[str] = []
+        self._buffer_bytes = 0
+        self._timer: Optional[threading.Timer] = None
+        _LIVE.add(self)
+
+    def _segment(self, n: int) -> Path:
+        return self.log_path.with_name(self._segment_name.format(n))
 
     def log(self, operation: str, tokens_used: int, tokens_saved: int,
             details: Optional[Dict[str, Any]] = None) -> None:
@@ -46,36 +159,174 @@ class TokenTracker:
             "saved": tokens_saved,
             "details": details or {},
         }
-        with open(self.log_path, "a", encoding="utf-8") as f:
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._buffer.append(line)
+            self._buffer_bytes += len(line.encode("utf-8"))
+            if (len(self._buffer) >= self.flush_entries
+                    or self._buffer_bytes >= self.flush_bytes):
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Append buffered entries to the live log, rotating it if oversized."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._buffer:
+                return
+            data = "".join(self._buffer)
+            self._buffer.clear()
+            self._buffer_bytes = 0
+            size = self._append(data)
+            if self.rotate_bytes and size >= self.rotate_bytes:
+                self.rotate(min_bytes=self.rotate_bytes)
+
+    def close(self) -> None:
+        """Flush buffered entries; the tracker is no longer flushed at exit."""
+        self.flush()
+        _LIVE.discard(self)
+
+    def _is_live(self, f: Any) -> bool:
+        """Whether an open handle still refers to the live log (not rotated away)."""
+        try:
+            return os.fstat(f.fileno()).st_ino == os.stat(self.log_path).st_ino
+        except FileNotFoundError:
+            return False
+
+    def _append(self, data: str) -> int:
+        while True:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                _lock(f)
+                try:
+                    if not self._is_live(f):
+                        continue  # Rotated between open and lock; reopen
+                    f.write(data)
+                    f.flush()
+                    return f.tell()
+                finally:
+                    _unlock(f)
+
+    def _base_key(self) -> List[Any]:
+        """Identity of everything rotated out of the live log."""
+        key: List[Any] = []
+        for path in [self.compacted_path] + [self._segment(n) for n in
+                                             range(1, self.keep_segments + 1)]:
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            key.append([path.name, st.st_size, st.st_mtime_ns])
+        return key
+
+    def _load_snapshot(self) -> Dict[str, Any]:
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snap = json.load(f)
+            if snap.get("version") == SNAPSHOT_VERSION:
+                return snap
+        except (FileNotFoundError, json.JSONDecodeError, OSError, AttributeError):
+            pass
+        return {"version": SNAPSHOT_VERSION, "base_key": None, "base": _empty(),
+                "inode": None, "offset": 0, "live": _empty()}
+
+    def _refresh(self) -> Dict[str, Any]:
+        """Bring the snapshot up to the end of the live log (caller holds its flock)."""
+        snap = self._load_snapshot()
+        changed = False
+
+        base_key = self._base_key()
+        if snap["base_key"] != base_key:
+            # Segments changed behind our back (or no snapshot yet): rebuild
+            base = _empty()
+            try:
+                with open(self.compacted_path, "r", encoding="utf-8") as f:
+                    _merge(base, json.load(f))
+            except (FileNotFoundError, json.JSONDecodeError, OSError):
+                pass
+            for n in range(1, self.keep_segments + 1):
+                _merge(base, _aggregate_file(self._segment(n)))
+            snap["base"], snap["base_key"], changed = base, base_key, True
+
+        try:
+            st = self.log_path.stat()
+        except FileNotFoundError:
+            st = None
+        if st is None or st.st_ino != snap["inode"] or st.st_size < snap["offset"]:
+            # New or replaced live log: start over from its beginning
+            snap["inode"] = st.st_ino if st is not None else None
+            snap["offset"], snap["live"], changed = 0, _empty(), True
+        if st is not None and st.st_size > snap["offset"]:
+            with open(self.log_path, "rb") as f:
+                f.seek(snap["offset"])
+                consumed = _fold(f.read(), snap["live"])
+            if consumed:
+                snap["offset"] += consumed
+                changed = True
+
+        if changed:
+            try:
+                _write_json(self.snapshot_path, snap)
+            except OSError:
+                pass  # Read-only data dir: report still works, just not incrementally
+        return snap
+
+    def rotate(self, min_bytes: int = 0) -> None:
+        """Move the live log to segment 1 and compact segments past keep_segments."""
+        with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
             _lock(f)
             try:
-                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                # Another process may have rotated (or the log is still small)
+                if not self._is_live(f) or os.fstat(f.fileno()).st_size < min_bytes:
+                    return
+                snap = self._refresh()
+
+                retired = [self._segment(self.keep_segments)] if self.keep_segments else [self.log_path]
+                for path in retired:
+                    if path.exists():
+                        compacted = _empty()
+                        try:
+                            with open(self.compacted_path, "r", encoding="utf-8") as cf:
+                                _merge(compacted, json.load(cf))
+                        except (FileNotFoundError, json.JSONDecodeError):
+                            pass
+                        _write_json(self.compacted_path,
+                                    _merge(compacted, _aggregate_file(path)))
+                        path.unlink()
+                for n in range(self.keep_segments - 1, 0, -1):
+                    if self._segment(n).exists():
+                        os.replace(self._segment(n), self._segment(n + 1))
+                if self.keep_segments:
+                    os.replace(self.log_path, self._segment(1))
+
+                _merge(snap["base"], snap["live"])
+                snap.update(base_key=self._base_key(), inode=None, offset=0, live=_empty())
+                _write_json(self.snapshot_path, snap)
             finally:
                 _unlock(f)
 
     def report(self) -> Dict[str, Any]:
         """Generate cumulative usage report."""
-        if not self.log_path.exists():
-            return {"total_operations": 0, "total_tokens_used": 0,
-                    "total_tokens_saved": 0, "reduction_pct": 0}
-
-        total_used = 0
-        total_saved = 0
-        ops: Dict[str, int] = {}
-
-        with open(self.log_path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
+        self.flush()
+        with self._lock:
+            if not self.log_path.exists() and not self._base_key():
+                return {"total_operations": 0, "total_tokens_used": 0,
+                        "total_tokens_saved": 0, "reduction_pct": 0}
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                _lock(f)
                 try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                total_used += entry.get("used", 0)
-                total_saved += entry.get("saved", 0)
-                op = entry.get("op", "unknown")
-                ops[op] = ops.get(op, 0) + 1
+                    snap = self._refresh()
+                finally:
+                    _unlock(f)
+
+        totals = _merge(_merge(_empty(), snap["base"]), snap["live"])
+        total_used = totals["used"]
+        total_saved = totals["saved"]
+        ops: Dict[str, int] = totals["ops"]
 
         baseline = total_used + total_saved
         pct = round((total_saved / max(baseline, 1)) * 100, 1)
@@ -89,4 +340,3 @@ class TokenTracker:
             "reduction_pct": pct,
         }
 
-
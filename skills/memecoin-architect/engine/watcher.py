@@ -0,0 +1,83 @@
+"""Stat-polling source watcher for long-running servers.
+
+Polls ``os.stat`` of every source file (no inotify or other platform
+dependency) and calls back when the set of (mtime_ns, size, inode)
+signatures changes. A change is acted on only once it has been stable
+for one further poll, so a rebuild never starts halfway through a save.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Seconds between polls
+DEFAULT_INTERVAL = 2.0
+
+Signature = Dict[str, Tuple[int, int, int]]
+
+
+def stat_signature(files: Iterable[Path]) -> Signature:
+    """Map each existing file to its (mtime_ns, size, inode)."""
+    signature: Signature = {}
+    for path in files:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue  # Removed between listing and stat
+        signature[str(path)] = (st.st_mtime_ns, st.st_size, st.st_ino)
+    return signature
+
+
+class SourceWatcher:
+    """Calls ``on_change`` from a daemon thread when the source files change.
+
+    ``list_files`` is re-evaluated on every poll, so added and removed
+    files count as changes. An exception from ``on_change`` is kept in
+    ``last_error`` and the new signature is still adopted, so a broken
+    source file is not rebuilt again until it changes.
+    """
+
+    def __init__(self, list_files: Callable[[], Iterable[Path]],
+                 on_change: Callable[[], None], interval: float = DEFAULT_INTERVAL):
+        self.list_files = list_files
+        self.on_change = on_change
+        self.interval = interval
+        self.last_error: Optional[str] = None
+        self._signature: Signature = {}
+        self._pending: Optional[Signature] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._signature = stat_signature(self.list_files())
+        self._thread = threading.Thread(target=self._run, name="index-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def poll(self) -> bool:
+        """Check once; return True when ``on_change`` was called."""
+        current = stat_signature(self.list_files())
+        if current == self._signature:
+            self._pending = None
+            return False
+        if current != self._pending:
+            self._pending = current  # Still being written; wait a poll
+            return False
+        self._signature, self._pending = current, None
+        try:
+            self.on_change()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.poll()
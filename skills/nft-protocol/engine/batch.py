@@ -1,18 +1,24 @@
 """Batch processing via Anthropic API for bulk operations."""
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import os
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import tempfile
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, TextIO
 
 from .extractor import Extractor
+from .scheduler import (DEFAULT_MAX_RETRIES, DEFAULT_RPM, DEFAULT_TPM, Scheduler,
+                        post_json)
 from .tracker import TokenTracker, estimate_tokens
 
 
 DEFAULT_MODEL = os.environ.get("NFT_ENGINE_MODEL", "claude-sonnet-4-20250514")
+API_URL = os.environ.get("ANTHROPIC_BASE_URL", "https://api.anthropic.com").rstrip("/")
+ANTHROPIC_VERSION = "2023-06-01"
 
 
 def _json_error(msg: str) -> None:
@@ -22,6 +28,13 @@ def _json_error(msg: str) -> None:
     sys.exit(1)
 
 
+def _api_key() -> str:
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        _json_error("ANTHROPIC_API_KEY not set. Export it first.")
+    return api_key
+
+
 def _get_client():
     """Lazy import of anthropic SDK."""
     try:
@@ -29,21 +42,71 @@ def _get_client():
     except ImportError:
         _json_error("anthropic SDK not installed. Run: pip3 install anthropic")
 
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
-        _json_error("ANTHROPIC_API_KEY not set. Export it first.")
+    return anthropic.Anthropic(api_key=_api_key())
+
+
+GENERATE_SYSTEM_PROMPT = (
+    "You are an expert Solidity smart contract engineer. "
+    "Modify the following contract as requested. "
+    "Return ONLY the complete modified Solidity code."
+)
+
+
+def response_key(model: str, system: str, user_msg: str) -> str:
+    """Content address of a generation: (model, system prompt, user message hash)."""
+    user_hash = hashlib.sha256(user_msg.encode("utf-8")).hexdigest()
+    return hashlib.sha256(
+        json.dumps([model, system, user_hash]).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of generations (one JSON file per key)."""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            return None
+        if not isinstance(entry, dict) or "output_text" not in entry:
+            return None
+        return entry
 
-    return anthropic.Anthropic(api_key=api_key)
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            ignore = self.cache_dir / ".gitignore"
+            if not ignore.exists():
+                ignore.write_text("*\n", encoding="utf-8")
+            # Write-then-rename so an interrupted run never leaves a torn entry
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # Caching is best-effort
 
 
 class BatchProcessor:
     """Execute bulk operations via the Anthropic API."""
 
     def __init__(self, extractor: Extractor, tracker: TokenTracker,
-                 model: str = DEFAULT_MODEL):
+                 model: str = DEFAULT_MODEL, api_url: str = API_URL,
+                 api_key: Optional[str] = None, cache_dir: Optional[Path] = None):
         self.extractor = extractor
         self.tracker = tracker
         self.model = model
+        self.api_url = api_url.rstrip("/")
+        self.api_key = api_key
+        self.cache = ResponseCache(cache_dir) if cache_dir is not None else None
+        self.last_run_stats: Dict[str, Any] = {}
         self._client = None
 
     @property
@@ -53,49 +116,144 @@ class BatchProcessor:
         return self._client
 
     def generate_contracts(self, specs: List[Dict[str, str]],
-                           max_workers: int = 3,
-                           output_dir: Optional[Path] = None) -> List[Dict[str, Any]]:
-        """Generate modified contracts in parallel via API."""
-        results = []
-
-        def _process_one(spec: Dict[str, str]) -> Dict[str, Any]:
-            base_name = spec.get("base", "")
-            prompt = spec.get("prompt", "")
-
-            # Extract base contract
+                           max_workers: int = 8,
+                           output_dir: Optional[Path] = None,
+                           sink: Optional[TextIO] = None,
+                           rpm: float = DEFAULT_RPM,
+                           tpm: float = DEFAULT_TPM,
+                           max_retries: int = DEFAULT_MAX_RETRIES) -> List[Dict[str, Any]]:
+        """Generate modified contracts concurrently via the messages API.
+
+        Requests run under requests/tokens-per-minute buckets with up to
+        ``max_workers`` in flight (adapted to observed latency); 429/5xx
+        responses are retried with jittered backoff. Each result is written
+        to ``sink`` as a JSON line as soon as it completes. With a cache
+        directory, completed generations are reused on reruns and
+        identical specs are requested once.
+        """
+        return asyncio.run(self.generate_contracts_async(
+            specs, max_workers=max_workers, output_dir=output_dir, sink=sink,
+            rpm=rpm, tpm=tpm, max_retries=max_retries))
+
+    async def generate_contracts_async(self, specs: List[Dict[str, str]],
+                                       max_workers: int = 8,
+                                       output_dir: Optional[Path] = None,
+                                       sink: Optional[TextIO] = None,
+                                       rpm: float = DEFAULT_RPM,
+                                       tpm: float = DEFAULT_TPM,
+                                       max_retries: int = DEFAULT_MAX_RETRIES,
+                                       ) -> List[Dict[str, Any]]:
+        """Async form of generate_contracts."""
+        scheduler = Scheduler(max_concurrency=max_workers, rpm=rpm, tpm=tpm,
+                              max_retries=max_retries, sink=sink)
+        cache_stats = {"hits": 0, "misses": 0, "deduplicated": 0, "tokens_saved": 0}
+        url = f"{self.api_url}/v1/messages"
+        headers = None  # Only needed (and the key only required) on a cache miss
+
+        def _make_call(base_name: str, prompts: List[str], contract: Dict[str, Any],
+                       user_msg: str, input_tokens: int, key: str):
+            async def _call():
+                data = await asyncio.to_thread(post_json, url, {
+                    "model": self.model,
+                    "max_tokens": 4096,
+                    "system": GENERATE_SYSTEM_PROMPT,
+                    "messages": [{"role": "user", "content": user_msg}],
+                }, headers)
+
+                blocks = [b for b in data.get("content") or [] if b.get("type") == "text"]
+                if not blocks:
+                    return [{"name": base_name, "status": "error",
+                             "error": "Empty API response"} for _ in prompts], 0
+                output_text = blocks[0].get("text", "")
+                output_tokens = estimate_tokens(output_text)
+                billed_output = data.get("usage", {}).get("output_tokens", output_tokens)
+                if self.cache is not None:
+                    self.cache.put(key, {"model": self.model, "output_text": output_text,
+                                         "input_tokens": input_tokens,
+                                         "output_tokens": output_tokens})
+                results = [self._finish(base_name, prompts[0], contract, input_tokens,
+                                        output_text, output_tokens, output_dir)]
+                # Identical specs in the same run share the one generation
+                cache_stats["tokens_saved"] += (len(prompts) - 1) * (
+                    input_tokens + output_tokens)
+                for prompt in prompts[1:]:
+                    results.append(self._finish(base_name, prompt, contract, input_tokens,
+                                                output_text, output_tokens, output_dir,
+                                                cached=True))
+                return results, billed_output
+            return _call
+
+        # Group specs by base contract so each is extracted and serialized
+        # once, then by prompt so identical specs become a single request
+        groups: Dict[str, Dict[str, int]] = {}
+        for spec in specs:
+            prompts = groups.setdefault(spec.get("base", ""), {})
+            prompts[spec.get("prompt", "")] = prompts.get(spec.get("prompt", ""), 0) + 1
+
+        jobs = []
+        for base_name, prompts in groups.items():
             contract = self.extractor.get_contract(base_name)
             if not contract:
-                return {"name": base_name, "status": "error",
-                        "error": f"Contract '{base_name}' not found"}
-
-            # Build API prompt
-            system_msg = (
-                "You are an expert Solidity smart contract engineer. "
-                "Modify the following contract as requested. "
-                "Return ONLY the complete modified Solidity code."
-            )
-            user_msg = (
-                f"Base contract:\n```solidity\n{contract['content']}\n```\n\n"
-                f"Modification requested: {prompt}"
-            )
+                scheduler.emit([{"name": base_name, "status": "error",
+                                 "error": f"Contract '{base_name}' not found"}
+                                for _ in range(sum(prompts.values()))])
+                continue
+
+            base_block = f"Base contract:\n```solidity\n{contract['content']}\n```\n\n"
+            for prompt, count in prompts.items():
+                user_msg = f"{base_block}Modification requested: {prompt}"
+                input_tokens = estimate_tokens(GENERATE_SYSTEM_PROMPT + user_msg)
+                key = response_key(self.model, GENERATE_SYSTEM_PROMPT, user_msg)
+
+                cached = self.cache.get(key) if self.cache is not None else None
+                if cached is not None:
+                    cache_stats["hits"] += count
+                    scheduler.emit([self._finish(base_name, prompt, contract,
+                                                 cached["input_tokens"], cached["output_text"],
+                                                 cached["output_tokens"], output_dir,
+                                                 cached=True)
+                                    for _ in range(count)])
+                    cache_stats["tokens_saved"] += count * (
+                        cached["input_tokens"] + cached["output_tokens"])
+                    continue
+
+                cache_stats["misses"] += 1
+                cache_stats["deduplicated"] += count - 1
+                if headers is None:
+                    headers = {"x-api-key": self.api_key or _api_key(),
+                               "anthropic-version": ANTHROPIC_VERSION}
+                jobs.append((
+                    (base_name, count), input_tokens,
+                    _make_call(base_name, [prompt] * count, contract, user_msg,
+                               input_tokens, key),
+                ))
+
+        def _on_error(job_key: tuple, error: Exception, attempts: int) -> List[Dict[str, Any]]:
+            base_name, count = job_key
+            return [{"name": base_name or "unknown", "status": "error",
+                     "error": str(error), "attempts": attempts} for _ in range(count)]
+
+        results = await scheduler.run(jobs, _on_error)
+        self.last_run_stats = dict(scheduler.stats, cache=cache_stats)
+        return results
 
-            input_tokens = estimate_tokens(system_msg + user_msg)
+    def _finish(self, base_name: str, prompt: str, contract: Dict[str, Any],
+                input_tokens: int, output_text: str, output_tokens: int,
+                output_dir: Optional[Path], cached: bool = False) -> Dict[str, Any]:
+        """Track savings, build the result and optionally save the code.
 
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                system=system_msg,
-                messages=[{"role": "user", "content": user_msg}],
+        Cached results (earlier runs or identical specs in this run) cost
+        no API tokens; the generation they replace is logged as saved.
+        """
+        full_module_tokens = contract["tokens"]["full_module_tokens"]
+        if cached:
+            self.tracker.log(
+                "batch-cache-hit",
+                tokens_used=0,
+                tokens_saved=input_tokens + output_tokens,
+                details={"contract": base_name, "model": self.model},
             )
-
-            if not response.content:
-                return {"name": base_name, "status": "error",
-                        "error": "Empty API response"}
-            output_text = response.content[0].text
-            output_tokens = estimate_tokens(output_text)
-
-            # Track savings
-            full_module_tokens = contract["tokens"]["full_module_tokens"]
+        else:
             self.tracker.log(
                 "batch-generate",
                 tokens_used=input_tokens + output_tokens,
@@ -103,49 +261,35 @@ class BatchProcessor:
                 details={"contract": base_name, "model": self.model},
             )
 
-            result = {
-                "name": base_name,
-                "status": "ok",
-                "prompt": prompt,
-                "generated_code": output_text,
-                "tokens": {
-                    "input": input_tokens,
-                    "output": output_tokens,
-                    "saved_vs_full_load": full_module_tokens - input_tokens,
-                },
-            }
-
-            # Optionally save to file
-            if output_dir:
-                # Sanitize filename — strip everything except alnum, dash, underscore
-                safe_name = "".join(c for c in base_name if c.isalnum() or c in "-_")
-                output_dir.mkdir(parents=True, exist_ok=True)
-                out_file = (output_dir / f"{safe_name}_modified.sol").resolve()
-                # Verify output stays inside output_dir
-                try:
-                    out_file.relative_to(output_dir.resolve())
-                except ValueError:
-                    return {"name": base_name, "status": "error",
-                            "error": f"Output path escapes output_dir: {out_file}"}
-                out_file.write_text(output_text, encoding="utf-8")
-                result["output_file"] = str(out_file)
-
-            return result
-
-        with ThreadPoolExecutor(max_workers=max_workers) as pool:
-            futures = {pool.submit(_process_one, spec): spec for spec in specs}
-            for future in as_completed(futures):
-                try:
-                    results.append(future.result())
-                except Exception as e:
-                    spec = futures[future]
-                    results.append({
-                        "name": spec.get("base", "unknown"),
-                        "status": "error",
-                        "error": str(e),
-                    })
+        result = {
+            "name": base_name,
+            "status": "ok",
+            "prompt": prompt,
+            "generated_code": output_text,
+            "cached": cached,
+            "tokens": {
+                "input": input_tokens,
+                "output": output_tokens,
+                "saved_vs_full_load": full_module_tokens - input_tokens,
+            },
+        }
+
+        # Optionally save to file
+        if output_dir:
+            # Sanitize filename — strip everything except alnum, dash, underscore
+            safe_name = "".join(c for c in base_name if c.isalnum() or c in "-_")
+            output_dir.mkdir(parents=True, exist_ok=True)
+            out_file = (output_dir / f"{safe_name}_modified.sol").resolve()
+            # Verify output stays inside output_dir
+            try:
+                out_file.relative_to(output_dir.resolve())
+            except ValueError:
+                return {"name": base_name, "status": "error",
+                        "error": f"Output path escapes output_dir: {out_file}"}
+            out_file.write_text(output_text, encoding="utf-8")
+            result["output_file"] = str(out_file)
 
-        return results
+        return result
 
     def analyze_module(self, module_file: str, prompt: str) -> Dict[str, Any]:
         """Send a module to the API for analysis."""
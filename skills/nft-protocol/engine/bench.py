@@ -0,0 +1,710 @@
+"""Synthetic module corpus and timing harness for the indexer."""
+from __future__ import annotations
+
+import math
+import random
+import statistics
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from .indexer import build_index, build_search_index, check_index_freshness, source_files
+from .stdsets import build_standard_sets, parse_query
+
+_STANDARDS = ("ERC-721", "ERC-1155", "ERC-2981", "ERC-4907", "ERC-5192", "ERC-6551", "EIP-712")
+_WORDS = (
+    "vault", "royalty", "lending", "collateral", "oracle", "governance", "mint",
+    "auction", "escrow", "staking", "rental", "metadata", "bridge", "fraction",
+)
+
+
+def _prose(rng: random.Random, sentences: int) -> str:
+    out = []
+    for _ in range(sentences):
+        words = rng.choices(_WORDS, k=rng.randint(8, 16))
+        if rng.random() < 0.3:
+            words.append(rng.choice(_STANDARDS))
+        out.append(" ".join(words).capitalize() + ".")
+    return " ".join(out)
+
+
+def _solidity_block(rng: random.Random, name: str) -> str:
+    std = rng.choice(_STANDARDS)
+    funcs = []
+    for f in range(rng.randint(3, 8)):
+        funcs.append(
+            f"    function {rng.choice(_WORDS)}{f}(uint256 id) external {{\n"
+            f"        require(id > 0, \"bad id\");\n"
+            f"        emit Updated(id);\n"
+            f"    }}\n"
+        )
+    return (
+        f"File: `contracts/{name}.sol`\n\n"
+        "```solidity\n"
+        "// SPDX-License-Identifier: MIT\n"
+        "pragma solidity ^0.8.20;\n\n"
+        "import \"@openzeppelin/contracts/token/ERC721/ERC721.sol\";\n\n"
+        f"/// @notice Implements {std}\n"
+        f"contract {name} is ERC721 {{\n"
+        "    event Updated(uint256 id);\n\n"
+        + "\n".join(funcs)
+        + "}\n```\n"
+    )
+
+
+def _synthetic_module(rng: random.Random, module_num: int, target_bytes: int) -> str:
+    """Build one markdown module shaped like the real ones."""
+    parts = [f"# Synthetic Module {module_num}\n\n{_prose(rng, 3)}\n"]
+    size = len(parts[0])
+    sub = 0
+    while size < target_bytes:
+        sub += 1
+        chunk = [f"\n## MODULE {module_num}{sub}: {rng.choice(_WORDS).title()} Layer\n\n"]
+        chunk.append(_prose(rng, rng.randint(2, 6)) + "\n\n")
+        for c in range(rng.randint(1, 3)):
+            name = f"Synth{module_num}x{sub}x{c}{rng.choice(_WORDS).title()}"
+            chunk.append(f"### {name}\n\n{_prose(rng, 2)}\n\n")
+            chunk.append(_solidity_block(rng, name) + "\n")
+        if rng.random() < 0.3:
+            chunk.append("```bash\n# deploy script\nforge script Deploy --broadcast\n```\n")
+        text = "".join(chunk)
+        parts.append(text)
+        size += len(text)
+    return "".join(parts)
+
+
+def generate_corpus(out_dir: Path, total_bytes: int, files: int = 20,
+                    seed: int = 0) -> List[Path]:
+    """Write ``files`` synthetic modules totalling roughly ``total_bytes``."""
+    rng = random.Random(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    per_file = max(total_bytes // max(files, 1), 1)
+    paths = []
+    for i in range(files):
+        path = out_dir / f"synthetic-{i:03d}.md"
+        path.write_text(_synthetic_module(rng, i + 1, per_file), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_build_index(modules_dir: Path, repeat: int = 3, jobs: int = 1) -> Dict[str, Any]:
+    """Time ``build_index`` over a module directory.
+
+    With ``jobs`` != 1 the parallel output is also checked against a
+    serial build (everything but ``generated_at`` must match).
+    """
+    source_bytes = sum(p.stat().st_size for p in modules_dir.glob("*.md"))
+    built: Dict[str, Any] = {}
+
+    def _run() -> None:
+        built["index"] = build_index(modules_dir, jobs=jobs)
+
+    timings = _time(_run, repeat)
+    best = min(timings)
+    result = {
+        "source_bytes": source_bytes,
+        "jobs": jobs,
+        "repeat": len(timings),
+        "best_s": round(best, 4),
+        "median_s": round(statistics.median(timings), 4),
+        "mb_per_s": round(source_bytes / 1e6 / max(best, 1e-9), 2),
+        "index_stats": built["index"].stats,
+    }
+    if jobs != 1:
+        serial = build_index(modules_dir)
+        serial.generated_at = built["index"].generated_at
+        result["identical_to_serial"] = asdict(serial) == asdict(built["index"])
+    return result
+
+
+DEFAULT_QUERIES = ("lending", "royalty", "ERC-721", "soulbound token", "fract", "FractionalVault")
+
+
+def scale_index(index_data: Dict[str, Any], factor: int) -> Dict[str, Any]:
+    """Replicate every contract and section ``factor`` times (renamed copies)."""
+    sections: Dict[str, Any] = {}
+    contracts: Dict[str, Any] = {}
+    for i in range(max(factor, 1)):
+        suffix = "" if i == 0 else f"-{i}"
+        for sec_id, sec in index_data.get("sections", {}).items():
+            sections[sec_id + suffix] = dict(sec, id=sec_id + suffix)
+        for name, c in index_data.get("contracts", {}).items():
+            copy_name = name if i == 0 else f"{name}V{i}"
+            contracts[copy_name] = dict(c, name=copy_name,
+                                        section_id=c["section_id"] + suffix)
+    scaled = dict(index_data, sections=sections, contracts=contracts)
+    scaled["search"] = build_search_index(sections, contracts)
+    scaled["standard_sets"] = build_standard_sets(contracts, index_data.get("modules", {}))
+    return scaled
+
+
+def bench_search(index_data: Dict[str, Any], queries: Sequence[str] = DEFAULT_QUERIES,
+                 repeat: int = 200) -> Dict[str, Any]:
+    """Time Searcher.search per query, cold (first call) and warm."""
+    from .searcher import Searcher
+
+    searcher = Searcher(index_data)
+    per_query = {}
+    for q in queries:
+        cold = _time(lambda: searcher.search(q), 1)[0]
+        warm = sorted(_time(lambda: searcher.search(q), repeat))
+        per_query[q] = {
+            "cold_ms": round(cold * 1000, 3),
+            "warm_p50_ms": round(warm[len(warm) // 2] * 1000, 3),
+            "warm_p95_ms": round(warm[int(len(warm) * 0.95) - 1] * 1000, 3),
+        }
+    return {
+        "contracts": len(index_data.get("contracts", {})),
+        "sections": len(index_data.get("sections", {})),
+        "queries": per_query,
+    }
+
+
+DEFAULT_STANDARD_QUERIES = (
+    "ERC-721",
+    "ERC-721 AND ERC-2981 AND NOT ERC-5192",
+    "(ERC-1155 OR ERC-721) AND NOT (ERC-4907 OR ERC-6551)",
+    "NOT ERC-721",
+)
+
+
+def _matches(node: tuple, standards: set) -> bool:
+    """Reference evaluation of a parsed standards query against one record."""
+    kind = node[0]
+    if kind == "std":
+        return node[1] in standards
+    if kind == "not":
+        return not _matches(node[1], standards)
+    if kind == "and":
+        return _matches(node[1], standards) and _matches(node[2], standards)
+    return _matches(node[1], standards) or _matches(node[2], standards)
+
+
+def bench_standards(index_data: Dict[str, Any],
+                    queries: Sequence[str] = DEFAULT_STANDARD_QUERIES,
+                    repeat: int = 50) -> Dict[str, Any]:
+    """Time bitset standard queries against a per-contract scan of the same query."""
+    from .searcher import Searcher
+
+    searcher = Searcher(index_data)
+    contracts = index_data.get("contracts", {})
+    per_query = {}
+    consistent = True
+    for q in queries:
+        node = parse_query(q)
+        scan = lambda: [n for n, c in contracts.items()  # noqa: E731
+                        if _matches(node, set(c.get("standards", [])))]
+        expected = scan()
+        result = searcher.query_standards(q, limit=None)
+        consistent &= [c["name"] for c in result["contracts"]] == expected
+        bitset = sorted(_time(lambda: searcher.query_standards(q, limit=100), repeat))
+        baseline = sorted(_time(scan, max(repeat // 10, 1)))
+        per_query[q] = {
+            "matches": len(expected),
+            "bitset_p50_ms": round(bitset[len(bitset) // 2] * 1000, 3),
+            "scan_p50_ms": round(baseline[len(baseline) // 2] * 1000, 3),
+        }
+    return {
+        "contracts": len(contracts),
+        "consistent": consistent,
+        "queries": per_query,
+    }
+
+
+def bench_mcp(skill_dir: Path, contracts: Sequence[str], n_requests: int = 500,
+              workers: int = 4, seed: int = 0) -> Dict[str, Any]:
+    """Pipe interleaved JSON-RPC requests through ``engine serve``.
+
+    Checks every request gets exactly one response carrying its id, and
+    that get-contract responses carry the contract that was asked for.
+    """
+    import json
+    import subprocess
+    import sys
+    import tempfile
+
+    rng = random.Random(seed)
+    expected: Dict[int, Any] = {}
+    lines = [json.dumps({"jsonrpc": "2.0", "id": 0, "method": "initialize", "params": {}})]
+    expected[0] = None
+    for req_id in range(1, n_requests + 1):
+        roll = rng.random()
+        if roll < 0.4:
+            name = rng.choice(contracts)
+            params = {"name": "nft_get_contract", "arguments": {"name": name}}
+            expected[req_id] = name
+        elif roll < 0.7:
+            params = {"name": "nft_search", "arguments": {"query": rng.choice(DEFAULT_QUERIES)}}
+            expected[req_id] = None
+        elif roll < 0.85:
+            params = {"name": "nft_outline", "arguments": {"module": "defi.md"}}
+            expected[req_id] = None
+        elif roll < 0.95:
+            params = {"name": "nft_list_modules", "arguments": {}}
+            expected[req_id] = None
+        else:
+            lines.append(json.dumps({"jsonrpc": "2.0", "id": req_id, "method": "tools/list"}))
+            expected[req_id] = None
+            continue
+        lines.append(json.dumps({"jsonrpc": "2.0", "id": req_id,
+                                 "method": "tools/call", "params": params}))
+
+    # The burst goes to a throwaway token log, not the user's usage stats
+    with tempfile.TemporaryDirectory() as log_dir:
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-m", "engine", "serve", "--workers", str(workers),
+             "--log-path", str(Path(log_dir) / "token_log.jsonl")],
+            input="\n".join(lines) + "\n", capture_output=True, text=True,
+            cwd=str(skill_dir), check=False,
+        )
+        elapsed = time.perf_counter() - start
+
+    seen: Dict[Any, int] = {}
+    mismatched = []
+    for out in proc.stdout.splitlines():
+        resp = json.loads(out)
+        rid = resp.get("id")
+        seen[rid] = seen.get(rid, 0) + 1
+        want = expected.get(rid)
+        if want is not None:
+            text = resp.get("result", {}).get("content", [{}])[0].get("text", "{}")
+            if json.loads(text).get("name") != want:
+                mismatched.append(rid)
+    missing = sorted(i for i in expected if i not in seen)
+    duplicated = sorted(i for i, n in seen.items() if n > 1)
+    unexpected = sorted(str(i) for i in seen if i not in expected)
+    return {
+        "requests": len(expected),
+        "responses": sum(seen.values()),
+        "ok": not (missing or duplicated or unexpected or mismatched) and proc.returncode == 0,
+        "missing_ids": missing,
+        "duplicated_ids": duplicated,
+        "unexpected_ids": unexpected,
+        "mismatched_ids": mismatched,
+        "workers": workers,
+        "elapsed_s": round(elapsed, 3),
+        "req_per_s": round(len(expected) / max(elapsed, 1e-9), 1),
+    }
+
+
+def bench_extract(index_data: Dict[str, Any], modules_dir: Path,
+                  repeat: int = 5) -> Dict[str, Any]:
+    """Time get_contract/get_section over every entry, cold and warm.
+
+    Cold is the first pass on a fresh Extractor (files opened, slices
+    decoded); warm repeats the pass and is served from the slice cache.
+    """
+    from .extractor import Extractor
+
+    contracts = list(index_data.get("contracts", {}))
+    sections = list(index_data.get("sections", {}))
+    extractor = Extractor(index_data, modules_dir)
+
+    def _pass() -> List[float]:
+        per_call = []
+        for name in contracts:
+            start = time.perf_counter()
+            extractor.get_contract(name)
+            per_call.append(time.perf_counter() - start)
+        for sec_id in sections:
+            start = time.perf_counter()
+            extractor.get_section(sec_id)
+            per_call.append(time.perf_counter() - start)
+        return sorted(per_call)
+
+    def _summary(per_call: List[float]) -> Dict[str, float]:
+        return {
+            "total_ms": round(sum(per_call) * 1000, 3),
+            "p50_us": round(per_call[len(per_call) // 2] * 1e6, 1),
+            "p95_us": round(per_call[int(len(per_call) * 0.95) - 1] * 1e6, 1),
+        }
+
+    try:
+        cold = _pass()
+        warm: List[float] = []
+        for _ in range(max(repeat, 1)):
+            warm = min(warm, _pass(), key=sum) if warm else _pass()
+        return {
+            "contracts": len(contracts),
+            "sections": len(sections),
+            "cold": _summary(cold),
+            "warm": _summary(warm),
+            "cache_hits": extractor.cache_hits,
+            "cache_misses": extractor.cache_misses,
+            "multi_get": _bench_multi_get(index_data, modules_dir, sections, repeat),
+        }
+    finally:
+        extractor.close()
+
+
+def _bench_multi_get(index_data: Dict[str, Any], modules_dir: Path,
+                     sections: List[str], repeat: int) -> Dict[str, Any]:
+    """Every section fetched cold: one get_section round trip each vs one get_sections."""
+    from .extractor import Extractor
+
+    def _single() -> None:
+        for sec_id in sections:
+            e = Extractor(index_data, modules_dir)  # One request = one fresh process/call
+            e.get_section(sec_id)
+            e.close()
+
+    def _batched() -> None:
+        e = Extractor(index_data, modules_dir)
+        e.get_sections(sections)
+        e.close()
+
+    single = min(_time(_single, repeat))
+    batched = min(_time(_batched, repeat))
+    modules = {index_data["sections"][s]["module_file"] for s in sections}
+    return {
+        "items": len(sections),
+        "modules": len(modules),
+        "round_trips": {"single": len(sections), "batched": 1},
+        "module_maps": {"single": len(sections), "batched": len(modules)},
+        "single_ms": round(single * 1000, 3),
+        "batched_ms": round(batched * 1000, 3),
+    }
+
+
+def _messages_stand_in(delay_s: float, error_rate: float, throttle_rate: float,
+                       seed: int = 0):
+    """Local HTTP stand-in for POST /v1/messages injecting delays and errors."""
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    counters = {"requests": 0, "ok": 0, "throttled": 0, "server_errors": 0,
+                "inflight": 0, "peak_inflight": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args: Any) -> None:
+            pass
+
+        def _send(self, status: int, body: Dict[str, Any],
+                  headers: Dict[str, str] = None) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self) -> None:
+            payload = json.loads(self.rfile.read(int(self.headers["content-length"])))
+            with lock:
+                counters["requests"] += 1
+                counters["inflight"] += 1
+                counters["peak_inflight"] = max(counters["peak_inflight"], counters["inflight"])
+                roll = rng.random()
+                delay = delay_s * rng.uniform(0.5, 1.5)
+            try:
+                time.sleep(delay)
+                if roll < throttle_rate:
+                    with lock:
+                        counters["throttled"] += 1
+                    self._send(429, {"type": "error", "error": {"type": "rate_limit_error"}},
+                               {"retry-after": "0"})
+                elif roll < throttle_rate + error_rate:
+                    with lock:
+                        counters["server_errors"] += 1
+                    self._send(rng.choice((500, 503, 529)),
+                               {"type": "error", "error": {"type": "api_error"}})
+                else:
+                    with lock:
+                        counters["ok"] += 1
+                    prompt = payload["messages"][0]["content"]
+                    text = "// stand-in\n" + prompt[-200:]
+                    self._send(200, {"content": [{"type": "text", "text": text}],
+                                     "usage": {"input_tokens": len(prompt) // 4,
+                                               "output_tokens": len(text) // 4}})
+            finally:
+                with lock:
+                    counters["inflight"] -= 1
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counters
+
+
+def bench_batch(index_data: Dict[str, Any], modules_dir: Path, n_specs: int = 60,
+                workers: int = 8, rpm: float = 600, tpm: float = 1_000_000,
+                delay_s: float = 0.2, error_rate: float = 0.1,
+                throttle_rate: float = 0.05, seed: int = 0) -> Dict[str, Any]:
+    """Run BatchProcessor.generate_contracts against the local stand-in.
+
+    Checks every spec produced exactly one streamed JSONL result, that
+    injected failures were retried, and that the server never saw more
+    concurrent requests than ``workers``. The job is then rerun against
+    the same response cache, which should be served without requests.
+    """
+    import io
+    import json
+    import tempfile
+
+    from .batch import BatchProcessor
+    from .extractor import Extractor
+    from .tracker import TokenTracker
+
+    rng = random.Random(seed)
+    names = sorted(index_data.get("contracts", {}))
+    # A few repeated specs exercise in-run de-duplication
+    specs = [{"base": rng.choice(names), "prompt": f"Variant {i}"}
+             for i in range(n_specs - n_specs // 10)]
+    specs += rng.sample(specs, n_specs - len(specs))
+
+    server, counters = _messages_stand_in(delay_s, error_rate, throttle_rate, seed)
+    sink = io.StringIO()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            tracker = TokenTracker(Path(tmp) / "log.jsonl")
+            processor = BatchProcessor(
+                Extractor(index_data, modules_dir), tracker,
+                api_url=f"http://127.0.0.1:{server.server_address[1]}", api_key="stand-in",
+                cache_dir=Path(tmp) / "cache")
+            start = time.perf_counter()
+            results = processor.generate_contracts(specs, max_workers=workers, sink=sink,
+                                                   rpm=rpm, tpm=tpm)
+            elapsed = time.perf_counter() - start
+            first_run = processor.last_run_stats
+
+            requests_before = counters["requests"]
+            start = time.perf_counter()
+            rerun = processor.generate_contracts(specs, max_workers=workers,
+                                                 rpm=rpm, tpm=tpm)
+            rerun_elapsed = time.perf_counter() - start
+            rerun_requests = counters["requests"] - requests_before
+            tracker.close()  # Before its directory is removed
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    streamed = [json.loads(line) for line in sink.getvalue().splitlines()]
+    ok = sum(1 for r in results if r.get("status") == "ok")
+    return {
+        "specs": n_specs,
+        "ok": ok,
+        "failed": len(results) - ok,
+        "streamed_lines": len(streamed),
+        "consistent": len(streamed) == len(results) == n_specs,
+        "scheduler": first_run,
+        "stand_in": {k: v for k, v in counters.items() if k != "inflight"},
+        "within_concurrency": counters["peak_inflight"] <= workers,
+        "elapsed_s": round(elapsed, 3),
+        "req_per_min": round(requests_before / max(elapsed, 1e-9) * 60, 1),
+        "rerun": {
+            "ok": sum(1 for r in rerun if r.get("status") == "ok"),
+            "requests": rerun_requests,
+            "cache": processor.last_run_stats.get("cache", {}),
+            "elapsed_s": round(rerun_elapsed, 3),
+        },
+    }
+
+
+# Suite corpus multiples of modules/ (1x = same module count and size)
+DEFAULT_SCALES = (1, 10)
+# A percentile regresses when it is this much slower than the baseline...
+DEFAULT_TOLERANCE = 0.25
+# ...and at least this many ms slower (sub-ms jitter never fails a run)
+NOISE_FLOOR_MS = 0.5
+COMPARED_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+# Contracts + sections extracted per pass (spread evenly over the index)
+EXTRACT_SAMPLE = 200
+MCP_CALLS = (
+    ("nft_search", {"query": "lending"}),
+    ("nft_get_contract", {"name": "FractionalVault"}),
+    ("nft_outline", {"module": "defi.md"}),
+    ("nft_check_index", {}),
+)
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, Any]:
+    """Nearest-rank p50/p95/p99 and mean, in ms, of timings in seconds."""
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return round(ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)] * 1000, 3)
+
+    return {
+        "n": len(ordered),
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+    }
+
+
+def bench_corpus(modules_dir: Path, repeat: int = 3,
+                 queries: Sequence[str] = DEFAULT_QUERIES) -> Dict[str, Any]:
+    """Time build_index, check_index, search and extraction over one module set."""
+    from .extractor import Extractor
+    from .searcher import Searcher
+
+    built: Dict[str, Any] = {}
+
+    def _build() -> None:
+        built["index"] = build_index(modules_dir)
+
+    timings: Dict[str, Any] = {"build_index": summarize(_time(_build, repeat))}
+    index = built["index"]
+    timings["check_index"] = summarize(
+        _time(lambda: check_index_freshness(index, modules_dir), repeat))
+
+    index_data = asdict(index)
+    searcher = Searcher(index_data)
+    timings["search_cold"] = summarize([_time(lambda: searcher.search(q), 1)[0] for q in queries])
+    timings["search_warm"] = summarize(
+        [t for q in queries for t in _time(lambda: searcher.search(q), repeat)])
+
+    items = ([("contract", name) for name in index_data["contracts"]]
+             + [("section", sec_id) for sec_id in index_data["sections"]])
+    items = items[::max(len(items) // EXTRACT_SAMPLE, 1)][:EXTRACT_SAMPLE]
+    extractor = Extractor(index_data, modules_dir)
+
+    def _extract(kind: str, key: str) -> Any:
+        if kind == "contract":
+            return extractor.get_contract(key)
+        return extractor.get_section(key)
+
+    try:
+        misses, cold = 0, []
+        for kind, key in items:
+            start = time.perf_counter()
+            misses += _extract(kind, key) is None
+            cold.append(time.perf_counter() - start)
+        timings["extract_cold"] = summarize(cold)
+        timings["extract_warm"] = summarize(
+            [t for kind, key in items * max(repeat, 1)
+             for t in _time(lambda: _extract(kind, key), 1)])
+    finally:
+        extractor.close()
+    return {
+        "entries": len(index_data["contracts"]) + len(index_data["sections"]),
+        "extract_misses": misses,
+        "timings": timings,
+    }
+
+
+def bench_mcp_roundtrips(skill_dir: Path, calls: Sequence[Tuple[str, Dict[str, Any]]] = MCP_CALLS,
+                         repeat: int = 3) -> Dict[str, Any]:
+    """Time one-at-a-time tools/call round trips through ``engine serve``.
+
+    Unlike bench_mcp (throughput of a pipelined burst), each request is
+    sent only after the previous response arrived.
+    """
+    import json
+    import subprocess
+    import sys
+    import tempfile
+
+    # Round trips go to a throwaway token log, not the user's usage stats
+    log_dir = tempfile.TemporaryDirectory()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "engine", "serve", "--watch-interval", "0",
+         "--log-path", str(Path(log_dir.name) / "token_log.jsonl")],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        text=True, bufsize=1, cwd=str(skill_dir),
+    )
+    req_id = 0
+
+    def _request(method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        nonlocal req_id
+        req_id += 1
+        proc.stdin.write(json.dumps({"jsonrpc": "2.0", "id": req_id,
+                                     "method": method, "params": params}) + "\n")
+        proc.stdin.flush()
+        return json.loads(proc.stdout.readline())
+
+    try:
+        _request("initialize", {})
+        timings = {}
+        errors = 0
+        for tool, arguments in calls:
+            samples = []
+            for _ in range(max(repeat, 1)):
+                start = time.perf_counter()
+                resp = _request("tools/call", {"name": tool, "arguments": arguments})
+                samples.append(time.perf_counter() - start)
+                errors += "error" in resp or bool(resp.get("result", {}).get("isError"))
+            timings[tool] = summarize(samples)
+    finally:
+        proc.stdin.close()
+        proc.wait(timeout=10)
+        log_dir.cleanup()
+    return {"errors": errors, "timings": timings}
+
+
+def run_suite(skill_dir: Path, scales: Sequence[int] = DEFAULT_SCALES, repeat: int = 3,
+              mcp: bool = True, seed: int = 0) -> Dict[str, Any]:
+    """Every benchmark at each corpus scale, plus MCP round trips on the real index.
+
+    The MCP server always serves the skill's own modules/, so its
+    timings are taken once rather than per scale.
+    """
+    import tempfile
+
+    shipped = source_files(skill_dir / "modules")
+    shipped_bytes = sum(p.stat().st_size for p in shipped)
+    result: Dict[str, Any] = {"engine": skill_dir.name, "repeat": repeat,
+                              "corpora": {}, "timings": {}}
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = generate_corpus(Path(tmp), shipped_bytes * scale,
+                                    files=max(len(shipped), 1) * scale, seed=seed)
+            measured = bench_corpus(Path(tmp), repeat)
+        result["corpora"][f"{scale}x"] = {
+            "files": len(paths),
+            "bytes": shipped_bytes * scale,
+            "entries": measured["entries"],
+            "extract_misses": measured["extract_misses"],
+        }
+        result["timings"][f"{scale}x"] = measured["timings"]
+    if mcp:
+        measured = bench_mcp_roundtrips(skill_dir, repeat=repeat)
+        result["mcp_errors"] = measured["errors"]
+        result["timings"]["mcp"] = measured["timings"]
+    return result
+
+
+def compare_to_baseline(result: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float = DEFAULT_TOLERANCE) -> List[Dict[str, Any]]:
+    """Percentiles in ``result`` slower than the same metric in ``baseline``.
+
+    Metrics missing from either side (a scale or tool not in both runs)
+    are skipped rather than treated as regressions.
+    """
+    regressions: List[Dict[str, Any]] = []
+
+    def walk(current: Dict[str, Any], reference: Dict[str, Any], path: str) -> None:
+        for key, value in current.items():
+            if key not in reference:
+                continue
+            ref = reference[key]
+            if isinstance(value, dict) and isinstance(ref, dict):
+                walk(value, ref, f"{path}.{key}" if path else key)
+            elif key in COMPARED_KEYS and value > ref * (1 + tolerance) \
+                    and value - ref >= NOISE_FLOOR_MS:
+                regressions.append({
+                    "metric": f"{path}.{key}",
+                    "baseline_ms": ref,
+                    "current_ms": value,
+                    "ratio": round(value / max(ref, 1e-9), 2),
+                })
+
+    walk(result.get("timings", {}), baseline.get("timings", {}), "")
+    return regressions
@@ -8,6 +8,9 @@ import sys
 from pathlib import Path
 from typing import Any, Dict
 
+# Batch rate limits for the argparse defaults (scheduler is stdlib-only)
+from .scheduler import DEFAULT_MAX_RETRIES, DEFAULT_RPM, DEFAULT_TPM
+
 DEFAULT_MODEL = os.environ.get("NFT_ENGINE_MODEL", "claude-sonnet-4-20250514")
 
 SKILL_DIR = Path(__file__).resolve().parent.parent
@@ -15,6 +18,7 @@ MODULES_DIR = SKILL_DIR / "modules"
 DATA_DIR = SKILL_DIR / "data"
 INDEX_PATH = DATA_DIR / "index.json"
 LOG_PATH = DATA_DIR / "token_log.jsonl"
+BATCH_CACHE_DIR = DATA_DIR / "batch_cache"
 
 
 def _out(data: Any) -> None:
@@ -22,14 +26,35 @@ def _out(data: Any) -> None:
     print(json.dumps(data, indent=2, ensure_ascii=False))
 
 
+def _int_at_least(text: str, minimum: int) -> int:
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {text!r}") from None
+    if value < minimum:
+        raise argparse.ArgumentTypeError(f"must be at least {minimum}, got {value}")
+    return value
+
+
+def _token_budget(text: str) -> int:
+    """argparse type for --max-tokens: a positive integer."""
+    return _int_at_least(text, 1)
+
+
+def _section_depth(text: str) -> int:
+    """argparse type for --depth: zero or more heading levels."""
+    return _int_at_least(text, 0)
+
+
 def _load_index(command: str = "unknown") -> Dict[str, Any]:
     if not INDEX_PATH.exists():
         _out({"status": "error", "command": command,
               "error": "Index not found. Run: python3 -m engine build-index"})
         sys.exit(2)
+    from .compact import load_index
     try:
-        with open(INDEX_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
+        # Lazy view over data/index.bin when it mirrors index.json
+        return load_index(INDEX_PATH)
     except json.JSONDecodeError as e:
         _out({"status": "error", "command": command,
               "error": f"Corrupt index JSON: {e}. Run: python3 -m engine build-index"})
@@ -41,11 +66,19 @@ def _load_index(command: str = "unknown") -> Dict[str, Any]:
 
 
 def cmd_build_index(args: argparse.Namespace) -> None:
-    from .indexer import build_index
-    from .schema import Index
+    from .indexer import build_index_incremental
+
+    # Reuse unchanged modules from the existing index unless --full
+    previous = None
+    if not args.full and INDEX_PATH.exists():
+        from .compact import load_index
+        try:
+            previous = load_index(INDEX_PATH)
+        except (json.JSONDecodeError, OSError):
+            previous = None
 
     try:
-        idx = build_index(MODULES_DIR)
+        idx, reparsed = build_index_incremental(MODULES_DIR, previous, jobs=args.jobs)
         idx.save(INDEX_PATH)
     except Exception as e:
         _out({"status": "error", "command": "build-index",
@@ -55,6 +88,7 @@ def cmd_build_index(args: argparse.Namespace) -> None:
         "status": "ok",
         "command": "build-index",
         "result": idx.stats,
+        "reparsed_modules": reparsed,
         "index_path": str(INDEX_PATH),
     })
 
@@ -97,7 +131,7 @@ def cmd_get_contract(args: argparse.Namespace) -> None:
 
     index = _load_index("get-contract")
     extractor = Extractor(index, MODULES_DIR)
-    result = extractor.get_contract(args.name)
+    result = extractor.get_contract(args.name, max_tokens=args.max_tokens)
 
     if not result:
         # Try suggest
@@ -118,13 +152,70 @@ def cmd_get_contract(args: argparse.Namespace) -> None:
     _out({"status": "ok", "command": "get-contract", "result": result})
 
 
+def _suggest_missing(index: Dict[str, Any], result: Dict[str, Any], key: str) -> None:
+    """Attach suggestions to the not-found items of a multi-get result."""
+    from .searcher import Searcher
+    searcher = None
+    for item in result["results"]:
+        if item.get("missing"):
+            searcher = searcher or Searcher(index)
+            item["suggestions"] = searcher.suggest(item[key])
+
+
+def cmd_get_contracts(args: argparse.Namespace) -> None:
+    from .extractor import Extractor
+    from .tracker import TokenTracker
+
+    index = _load_index("get-contracts")
+    extractor = Extractor(index, MODULES_DIR)
+    result = extractor.get_contracts(args.names)
+    _suggest_missing(index, result, "name")
+
+    tracker = TokenTracker(LOG_PATH)
+    tracker.log("get-contracts",
+                tokens_used=result["tokens"]["estimated_output"],
+                tokens_saved=max(result["tokens"]["full_module_tokens"]
+                                 - result["tokens"]["estimated_output"], 0),
+                details={"contracts": args.names})
+
+    _out({"status": "ok", "command": "get-contracts", "result": result})
+
+
+def cmd_get_contract_closure(args: argparse.Namespace) -> None:
+    from .extractor import Extractor
+    from .tracker import TokenTracker
+
+    index = _load_index("get-contract-closure")
+    extractor = Extractor(index, MODULES_DIR)
+    result = extractor.get_contract_closure(args.name, max_tokens=args.max_tokens)
+
+    if not result:
+        from .searcher import Searcher
+        searcher = Searcher(index)
+        suggestions = searcher.suggest(args.name)
+        _out({"status": "error", "command": "get-contract-closure",
+              "error": f"Contract '{args.name}' not found",
+              "suggestions": suggestions})
+        return
+
+    tracker = TokenTracker(LOG_PATH)
+    tracker.log("get-contract-closure",
+                tokens_used=result["tokens"]["estimated_output"],
+                tokens_saved=max(result["tokens"]["full_module_tokens"]
+                                 - result["tokens"]["estimated_output"], 0),
+                details={"contract": args.name, "contracts": len(result["contracts"])})
+
+    _out({"status": "ok", "command": "get-contract-closure", "result": result})
+
+
 def cmd_get_section(args: argparse.Namespace) -> None:
     from .extractor import Extractor
     from .tracker import TokenTracker
 
     index = _load_index("get-section")
     extractor = Extractor(index, MODULES_DIR)
-    result = extractor.get_section(args.id, outline_only=args.outline)
+    result = extractor.get_section(args.id, outline_only=args.outline,
+                                   max_tokens=args.max_tokens, depth=args.depth)
 
     if not result:
         from .searcher import Searcher
@@ -144,6 +235,25 @@ def cmd_get_section(args: argparse.Namespace) -> None:
     _out({"status": "ok", "command": "get-section", "result": result})
 
 
+def cmd_get_sections(args: argparse.Namespace) -> None:
+    from .extractor import Extractor
+    from .tracker import TokenTracker
+
+    index = _load_index("get-sections")
+    extractor = Extractor(index, MODULES_DIR)
+    result = extractor.get_sections(args.ids, outline_only=args.outline)
+    _suggest_missing(index, result, "id")
+
+    tracker = TokenTracker(LOG_PATH)
+    tracker.log("get-sections",
+                tokens_used=result["tokens"]["estimated_output"],
+                tokens_saved=max(result["tokens"]["full_module_tokens"]
+                                 - result["tokens"]["estimated_output"], 0),
+                details={"sections": args.ids})
+
+    _out({"status": "ok", "command": "get-sections", "result": result})
+
+
 def cmd_list_modules(args: argparse.Namespace) -> None:
     from .searcher import Searcher
     from .tracker import TokenTracker
@@ -209,6 +319,29 @@ def cmd_find_standard(args: argparse.Namespace) -> None:
     _out({"status": "ok", "command": "find-standard", "result": result})
 
 
+def cmd_query_standards(args: argparse.Namespace) -> None:
+    from .searcher import Searcher
+    from .tracker import TokenTracker
+
+    index = _load_index("query-standards")
+    searcher = Searcher(index)
+    scope = "modules" if args.modules else "contracts"
+    try:
+        result = searcher.query_standards(args.expression, scope, limit=args.limit or None)
+    except ValueError as e:
+        _out({"status": "error", "command": "query-standards",
+              "error": f"Invalid expression: {e}"})
+        return
+
+    total_bytes = sum(m.get("size_bytes", 0) for m in index.get("modules", {}).values())
+    baseline_tokens = total_bytes // 4
+    tracker = TokenTracker(LOG_PATH)
+    tracker.log("query-standards", tokens_used=500, tokens_saved=max(baseline_tokens - 500, 0),
+                details={"expression": args.expression, "scope": scope})
+
+    _out({"status": "ok", "command": "query-standards", "result": result})
+
+
 def cmd_outline(args: argparse.Namespace) -> None:
     from .extractor import Extractor
     from .tracker import TokenTracker
@@ -246,7 +379,8 @@ def cmd_batch_generate(args: argparse.Namespace) -> None:
     index = _load_index("batch-generate")
     extractor = Extractor(index, MODULES_DIR)
     tracker = TokenTracker(LOG_PATH)
-    processor = BatchProcessor(extractor, tracker, model=args.model)
+    processor = BatchProcessor(extractor, tracker, model=args.model,
+                               cache_dir=None if args.no_cache else BATCH_CACHE_DIR)
 
     specs = json.loads(args.specs)
     if not isinstance(specs, list):
@@ -259,14 +393,21 @@ def cmd_batch_generate(args: argparse.Namespace) -> None:
                   "error": f"specs[{i}] must have 'base' and 'prompt' keys"})
             sys.exit(1)
     output_dir = Path(args.output_dir).resolve() if args.output_dir else None
+    sink = open(args.jsonl, "a", encoding="utf-8") if args.jsonl else None
     try:
-        results = processor.generate_contracts(specs, max_workers=args.max_workers,
-                                               output_dir=output_dir)
+        results = processor.generate_contracts(
+            specs, max_workers=args.max_workers, output_dir=output_dir, sink=sink,
+            rpm=args.rpm, tpm=args.tpm, max_retries=args.max_retries)
     except Exception as e:
         _out({"status": "error", "command": "batch-generate",
               "error": f"Generation failed: {e}"})
         sys.exit(1)
-    _out({"status": "ok", "command": "batch-generate", "result": results})
+    finally:
+        if sink is not None:
+            sink.close()
+    stats = dict(processor.last_run_stats)
+    _out({"status": "ok", "command": "batch-generate", "result": results,
+          "cache": stats.pop("cache", {}), "scheduler": stats})
 
 
 def cmd_batch_analyze(args: argparse.Namespace) -> None:
@@ -283,9 +424,94 @@ def cmd_batch_analyze(args: argparse.Namespace) -> None:
     _out({"status": "ok", "command": "batch-analyze", "result": result})
 
 
+def cmd_bench(args: argparse.Namespace) -> None:
+    import tempfile
+    from .bench import (bench_batch, bench_build_index, bench_extract, bench_mcp,
+                        bench_search, bench_standards, compare_to_baseline, generate_corpus,
+                        run_suite, scale_index)
+
+    if args.target == "suite":
+        scales = [int(s) for s in args.scales.split(",") if s.strip()]
+        result = run_suite(SKILL_DIR, scales=scales, repeat=args.repeat, mcp=not args.no_mcp)
+        if args.save_baseline:
+            Path(args.save_baseline).write_text(json.dumps(result, indent=2) + "\n",
+                                                encoding="utf-8")
+        regressions = []
+        if args.baseline:
+            baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+            regressions = compare_to_baseline(result, baseline, args.tolerance)
+            result["regressions"] = regressions
+        misses = sum(c["extract_misses"] for c in result["corpora"].values())
+        ok = not regressions and not misses and not result.get("mcp_errors")
+        _out({"status": "ok" if ok else "error", "command": "bench", "result": result})
+        if not ok:
+            sys.exit(1)
+        return
+
+    if args.target == "mcp":
+        index = _load_index("bench")
+        result = bench_mcp(SKILL_DIR, sorted(index.get("contracts", {})),
+                           n_requests=args.requests, workers=args.workers)
+        _out({"status": "ok" if result["ok"] else "error", "command": "bench",
+              "result": result})
+        if not result["ok"]:
+            sys.exit(1)
+        return
+
+    if args.target == "batch":
+        result = bench_batch(_load_index("bench"), MODULES_DIR, n_specs=args.requests,
+                             workers=args.workers, rpm=args.rpm, tpm=args.tpm,
+                             delay_s=args.delay, error_rate=args.error_rate)
+        ok = (result["consistent"] and result["within_concurrency"]
+              and result["rerun"]["requests"] == 0)
+        _out({"status": "ok" if ok else "error", "command": "bench", "result": result})
+        if not ok:
+            sys.exit(1)
+        return
+
+    if args.target == "extract":
+        if args.corpus_dir:
+            from dataclasses import asdict
+            from .indexer import build_index
+            modules_dir = Path(args.corpus_dir).resolve()
+            index = asdict(build_index(modules_dir))
+        else:
+            modules_dir, index = MODULES_DIR, _load_index("bench")
+        result = bench_extract(index, modules_dir, repeat=args.repeat)
+        _out({"status": "ok", "command": "bench", "result": result})
+        return
+
+    if args.target == "standards":
+        index = scale_index(_load_index("bench"), args.scale)
+        result = bench_standards(index, repeat=args.repeat * 10)
+        result["scale"] = args.scale
+        _out({"status": "ok" if result["consistent"] else "error", "command": "bench",
+              "result": result})
+        if not result["consistent"]:
+            sys.exit(1)
+        return
+
+    if args.target == "search":
+        index = scale_index(_load_index("bench"), args.scale)
+        result = bench_search(index, repeat=args.repeat)
+        result["scale"] = args.scale
+        _out({"status": "ok", "command": "bench", "result": result})
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = Path(args.corpus_dir).resolve() if args.corpus_dir else Path(tmp)
+        if not any(corpus_dir.glob("*.md")):
+            generate_corpus(corpus_dir, int(args.size_mb * 1_000_000), files=args.files)
+        result = bench_build_index(corpus_dir, repeat=args.repeat, jobs=args.jobs)
+    result["corpus_dir"] = str(corpus_dir) if args.corpus_dir else None
+    _out({"status": "ok", "command": "bench", "result": result})
+
+
 def cmd_serve(args: argparse.Namespace) -> None:
     from .mcp_server import NFTProtocolMCPServer
-    server = NFTProtocolMCPServer()
+    server = NFTProtocolMCPServer(max_workers=args.workers, watch_interval=args.watch_interval,
+                                  search_cache_bytes=int(args.search_cache_mb * 1024 * 1024),
+                                  log_path=args.log_path)
     server.run()
 
 
@@ -297,7 +523,11 @@ def build_parser() -> argparse.ArgumentParser:
     sub = parser.add_subparsers(dest="command", required=True)
 
     # build-index
-    sub.add_parser("build-index", help="Build the search index from modules")
+    p = sub.add_parser("build-index", help="Build the search index from modules")
+    p.add_argument("--full", action="store_true",
+                   help="Reparse every module instead of only changed ones")
+    p.add_argument("--jobs", type=int, default=1,
+                   help="Parse modules in N worker processes (0 = one per CPU)")
 
     # check-index
     sub.add_parser("check-index", help="Check if index is up-to-date")
@@ -311,12 +541,37 @@ def build_parser() -> argparse.ArgumentParser:
     # get-contract
     p = sub.add_parser("get-contract", help="Extract a specific contract")
     p.add_argument("name", help="Contract name (e.g. FractionalVault)")
+    p.add_argument("--max-tokens", type=_token_budget, default=None,
+                   help="Elide the longest function bodies until the contract fits")
+
+    # get-contracts
+    p = sub.add_parser("get-contracts",
+                       help="Extract several contracts (each module read once)")
+    p.add_argument("names", nargs="+", help="Contract names")
+
+    # get-contract-closure
+    p = sub.add_parser("get-contract-closure",
+                       help="Extract a contract plus its inherited/imported local contracts")
+    p.add_argument("name", help="Contract name")
+    p.add_argument("--max-tokens", type=_token_budget, default=None,
+                   help="Drop the deepest dependencies first until the output fits")
 
     # get-section
     p = sub.add_parser("get-section", help="Extract a module section")
     p.add_argument("id", help="Section ID")
     p.add_argument("--outline", action="store_true",
                    help="Return outline only (headings + declarations)")
+    p.add_argument("--max-tokens", type=_token_budget, default=None,
+                   help="Fall back to elided function bodies, then the outline, to fit")
+    p.add_argument("--depth", type=_section_depth, default=0,
+                   help="Include subsections N heading levels down (one read; 5 = whole subtree)")
+
+    # get-sections
+    p = sub.add_parser("get-sections",
+                       help="Extract several module sections (each module read once)")
+    p.add_argument("ids", nargs="+", help="Section IDs")
+    p.add_argument("--outline", action="store_true",
+                   help="Return outlines only (headings + declarations)")
 
     # list-modules
     sub.add_parser("list-modules", help="List all modules with summaries")
@@ -331,6 +586,16 @@ def build_parser() -> argparse.ArgumentParser:
     p = sub.add_parser("find-standard", help="Find contracts by ERC standard")
     p.add_argument("standard", help="ERC standard (e.g. ERC-6551)")
 
+    # query-standards
+    p = sub.add_parser("query-standards",
+                       help="Contracts matching a boolean expression over standards")
+    p.add_argument("expression",
+                   help='e.g. "ERC-721 AND ERC-2981 AND NOT ERC-5192" (AND/OR/NOT, parentheses)')
+    p.add_argument("--modules", action="store_true",
+                   help="Match modules instead of contracts")
+    p.add_argument("--limit", type=int, default=100,
+                   help="Maximum results to list (0 = all); count is always exact")
+
     # outline
     p = sub.add_parser("outline", help="Show module section structure")
     p.add_argument("module", help="Module filename (e.g. defi.md)")
@@ -343,7 +608,16 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--specs", required=True,
                    help='JSON array: [{"base":"Name","prompt":"..."}]')
     p.add_argument("--model", default=DEFAULT_MODEL)
-    p.add_argument("--max-workers", type=int, default=3)
+    p.add_argument("--max-workers", type=int, default=8,
+                   help="Upper bound on concurrent requests (adapted to latency)")
+    p.add_argument("--rpm", type=float, default=DEFAULT_RPM, help="Requests per minute")
+    p.add_argument("--tpm", type=float, default=DEFAULT_TPM, help="Tokens per minute")
+    p.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES,
+                   help="Retries per request on 429/5xx/connection errors")
+    p.add_argument("--jsonl", default=None,
+                   help="Append each result to this JSONL file as it completes")
+    p.add_argument("--no-cache", action="store_true",
+                   help="Regenerate every spec instead of reusing cached responses")
     p.add_argument("--output-dir", default=None)
 
     # batch-analyze
@@ -352,8 +626,50 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--prompt", required=True)
     p.add_argument("--model", default=DEFAULT_MODEL)
 
+    # bench
+    p = sub.add_parser("bench", help="Time build-index, search, extraction or the MCP server")
+    p.add_argument("--target", default="build",
+                   choices=["build", "search", "extract", "mcp", "batch", "standards", "suite"])
+    p.add_argument("--scale", type=int, default=100,
+                   help="search/standards: replicate the current index N times")
+    p.add_argument("--requests", type=int, default=500,
+                   help="mcp: interleaved requests to pipe; batch: specs to generate")
+    p.add_argument("--workers", type=int, default=4,
+                   help="mcp: server worker threads; batch: max concurrent requests")
+    p.add_argument("--rpm", type=float, default=600, help="batch: requests per minute")
+    p.add_argument("--tpm", type=float, default=1_000_000, help="batch: tokens per minute")
+    p.add_argument("--delay", type=float, default=0.2,
+                   help="batch: mean stand-in response delay (s)")
+    p.add_argument("--error-rate", type=float, default=0.1,
+                   help="batch: share of 5xx responses from the stand-in")
+    p.add_argument("--size-mb", type=float, default=50.0,
+                   help="Synthetic corpus size in MB (default: 50)")
+    p.add_argument("--files", type=int, default=20,
+                   help="Number of synthetic modules to generate")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--jobs", type=int, default=1,
+                   help="build: parse modules in N worker processes (0 = one per CPU)")
+    p.add_argument("--corpus-dir", default=None,
+                   help="Reuse (or create) the corpus in this directory")
+    p.add_argument("--scales", default="1,10",
+                   help="suite: comma-separated corpus multiples of modules/ (e.g. 1,10,100)")
+    p.add_argument("--no-mcp", action="store_true", help="suite: skip MCP round trips")
+    p.add_argument("--baseline", default=None,
+                   help="suite: baseline JSON to compare against; exits 1 on regressions")
+    p.add_argument("--save-baseline", default=None, help="suite: write the result as JSON")
+    p.add_argument("--tolerance", type=float, default=0.25,
+                   help="suite: allowed slowdown vs the baseline (0.25 = 25%%)")
+
     # serve
-    sub.add_parser("serve", help="Start MCP stdio server")
+    p = sub.add_parser("serve", help="Start MCP stdio server")
+    p.add_argument("--workers", type=int, default=4,
+                   help="Threads for concurrent tool calls (default: 4)")
+    p.add_argument("--watch-interval", type=float, default=2.0,
+                   help="Seconds between module change polls; 0 disables hot reload")
+    p.add_argument("--search-cache-mb", type=float, default=4.0,
+                   help="Memory cap for cached search results (default: 4; 0 disables)")
+    p.add_argument("--log-path", type=Path, default=LOG_PATH,
+                   help="Token usage log for tool calls (default: data/token_log.jsonl)")
 
     return parser
 
@@ -367,15 +683,20 @@ def main() -> None:
         "check-index": cmd_check_index,
         "search": cmd_search,
         "get-contract": cmd_get_contract,
+        "get-contracts": cmd_get_contracts,
+        "get-contract-closure": cmd_get_contract_closure,
         "get-section": cmd_get_section,
+        "get-sections": cmd_get_sections,
         "list-modules": cmd_list_modules,
         "list-contracts": cmd_list_contracts,
         "list-standards": cmd_list_standards,
         "find-standard": cmd_find_standard,
+        "query-standards": cmd_query_standards,
         "outline": cmd_outline,
         "token-report": cmd_token_report,
         "batch-generate": cmd_batch_generate,
         "batch-analyze": cmd_batch_analyze,
+        "bench": cmd_bench,
         "serve": cmd_serve,
     }
 
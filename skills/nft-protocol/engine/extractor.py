@@ -2,16 +2,65 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from .trigram import lookup_from_index
+
+# Upper bound on decoded slices kept in the LRU cache (source bytes)
+SLICE_CACHE_BYTES = 8 * 1024 * 1024
+
+# Placeholder for a function body dropped to meet a max_tokens budget
+ELISION_MARKER = "// ... {} lines elided"
+TRUNCATION_MARKER = "... truncated ({} more lines)"
+
+
+class _OpenModule:
+    """A module file open for pread, with the fstat signature of that file.
+
+    ``readers`` counts reads in flight (guarded by Extractor._lock); a
+    retired module is closed as soon as it drops to zero, so a reader
+    never has its descriptor closed or reused underneath it.
+    """
+    __slots__ = ("signature", "size", "file", "readers", "retired")
+
+    def __init__(self, file: Any):
+        st = os.fstat(file.fileno())
+        self.signature: Tuple[int, int, int] = (st.st_mtime_ns, st.st_size, st.st_ino)
+        self.size = st.st_size
+        self.file = file  # unbuffered binary file
+        self.readers = 0
+        self.retired = False
 
 
 class Extractor:
-    """Extract specific contracts, sections, or code blocks from modules."""
+    """Extract specific contracts, sections, or code blocks from modules.
 
-    def __init__(self, index_data: Dict[str, Any], modules_dir: Path):
+    Module files are opened once and reopened when their stat signature
+    changes, and a replaced file is closed once its last read finishes;
+    ranges are read with ``os.pread`` rather than a memory map, so a
+    module truncated in place mid-read yields a short read, not SIGBUS.
+    Decoded byte ranges are kept in a bounded LRU cache keyed by that
+    signature, so hot entries are served without reading.
+    """
+
+    def __init__(self, index_data: Dict[str, Any], modules_dir: Path,
+                 cache_bytes: int = SLICE_CACHE_BYTES):
         self.index = index_data
         self.modules_dir = modules_dir
+        self.lookup = lookup_from_index(index_data)
+        self.cache_bytes = cache_bytes
+        self._lock = threading.Lock()
+        self._paths: Dict[str, Path] = {}
+        self._files: Dict[str, _OpenModule] = {}
+        self._closed = False
+        self._slices: "OrderedDict[Tuple[Any, ...], str]" = OrderedDict()
+        self._slice_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def _safe_path(self, module_file: str) -> Path:
         """Validate module_file to prevent path traversal attacks."""
@@ -37,62 +86,220 @@ class Extractor:
             raise ValueError(f"Path traversal blocked: {module_file}")
         return resolved
 
+    def _module_path(self, module_file: str) -> Path:
+        """_safe_path, memoized per module name."""
+        path = self._paths.get(module_file)
+        if path is None:
+            path = self._paths[module_file] = self._safe_path(module_file)
+        return path
+
+    def _acquire(self, module_file: str) -> _OpenModule:
+        """The module's open file, reopened if it changed; pair with _release."""
+        path = self._module_path(module_file)
+        st = path.stat()
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        with self._lock:
+            opened = self._files.get(module_file)
+            if opened is not None and opened.signature == signature:
+                opened.readers += 1
+                return opened
+        # The signature comes from fstat on the new descriptor, so it
+        # always describes the inode actually read
+        fresh = _OpenModule(open(path, "rb", buffering=0))
+        with self._lock:
+            fresh.readers += 1
+            if self._closed:
+                fresh.retired = True  # Serve this read, keep nothing open
+                return fresh
+            old = self._files.get(module_file)
+            self._files[module_file] = fresh
+            if old is not None:
+                old.retired = True
+                if old.readers:
+                    old = None  # Its last reader closes it
+        if old is not None:
+            old.file.close()
+        return fresh
+
+    def _release(self, opened: _OpenModule) -> None:
+        with self._lock:
+            opened.readers -= 1
+            if not opened.retired or opened.readers:
+                return
+        opened.file.close()
+
     def _read_range(self, module_file: str, byte_offset: int, byte_length: int) -> str:
         """Read a byte range from a module file with bounds validation."""
-        path = self._safe_path(module_file)
-        file_size = path.stat().st_size
+        opened = self._acquire(module_file)
+        try:
+            return self._slice(opened, module_file, byte_offset, byte_length)
+        finally:
+            self._release(opened)
+
+    def _read_many(self, ranges: List[Tuple[str, int, int]]) -> List[Any]:
+        """Read ``(module_file, byte_offset, byte_length)`` ranges in one pass.
+
+        Ranges are visited in (module_file, byte_offset) order so each module
+        is validated, stat'ed and opened once. Returns, in input order, the
+        text of each range or the exception that range raised.
+        """
+        out: List[Any] = [None] * len(ranges)
+        opened: Any = None
+        current = None
+        try:
+            for i in sorted(range(len(ranges)), key=lambda i: ranges[i]):
+                module_file, byte_offset, byte_length = ranges[i]
+                if module_file != current:
+                    current = module_file
+                    if isinstance(opened, _OpenModule):
+                        self._release(opened)
+                    try:
+                        opened = self._acquire(module_file)
+                    except (OSError, ValueError) as e:
+                        opened = e
+                if isinstance(opened, Exception):
+                    out[i] = opened
+                    continue
+                try:
+                    out[i] = self._slice(opened, module_file, byte_offset, byte_length)
+                except (OSError, ValueError) as e:
+                    out[i] = e
+        finally:
+            if isinstance(opened, _OpenModule):
+                self._release(opened)
+        return out
+
+    def _slice(self, opened: _OpenModule, module_file: str,
+               byte_offset: int, byte_length: int) -> str:
+        file_size = opened.size
         if byte_offset < 0 or byte_offset >= file_size:
             raise ValueError(
                 f"byte_offset {byte_offset} out of range for {module_file} ({file_size} bytes)"
             )
         # Clamp byte_length to not exceed file size
         clamped_length = min(byte_length, file_size - byte_offset)
-        with open(path, "rb") as f:
-            f.seek(byte_offset)
-            raw = f.read(clamped_length)
-            try:
-                return raw.decode("utf-8")
-            except UnicodeDecodeError:
-                return raw.decode("utf-8", errors="replace")
-
-    def _read_lines(self, module_file: str, start: int, end: int) -> str:
-        """Read a line range from a module file with bounds validation."""
-        path = self._safe_path(module_file)
-        lines = path.read_text(encoding="utf-8").split("\n")
-        total = len(lines)
-        if start < 0:
-            start = 0
-        if end >= total:
-            end = total - 1
-        if start > end or start >= total:
-            raise ValueError(
-                f"Line range [{start}:{end}] out of bounds for {module_file} ({total} lines)"
-            )
-        return "\n".join(lines[start : end + 1])
 
-    def get_contract(self, name: str) -> Optional[Dict[str, Any]]:
-        """Extract a single contract by name."""
+        key = (module_file, opened.signature, byte_offset, clamped_length)
+        with self._lock:
+            text = self._slices.get(key)
+            if text is not None:
+                self._slices.move_to_end(key)
+                self.cache_hits += 1
+                return text
+            self.cache_misses += 1
+
+        raw = os.pread(opened.file.fileno(), clamped_length, byte_offset)
+        try:
+            text = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            text = raw.decode("utf-8", errors="replace")
+
+        # A short read means the file shrank after its stat; don't cache that
+        if len(raw) == clamped_length and clamped_length <= self.cache_bytes:
+            with self._lock:
+                if key not in self._slices:
+                    self._slices[key] = text
+                    self._slice_bytes += clamped_length
+                    while self._slice_bytes > self.cache_bytes:
+                        old_key, _ = self._slices.popitem(last=False)
+                        self._slice_bytes -= old_key[3]
+        return text
+
+    def close(self) -> None:
+        """Drop cached slices and close module files once their reads finish."""
+        with self._lock:
+            self._closed = True
+            idle = []
+            for opened in self._files.values():
+                opened.retired = True
+                if not opened.readers:
+                    idle.append(opened)
+            self._files.clear()
+            self._slices.clear()
+            self._slice_bytes = 0
+        for opened in idle:
+            opened.file.close()
+
+    def _contract_name(self, name: str) -> Optional[str]:
+        if name in self.index.get("contracts", {}):
+            return name
+        # Try case-insensitive match
+        return self.lookup.exact("contract", name)
+
+    def get_contract(self, name: str,
+                     max_tokens: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Extract a single contract by name.
+
+        With ``max_tokens``, long function bodies are elided (largest
+        first) until the contract fits; see _budgeted.
+        """
         contracts = self.index.get("contracts", {})
-        matched_name = name
-        if matched_name not in contracts:
-            # Try case-insensitive match
-            for k in contracts:
-                if k.lower() == matched_name.lower():
-                    matched_name = k
-                    break
-            else:
-                return None
+        matched_name = self._contract_name(name)
+        if matched_name is None:
+            return None
 
         c = contracts[matched_name]
-        content = self._read_lines(c["module_file"], c["start_line"], c["end_line"])
+        if max_tokens is None:
+            content = self._read_range(c["module_file"], c["byte_offset"], c["byte_length"])
+            return self._contract_result(matched_name, c, content)
+        content, est_tokens, budget = self._budgeted(c, max_tokens)
+        result = self._contract_result(matched_name, c, content, est_tokens)
+        result["budget"] = budget
+        return result
 
+    def get_contracts(self, names: List[str]) -> Dict[str, Any]:
+        """Extract several contracts, reading each module once.
+
+        Results come back in request order; a name that is unknown (or
+        whose range cannot be read) yields ``{"name", "error"}`` in place,
+        with ``"missing": True`` when the name matched nothing.
+        """
+        contracts = self.index.get("contracts", {})
+        matched = [self._contract_name(name) for name in names]
+        ranges = [(contracts[m]["module_file"], contracts[m]["byte_offset"],
+                   contracts[m]["byte_length"]) for m in matched if m is not None]
+        contents = iter(self._read_many(ranges))
+
+        results = []
+        for name, m in zip(names, matched):
+            if m is None:
+                results.append({"name": name, "error": f"Contract '{name}' not found",
+                                "missing": True})
+                continue
+            content = next(contents)
+            if isinstance(content, Exception):
+                results.append({"name": name, "error": str(content)})
+            else:
+                results.append(self._contract_result(m, contracts[m], content))
+        return self._batch_result(results)
+
+    def _batch_result(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        found = [r for r in results if "error" not in r]
+        modules = {r["module_file"] for r in found}
+        est_tokens = sum(r["tokens"]["estimated_output"] for r in found)
+        full_tokens = max(sum(self.index.get("modules", {}).get(m, {}).get("size_bytes", 0)
+                              for m in modules) // 4, 1)
+        return {
+            "requested": len(results),
+            "found": len(found),
+            "modules": len(modules),
+            "results": results,
+            "tokens": {
+                "estimated_output": est_tokens,
+                "full_module_tokens": full_tokens,
+                "reduction_pct": round((1 - est_tokens / full_tokens) * 100, 1),
+            },
+        }
+
+    def _contract_result(self, matched_name: str, c: Dict[str, Any], content: str,
+                         est_tokens: Optional[int] = None) -> Dict[str, Any]:
         full_module_bytes = 0
         mod = self.index.get("modules", {}).get(c["module_file"], {})
         if mod:
             full_module_bytes = mod.get("size_bytes", 0)
 
-        content_bytes = len(content.encode("utf-8"))
-        est_tokens = content_bytes // 4
+        if est_tokens is None:
+            est_tokens = c["tokens"] if "tokens" in c else len(content.encode("utf-8")) // 4
         full_tokens = max(full_module_bytes // 4, 1)
 
         return {
@@ -112,35 +319,267 @@ class Extractor:
             },
         }
 
-    def get_section(self, section_id: str, outline_only: bool = False) -> Optional[Dict[str, Any]]:
-        """Extract a full section or just its outline."""
-        sections = self.index.get("sections", {})
-        matched_id = section_id
-        if matched_id not in sections:
-            # Try partial match
-            for k in sections:
-                if matched_id in k:
-                    matched_id = k
-                    break
+    def get_contract_closure(self, name: str,
+                             max_tokens: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Extract a contract with everything it transitively depends on.
+
+        Follows ``depends_on`` (inheritance + local imports) breadth-first.
+        Code blocks shared by several contracts are returned once, grouped
+        by module and read one module at a time. With ``max_tokens``, the
+        deepest dependencies are dropped first until the rest fits; the
+        requested contract itself is always kept.
+        """
+        contracts = self.index.get("contracts", {})
+        root = self._contract_name(name)
+        if root is None:
+            return None
+
+        depth = {root: 0}
+        order = [root]
+        for current in order:  # BFS: order grows while iterating
+            for dep in contracts[current].get("depends_on", []):
+                if dep in contracts and dep not in depth:
+                    depth[dep] = depth[current] + 1
+                    order.append(dep)
+
+        # One entry per distinct code block, in discovery order
+        blocks: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+        for n in order:
+            c = contracts[n]
+            key = (c["module_file"], c["byte_offset"], c["byte_length"])
+            block = blocks.get(key)
+            if block is None:
+                blocks[key] = {"contracts": [n], "depth": depth[n],
+                               "tokens": c.get("tokens", c["byte_length"] // 4)}
             else:
-                return None
+                block["contracts"].append(n)
+        deduplicated = sum(contracts[n].get("tokens", contracts[n]["byte_length"] // 4)
+                           for n in order) - sum(b["tokens"] for b in blocks.values())
+
+        pruned = []
+        total = sum(b["tokens"] for b in blocks.values())
+        if max_tokens is not None and total > max_tokens:
+            root_key = next(iter(blocks))
+            candidates = [k for k in blocks if k != root_key]
+            # Deepest first; among equals, the most recently discovered
+            for key in sorted(reversed(candidates), key=lambda k: -blocks[k]["depth"]):
+                if total <= max_tokens:
+                    break
+                block = blocks.pop(key)
+                total -= block["tokens"]
+                pruned.append(block)
+
+        keys = sorted(blocks)  # Grouped by module, in file order
+        modules: List[Dict[str, Any]] = []
+        for key, content in zip(keys, self._read_many(keys)):
+            if isinstance(content, Exception):
+                raise content
+            module_file = key[0]
+            if not modules or modules[-1]["module_file"] != module_file:
+                modules.append({"module_file": module_file, "blocks": []})
+            block = blocks[key]
+            first = contracts[block["contracts"][0]]
+            modules[-1]["blocks"].append({
+                "contracts": block["contracts"],
+                "depth": block["depth"],
+                "section_id": first["section_id"],
+                "file_path": first.get("file_path"),
+                "start_line": first["start_line"],
+                "end_line": first["end_line"],
+                "content": content,
+            })
+
+        kept = {n for b in blocks.values() for n in b["contracts"]}
+        full_module_bytes = sum(
+            self.index.get("modules", {}).get(m, {}).get("size_bytes", 0)
+            for m in {contracts[n]["module_file"] for n in order})
+        full_tokens = max(full_module_bytes // 4, 1)
+        return {
+            "name": root,
+            "contracts": [{
+                "name": n,
+                "depth": depth[n],
+                "module_file": contracts[n]["module_file"],
+                "depends_on": [d for d in contracts[n].get("depends_on", []) if d in contracts],
+            } for n in order if n in kept],
+            "modules": modules,
+            "pruned": pruned,
+            "tokens": {
+                "estimated_output": total,
+                "budget": max_tokens,
+                "deduplicated": deduplicated,
+                "full_module_tokens": full_tokens,
+                "reduction_pct": round((1 - total / full_tokens) * 100, 1),
+            },
+        }
+
+    def get_section(self, section_id: str, outline_only: bool = False,
+                    max_tokens: Optional[int] = None,
+                    depth: int = 0) -> Optional[Dict[str, Any]]:
+        """Extract a full section or just its outline.
+
+        With ``max_tokens`` the section falls back from full content to
+        elided function bodies to the outline, whichever first fits. With
+        ``depth`` > 0 the subsections up to that many levels down are
+        included (see _get_subtree). Raises ValueError for a negative depth.
+        """
+        if depth < 0:
+            raise ValueError(f"depth must be >= 0, got {depth}")
+        sections = self.index.get("sections", {})
+        matched_id = self._section_id(section_id)
+        if matched_id is None:
+            return None
 
         s = sections[matched_id]
+        if depth > 0:
+            return self._get_subtree(matched_id, depth, outline_only, max_tokens)
+
+        if max_tokens is not None:
+            outline = s["outline"] if "outline" in s else self._get_section_outline(s)
+            if outline_only:
+                content, est_tokens, budget = self._truncated(
+                    outline, max_tokens, {"max_tokens": max_tokens, "mode": "outline"})
+            else:
+                content, est_tokens, budget = self._budgeted(s, max_tokens, outline)
+            result = self._section_result(matched_id, s, content, est_tokens)
+            result["budget"] = budget
+            return result
 
         if outline_only:
-            content = self._get_section_outline(s)
+            if "outline" in s:
+                content, est_tokens = s["outline"], s["outline_tokens"]
+            else:
+                content = self._get_section_outline(s)
+                est_tokens = len(content.encode("utf-8")) // 4
         else:
-            content = self._read_lines(
-                s["module_file"], s["start_line"], s["end_line"]
+            content = self._read_range(
+                s["module_file"], s["byte_offset"], s["byte_length"]
             )
+            est_tokens = s["tokens"] if "tokens" in s else len(content.encode("utf-8")) // 4
+        return self._section_result(matched_id, s, content, est_tokens)
+
+    def _subtree_ids(self, root_id: str, depth: int) -> Tuple[List[str], List[str]]:
+        """Sections within ``depth`` levels of ``root_id`` in document order,
+        and the subsections just below that depth that were left out."""
+        sections = self.index.get("sections", {})
+        included: List[str] = []
+        omitted: List[str] = []
+        stack = [(root_id, 0)]
+        while stack:
+            sec_id, level = stack.pop()
+            included.append(sec_id)
+            children = sections[sec_id].get("subsections", [])
+            if level == depth:
+                omitted.extend(children)
+            else:
+                stack.extend((child, level + 1) for child in reversed(children))
+        return included, omitted
+
+    def _get_subtree(self, root_id: str, depth: int, outline_only: bool,
+                     max_tokens: Optional[int]) -> Dict[str, Any]:
+        """A section with its subsections, from one read of the subtree's range.
+
+        The subtree is contiguous in the module, so the whole range is read
+        once; when ``depth`` cuts off deeper subsections their bytes are
+        dropped from that buffer rather than read separately. Outlines are
+        joined from the precomputed per-section outlines without any read.
+        """
+        sections = self.index.get("sections", {})
+        s = sections[root_id]
+        included, omitted = self._subtree_ids(root_id, depth)
+        members = [sections[sec_id] for sec_id in included]
+        outline = "\n".join(m["outline"] if "outline" in m else self._get_section_outline(m)
+                            for m in members)
+
+        if outline_only:
+            content, est_tokens = outline, len(outline.encode("utf-8")) // 4
+            budget = None
+            if max_tokens is not None:
+                content, est_tokens, budget = self._truncated(
+                    outline, max_tokens, {"max_tokens": max_tokens, "mode": "outline"})
+        else:
+            data = self._read_range(s["module_file"], s["byte_offset"],
+                                    s.get("subtree_byte_length", s["byte_length"])).encode("utf-8")
+            parts, pieces, spans, pos = [], [], [], 0
+            for m in members:
+                rel = m["byte_offset"] - s["byte_offset"]
+                parts.append(data[rel:rel + m["byte_length"]])
+                pieces.append((pos, m["start_line"]))
+                spans.extend(f"{off + pos}:{length}:{lines}"
+                             for off, length, lines in _parse_elisions(m.get("elisions", "")))
+                pos += m["byte_length"] + 1
+            data = b"\n".join(parts) if omitted else data
+            content = data.decode("utf-8", errors="replace")
+            est_tokens = len(data) // 4
+            budget = None
+            if max_tokens is not None:
+                rec = {"module_file": s["module_file"], "start_line": s["start_line"],
+                       "byte_length": len(data), "tokens": est_tokens,
+                       "elisions": " ".join(spans), "pieces": pieces, "content": content}
+                content, est_tokens, budget = self._budgeted(rec, max_tokens, outline)
+
+        result = self._section_result(root_id, s, content, est_tokens)
+        result["contracts"] = [name for m in members for name in m.get("contracts", [])]
+        result["code_block_count"] = sum(m.get("code_block_count", 0) for m in members)
+        result["subtree"] = {
+            "depth": depth,
+            "sections": [{"id": sec_id, "title": m["title"], "level": m["level"]}
+                         for sec_id, m in zip(included, members)],
+            "omitted_subsections": omitted,
+        }
+        if budget is not None:
+            result["budget"] = budget
+        return result
+
+    def get_sections(self, section_ids: List[str], outline_only: bool = False) -> Dict[str, Any]:
+        """Extract several sections, reading each module once (see get_contracts)."""
+        sections = self.index.get("sections", {})
+        matched = [self._section_id(sec_id) for sec_id in section_ids]
+        # Precomputed outlines need no reads at all
+        to_read = [m for m in matched if m is not None
+                   and not (outline_only and "outline" in sections[m])]
+        contents = iter(self._read_many([
+            (sections[m]["module_file"], sections[m]["byte_offset"], sections[m]["byte_length"])
+            for m in to_read]))
 
+        results = []
+        for sec_id, m in zip(section_ids, matched):
+            if m is None:
+                results.append({"id": sec_id, "error": f"Section '{sec_id}' not found",
+                                "missing": True})
+                continue
+            s = sections[m]
+            if outline_only and "outline" in s:
+                results.append(self._section_result(m, s, s["outline"], s["outline_tokens"]))
+                continue
+            content = next(contents)
+            if isinstance(content, Exception):
+                results.append({"id": sec_id, "error": str(content)})
+                continue
+            if outline_only:
+                from .indexer import section_outline
+                content = section_outline(content.split("\n"))
+                est_tokens = len(content.encode("utf-8")) // 4
+            else:
+                est_tokens = s["tokens"] if "tokens" in s else len(content.encode("utf-8")) // 4
+            results.append(self._section_result(m, s, content, est_tokens))
+        return self._batch_result(results)
+
+    def _section_id(self, section_id: str) -> Optional[str]:
+        if section_id in self.index.get("sections", {}):
+            return section_id
+        # Try partial match: exact (any case), then prefix, then
+        # substring; shorter IDs win ties, then alphabetical order
+        candidates = self.lookup.find("section", section_id, limit=1, fuzzy=False)
+        return candidates[0][2] if candidates else None
+
+    def _section_result(self, matched_id: str, s: Dict[str, Any], content: str,
+                        est_tokens: int) -> Dict[str, Any]:
         full_module_bytes = 0
         mod = self.index.get("modules", {}).get(s["module_file"], {})
         if mod:
             full_module_bytes = mod.get("size_bytes", 0)
 
-        content_bytes = len(content.encode("utf-8"))
-        est_tokens = content_bytes // 4
         full_tokens = max(full_module_bytes // 4, 1)
 
         return {
@@ -149,6 +588,8 @@ class Extractor:
             "module_file": s["module_file"],
             "contracts": s.get("contracts", []),
             "code_block_count": s.get("code_block_count", 0),
+            "parent": s.get("parent"),
+            "subsections": s.get("subsections", []),
             "content": content,
             "tokens": {
                 "estimated_output": est_tokens,
@@ -159,30 +600,90 @@ class Extractor:
             },
         }
 
+    def _budgeted(self, rec: Dict[str, Any], max_tokens: int,
+                  outline: Optional[str] = None) -> Tuple[str, int, Dict[str, Any]]:
+        """Richest rendering of a contract/section record within ``max_tokens``.
+
+        Tries, in order: the full range; the range with the function bodies
+        listed in the record's precomputed ``elisions`` replaced by a
+        one-line placeholder, largest first, until it fits; ``outline``
+        (sections only). Whatever is left over budget is cut at a line
+        boundary. Returns (content, estimated tokens, budget report).
+
+        A record may carry its ``content`` already read, with ``pieces``
+        mapping offsets in it back to module lines (see _get_subtree).
+        """
+        full_tokens = rec["tokens"] if "tokens" in rec else rec["byte_length"] // 4
+        spans = _parse_elisions(rec.get("elisions", ""))
+        # Lower bound with every body elided (placeholders not counted)
+        floor_tokens = (rec["byte_length"] - sum(length for _, length, _ in spans)) // 4
+        budget: Dict[str, Any] = {"max_tokens": max_tokens, "mode": "full",
+                                  "full_tokens": full_tokens}
+
+        if full_tokens > max_tokens and floor_tokens > max_tokens and outline is not None:
+            budget["mode"] = "outline"
+            return self._truncated(outline, max_tokens, budget)
+
+        content = rec["content"] if "content" in rec else self._read_range(
+            rec["module_file"], rec["byte_offset"], rec["byte_length"])
+        if full_tokens <= max_tokens:
+            return self._truncated(content, max_tokens, budget)
+
+        data = content.encode("utf-8")
+        elided, chosen = _elide(data, spans, max_tokens * 4 + 3)
+        if len(elided) // 4 > max_tokens and outline is not None:
+            budget["mode"] = "outline"
+            return self._truncated(outline, max_tokens, budget)
+        budget["mode"] = "elided"
+        budget["elided"] = [{
+            "start_line": self._line_at(rec, data, off),
+            "end_line": self._line_at(rec, data, off) + lines - 1,
+            "lines": lines,
+        } for off, _, lines in chosen]
+        return self._truncated(elided.decode("utf-8"), max_tokens, budget)
+
+    @staticmethod
+    def _line_at(rec: Dict[str, Any], data: bytes, off: int) -> int:
+        """Module line of byte ``off`` in a record's (possibly spliced) content."""
+        start, line = 0, rec["start_line"]
+        for piece_off, piece_line in rec.get("pieces", ()):
+            if piece_off > off:
+                break
+            start, line = piece_off, piece_line
+        return line + data.count(b"\n", start, off)
+
+    @staticmethod
+    def _truncated(content: str, max_tokens: int,
+                   budget: Dict[str, Any]) -> Tuple[str, int, Dict[str, Any]]:
+        """Cut ``content`` at a line boundary to fit; finish the budget report."""
+        size = len(content.encode("utf-8"))
+        budget.setdefault("full_tokens", size // 4)
+        budget.setdefault("elided", [])
+        budget["truncated_lines"] = 0
+        if size // 4 > max_tokens:
+            lines = content.split("\n")
+            limit = max_tokens * 4 + 3 - len(TRUNCATION_MARKER) - 8
+            kept, used = [], 0
+            for line in lines:
+                used += len(line.encode("utf-8")) + 1
+                if used > limit:
+                    break
+                kept.append(line)
+            budget["truncated_lines"] = len(lines) - len(kept)
+            kept.append(TRUNCATION_MARKER.format(budget["truncated_lines"]))
+            content = "\n".join(kept)
+            size = len(content.encode("utf-8"))
+        est_tokens = size // 4
+        budget["dropped_tokens"] = max(budget["full_tokens"] - est_tokens, 0)
+        return content, est_tokens, budget
+
     def _get_section_outline(self, section: Dict[str, Any]) -> str:
-        """Return headings + contract/interface declarations only."""
-        lines = self._read_lines(
-            section["module_file"], section["start_line"], section["end_line"]
-        ).split("\n")
-
-        outline = []
-        in_code = False
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith("```"):
-                in_code = not in_code
-                continue
-            if not in_code:
-                if stripped.startswith("#") or stripped.startswith("File:"):
-                    outline.append(line)
-            else:
-                # In code: only keep contract/interface/library declarations
-                if any(
-                    stripped.startswith(kw)
-                    for kw in ("contract ", "interface ", "library ", "abstract contract ")
-                ):
-                    outline.append(f"  {stripped}")
-        return "\n".join(outline)
+        """Outline of a section read from its module (indexes without outlines)."""
+        from .indexer import section_outline
+
+        return section_outline(self._read_range(
+            section["module_file"], section["byte_offset"], section["byte_length"]
+        ).split("\n"))
 
     def get_module_outline(self, module_file: str) -> Optional[Dict[str, Any]]:
         """Get the structural outline of a module (no code bodies)."""
@@ -207,8 +708,10 @@ class Extractor:
                     "summary": sec.get("summary", ""),
                 })
 
-        outline_str = json.dumps(sections_data, ensure_ascii=False)
-        outline_tokens = len(outline_str.encode("utf-8")) // 4
+        outline_tokens = mod.get("outline_tokens")
+        if outline_tokens is None:
+            outline_str = json.dumps(sections_data, ensure_ascii=False)
+            outline_tokens = len(outline_str.encode("utf-8")) // 4
         full_tokens = max(mod["size_bytes"] // 4, 1)
 
         return {
@@ -227,3 +730,44 @@ class Extractor:
                 ),
             },
         }
+
+
+def _parse_elisions(packed: str) -> List[Tuple[int, int, int]]:
+    """Decode an index ``elisions`` string into (offset, length, lines) triples."""
+    spans = []
+    for entry in packed.split():
+        off, length, lines = entry.split(":")
+        spans.append((int(off), int(length), int(lines)))
+    return spans
+
+
+def _elide(data: bytes, spans: List[Tuple[int, int, int]],
+           limit: int) -> Tuple[bytes, List[Tuple[int, int, int]]]:
+    """Replace the largest spans of ``data`` with placeholders until it fits ``limit`` bytes.
+
+    Returns the new bytes and the spans replaced, in offset order.
+    """
+    markers = {}
+    for span in spans:
+        off, length, lines = span
+        indent = data[off:off + length]
+        indent = indent[:len(indent) - len(indent.lstrip(b" \t"))]
+        markers[span] = indent + ELISION_MARKER.format(lines).encode("utf-8") + b"\n"
+
+    excess = len(data) - limit
+    chosen = []
+    for span in sorted(spans, key=lambda sp: len(markers[sp]) - sp[1]):
+        saving = span[1] - len(markers[span])
+        if excess <= 0 or saving <= 0:
+            break
+        chosen.append(span)
+        excess -= saving
+    chosen.sort()
+
+    parts, pos = [], 0
+    for span in chosen:
+        parts.append(data[pos:span[0]])
+        parts.append(markers[span])
+        pos = span[0] + span[1]
+    parts.append(data[pos:])
+    return b"".join(parts), chosen
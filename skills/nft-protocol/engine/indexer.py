@@ -2,12 +2,18 @@
 from __future__ import annotations
 
 import hashlib
+import json
+import os
+import posixpath
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from .schema import CodeBlock, Contract, Index, ModuleInfo, Section
+from .stdsets import build_standard_sets, normalize_standard
+from .trigram import build_lookup_index
 
 # Solidity keywords/types that the regex captures but are NOT contract names
 SOLIDITY_KEYWORDS = frozenset({
@@ -32,7 +38,31 @@ RE_INTERFACE = re.compile(r"\binterface\s+(\w+)")
 RE_LIBRARY = re.compile(r"\blibrary\s+(\w+)")
 RE_STANDARD = re.compile(r"\b(ERC-?\d{3,5}|EIP-?\d{3,5})\b", re.IGNORECASE)
 RE_IMPORT = re.compile(r'import\s+.*?["\'](.+?)["\']')
+RE_HERITAGE = re.compile(r"\b(?:contract|interface|library)\s+(\w+)\s+is\s+([^{;]+)\{")
+RE_PARENS = re.compile(r"\([^()]*\)")
+RE_IDENTIFIER = re.compile(r"[A-Za-z_][\w.]*")
 RE_FILE_PATH = re.compile(r"^File:\s*`(.+?)`", re.IGNORECASE)
+RE_STANDARD_WORD = re.compile(r"\b(?:ERC|EIP)-(\d{3,5})\b", re.IGNORECASE)
+RE_WORD = re.compile(r"[A-Za-z0-9]+")
+RE_WORD_PART = re.compile(r"(?:ERC|EIP)\d+|[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+RE_FUNCTION_HEADER = re.compile(
+    r"^\s*(?:(?:export\s+)?(?:default\s+)?(?:async\s+)?function\b|constructor\b"
+    r"|modifier\s|fallback\b|receive\b|(?:pub(?:\([\w:]+\))?\s+)?(?:async\s+)?fn\s)"
+)
+RE_BRACE_NOISE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|//.*')
+
+# Code block languages whose function bodies are brace-delimited
+BRACE_LANGUAGES = frozenset({
+    "solidity", "sol", "typescript", "ts", "tsx", "javascript", "js", "jsx", "rust", "cvl",
+})
+# Bodies shorter than this are kept; a placeholder would save little
+MIN_ELIDED_LINES = 5
+
+# Fields covered by the inverted index, per document kind
+SEARCH_FIELDS = {
+    "contract": ("name", "file_path", "imports", "standards"),
+    "section": ("title", "summary"),
+}
 
 
 def _slugify(text: str) -> str:
@@ -43,21 +73,24 @@ def _slugify(text: str) -> str:
     return s[:80]
 
 
-def _byte_offset_of_line(content: str, line_num: int) -> int:
-    """Get byte offset of a 0-indexed line number."""
-    offset = 0
-    for i, line in enumerate(content.split("\n")):
-        if i == line_num:
-            return offset
-        offset += len(line.encode("utf-8")) + 1  # +1 for newline
-    return offset
+def _line_byte_offsets(lines: List[str]) -> List[int]:
+    """Byte offset of every line start, plus one past the final newline.
+
+    ``offsets[i]`` is where line ``i`` begins; the byte length of lines
+    ``start..end`` (inclusive, joined by newlines) is
+    ``offsets[end + 1] - offsets[start] - 1``.
+    """
+    offsets = [0] * (len(lines) + 1)
+    pos = 0
+    for i, line in enumerate(lines):
+        pos += len(line.encode("utf-8")) + 1  # +1 for newline
+        offsets[i + 1] = pos
+    return offsets
 
 
-def _byte_length_of_range(content: str, start: int, end: int) -> int:
+def _byte_length_of_range(offsets: List[int], start: int, end: int) -> int:
     """Get byte length from start_line to end_line (0-indexed, inclusive)."""
-    lines = content.split("\n")
-    selected = "\n".join(lines[start : end + 1])
-    return len(selected.encode("utf-8"))
+    return offsets[end + 1] - offsets[start] - 1
 
 
 def _extract_first_paragraph(lines: List[str], start: int) -> str:
@@ -75,9 +108,44 @@ def _extract_first_paragraph(lines: List[str], start: int) -> str:
     return " ".join(result)[:200]
 
 
-def _find_sections(content: str, file_name: str) -> List[Dict[str, Any]]:
+def section_outline(lines: List[str]) -> str:
+    """Headings and File: annotations, plus contract/interface/library
+    declarations from code blocks, one per line."""
+    outline = []
+    in_code = False
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            in_code = not in_code
+            continue
+        if not in_code:
+            if stripped.startswith("#") or stripped.startswith("File:"):
+                outline.append(line)
+        else:
+            # In code: only keep contract/interface/library declarations
+            if any(
+                stripped.startswith(kw)
+                for kw in ("contract ", "interface ", "library ", "abstract contract ")
+            ):
+                outline.append(f"  {stripped}")
+    return "\n".join(outline)
+
+
+def _module_outline_tokens(sections: List[Dict[str, Any]]) -> int:
+    """Token estimate of the outline get_module_outline returns."""
+    outline = [{
+        "id": sec["id"],
+        "title": sec["title"],
+        "level": sec["level"],
+        "contracts": sec["contracts"],
+        "code_blocks": sec["code_block_count"],
+        "summary": sec["summary"],
+    } for sec in sections]
+    return len(json.dumps(outline, ensure_ascii=False).encode("utf-8")) // 4
+
+
+def _find_sections(lines: List[str]) -> List[Dict[str, Any]]:
     """Find all sections (headings) in a markdown file."""
-    lines = content.split("\n")
     sections = []
     for i, line in enumerate(lines):
         m = RE_HEADING.match(line)
@@ -111,9 +179,25 @@ def _find_sections(content: str, file_name: str) -> List[Dict[str, Any]]:
     return sections
 
 
-def _find_code_blocks(content: str) -> List[Dict[str, Any]]:
+def _section_tree(sections: List[Dict[str, Any]], last_line: int) -> None:
+    """Set each section's ``parent_index`` and ``subtree_end_line`` in one pass.
+
+    A stack holds the open ancestors; a heading closes every open section
+    of the same or a deeper level, and whatever is still open at the end
+    runs to ``last_line``.
+    """
+    stack: List[int] = []
+    for i, sec in enumerate(sections):
+        while stack and sections[stack[-1]]["level"] >= sec["level"]:
+            sections[stack.pop()]["subtree_end_line"] = sec["start_line"] - 1
+        sec["parent_index"] = stack[-1] if stack else None
+        stack.append(i)
+    for i in stack:
+        sections[i]["subtree_end_line"] = last_line
+
+
+def _find_code_blocks(lines: List[str]) -> List[Dict[str, Any]]:
     """Find all fenced code blocks in the content."""
-    lines = content.split("\n")
     blocks = []
     in_block = False
     block_start = 0
@@ -139,6 +223,85 @@ def _find_code_blocks(content: str) -> List[Dict[str, Any]]:
     return blocks
 
 
+def _assign_code_blocks(
+    sections: List[Dict[str, Any]], blocks: List[Dict[str, Any]]
+) -> List[List[Dict[str, Any]]]:
+    """Group code blocks under the section that fully contains them.
+
+    Sections are sorted and non-overlapping, and so are code blocks, so a
+    single sweep suffices. A block that straddles a section boundary (e.g.
+    a ``# comment`` inside a bash block parsed as a heading) belongs to no
+    section, matching the containment rule used for contract attribution.
+    """
+    assigned: List[List[Dict[str, Any]]] = [[] for _ in sections]
+    j = 0
+    for cb in blocks:
+        while j < len(sections) and sections[j]["end_line"] < cb["start_line"]:
+            j += 1
+        if j == len(sections):
+            break
+        sec = sections[j]
+        if cb["start_line"] >= sec["start_line"] and cb["end_line"] <= sec["end_line"]:
+            assigned[j].append(cb)
+    return assigned
+
+
+def _function_bodies(lines: List[str], block: Dict[str, Any]) -> List[Tuple[int, int]]:
+    """Line ranges (inclusive) of the long function bodies in a code block.
+
+    A body is the lines strictly between the line that opens a function's
+    brace and the line that closes it; nested functions are covered by
+    their enclosing body.
+    """
+    if block["language"] not in BRACE_LANGUAGES:
+        return []
+    bodies = []
+    end = block["end_line"]  # Closing fence
+    i = block["start_line"] + 1
+    while i < end:
+        if not RE_FUNCTION_HEADER.match(lines[i]):
+            i += 1
+            continue
+        depth = 0
+        open_line = None
+        j = i
+        while j < end:
+            code = RE_BRACE_NOISE.sub("", lines[j])
+            if open_line is None and "{" not in code and ";" in code:
+                break  # Declaration without a body
+            for ch in code:
+                if ch == "{":
+                    if open_line is None:
+                        open_line = j
+                    depth += 1
+                elif ch == "}" and open_line is not None:
+                    depth -= 1
+            if open_line is not None and depth <= 0:
+                break
+            j += 1
+        if open_line is None or depth > 0 or j >= end:
+            i += 1
+            continue
+        if j - open_line - 1 >= MIN_ELIDED_LINES:
+            bodies.append((open_line + 1, j - 1))
+        i = j + 1
+    return bodies
+
+
+def _elisions(line_offsets: List[int], start_line: int,
+              bodies: List[Tuple[int, int]]) -> str:
+    """Encode bodies as ``"offset:length:lines"`` entries relative to ``start_line``.
+
+    Offsets and lengths are in bytes and cover whole lines including their
+    trailing newline, so the extractor can splice them out without parsing.
+    """
+    base = line_offsets[start_line]
+    return " ".join(
+        f"{line_offsets[a] - base}:{line_offsets[b + 1] - line_offsets[a]}:{b - a + 1}"
+        for a, b in bodies
+    )
+
+
 def _is_valid_contract_name(name: str) -> bool:
     """Filter out Solidity keywords and invalid names captured by regex."""
     if len(name) < 2:
@@ -163,15 +326,23 @@ def _extract_imports(code: str) -> List[str]:
     return RE_IMPORT.findall(code)
 
 
+def _extract_inheritance(code: str) -> Dict[str, List[str]]:
+    """Map each declared name to its base contracts (``contract X is A, B(1)``)."""
+    bases: Dict[str, List[str]] = {}
+    for name, heritage in RE_HERITAGE.findall(code):
+        # Drop constructor arguments, innermost parentheses first
+        while True:
+            stripped = RE_PARENS.sub("", heritage)
+            if stripped == heritage:
+                break
+            heritage = stripped
+        bases.setdefault(name, [b.rsplit(".", 1)[-1] for b in RE_IDENTIFIER.findall(heritage)])
+    return bases
+
+
 def _extract_standards(text: str) -> List[str]:
     """Find all ERC/EIP standard references."""
-    raw = RE_STANDARD.findall(text)
-    normalized = set()
-    for s in raw:
-        s = s.upper().replace("EIP-", "ERC-").replace("ERC", "ERC-")
-        s = re.sub(r"ERC--+", "ERC-", s)
-        normalized.add(s)
-    return sorted(normalized)
+    return sorted({normalize_standard(s) for s in RE_STANDARD.findall(text)})
 
 
 def _find_file_path_annotation(lines: List[str], code_start: int) -> Optional[str]:
@@ -183,162 +354,458 @@ def _find_file_path_annotation(lines: List[str], code_start: int) -> Optional[st
     return None
 
 
-def build_index(modules_dir: Path) -> Index:
-    """Build the complete index from all markdown modules."""
+def _normalize_token(token: str) -> str:
+    token = token.lower()
+    if token.startswith("eip") and token[3:].isdigit():
+        token = "erc" + token[3:]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search tokens.
+
+    Identifiers yield the whole word plus its camelCase parts
+    ("FractionalVault" -> fractionalvault, fractional, vault), and
+    standards collapse to one token ("ERC-721", "EIP721" -> erc721).
+    """
+    text = RE_STANDARD_WORD.sub(lambda m: f"ERC{m.group(1)}", text)
+    tokens = []
+    for word in RE_WORD.findall(text):
+        whole = _normalize_token(word)
+        if len(whole) > 1:
+            tokens.append(whole)
+        parts = RE_WORD_PART.findall(word)
+        if len(parts) > 1:
+            tokens.extend(
+                t for t in (_normalize_token(p) for p in parts) if len(t) > 1
+            )
+    return tokens
+
+
+def build_search_index(
+    sections: Dict[str, Any], contracts: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Build the inverted index used by Searcher for BM25 ranking.
+
+    For each document kind there is a doc list, the token length of every
+    field (one space-separated string per field, in doc order), the
+    average length of each field, and postings mapping a token to
+    space-separated ``doc:field:tf`` entries, where doc and field index
+    ``docs`` and ``SEARCH_FIELDS[kind]``. Postings are packed as strings to
+    keep the pretty-printed index.json small.
+    """
+    field_text = {
+        "contract": lambda c: (
+            c["name"], c.get("file_path") or "",
+            " ".join(c.get("imports", [])), " ".join(c.get("standards", [])),
+        ),
+        "section": lambda s: (s.get("title", ""), s.get("summary", "")),
+    }
+    result: Dict[str, Any] = {"fields": {k: list(v) for k, v in SEARCH_FIELDS.items()}}
+    for kind, entries in (("contract", contracts), ("section", sections)):
+        n_fields = len(SEARCH_FIELDS[kind])
+        docs = []
+        lengths: List[List[int]] = [[] for _ in range(n_fields)]
+        postings: Dict[str, List[str]] = {}
+        for doc, (key, entry) in enumerate(entries.items()):
+            docs.append(key)
+            for fld, text in enumerate(field_text[kind](entry)):
+                tokens = tokenize(text)
+                lengths[fld].append(len(tokens))
+                counts: Dict[str, int] = {}
+                for tok in tokens:
+                    counts[tok] = counts.get(tok, 0) + 1
+                for tok, tf in counts.items():
+                    postings.setdefault(tok, []).append(f"{doc}:{fld}:{tf}")
+        result[kind] = {
+            "docs": docs,
+            "avg_lengths": [
+                round(sum(fl) / max(len(docs), 1), 4) for fl in lengths
+            ],
+            "lengths": [" ".join(map(str, fl)) for fl in lengths],
+            "postings": {tok: " ".join(p) for tok, p in sorted(postings.items())},
+        }
+    return result
+
+
+def _parse_module(md_file: Path) -> Dict[str, Any]:
+    """Parse one module into a self-contained fragment.
+
+    The fragment holds everything the merge step needs: section records
+    keyed by their raw slug (before cross-module de-duplication) and the
+    first occurrence of every contract declared in the module, attached to
+    its section by position rather than by final section ID.
+    """
+    content = md_file.read_text(encoding="utf-8")
+    content_bytes = content.encode("utf-8")
+    lines_list = content.split("\n")
+    line_offsets = _line_byte_offsets(lines_list)
+    file_name = md_file.name
+
+    # Extract module title from first heading
+    title = file_name.replace(".md", "").replace("-", " ").title()
+    for line in lines_list[:20]:
+        hm = RE_HEADING.match(line)
+        if hm:
+            title = hm.group(2).strip()
+            break
+
+    raw_sections = _find_sections(lines_list)
+    _section_tree(raw_sections, len(lines_list) - 1)
+    code_blocks = _find_code_blocks(lines_list)
+    section_blocks = _assign_code_blocks(raw_sections, code_blocks)
+
+    sections = []
+    contracts = []
+    seen_contracts = set()
+    text_standards = set()
+
+    for sec_index, (sec_data, sec_blocks) in enumerate(zip(raw_sections, section_blocks)):
+        sec_start = sec_data["start_line"]
+        sec_end = sec_data["end_line"]
+        sec_bodies = []
+
+        # Find contracts in this section's code blocks
+        for cb in sec_blocks:
+            bodies = _function_bodies(lines_list, cb)
+            sec_bodies.extend(bodies)
+            if cb["language"] not in ("solidity", "sol"):
+                continue
+            names = _extract_contracts_from_code(cb["content"])
+            if not names:
+                continue
+            stds = _extract_standards(cb["content"])
+            imps = _extract_imports(cb["content"])
+            heritage = _extract_inheritance(cb["content"])
+            for name in names:
+                if name in seen_contracts:
+                    continue
+                seen_contracts.add(name)
+                contracts.append({
+                    "name": name,
+                    "section_index": sec_index,
+                    "language": cb["language"],
+                    "start_line": cb["start_line"],
+                    "end_line": cb["end_line"],
+                    "byte_offset": line_offsets[cb["start_line"]],
+                    "byte_length": _byte_length_of_range(
+                        line_offsets, cb["start_line"], cb["end_line"]
+                    ),
+                    "file_path": _find_file_path_annotation(
+                        lines_list, cb["start_line"]
+                    ),
+                    "standards": list(stds),
+                    "imports": list(imps),
+                    "inherits": heritage.get(name, []),
+                    "elisions": _elisions(line_offsets, cb["start_line"], bodies),
+                })
+
+        # Also find standards in the section text (not just code)
+        sec_text = "\n".join(
+            lines_list[sec_start : sec_end + 1]
+        )
+        text_standards.update(_extract_standards(sec_text))
+
+        sections.append({
+            "slug": sec_data["id"],
+            "title": sec_data["title"],
+            "level": sec_data["level"],
+            "start_line": sec_start,
+            "end_line": sec_end,
+            "byte_offset": line_offsets[sec_start],
+            "byte_length": _byte_length_of_range(line_offsets, sec_start, sec_end),
+            "summary": _extract_first_paragraph(lines_list, sec_start + 1),
+            "code_block_count": len(sec_blocks),
+            "outline": section_outline(lines_list[sec_start : sec_end + 1]),
+            "elisions": _elisions(line_offsets, sec_start, sec_bodies),
+            "parent_index": sec_data["parent_index"],
+            "subtree_end_line": sec_data["subtree_end_line"],
+            "subtree_byte_length": _byte_length_of_range(
+                line_offsets, sec_start, sec_data["subtree_end_line"]),
+        })
+
+    return {
+        "file_name": file_name,
+        # Hash for cache invalidation
+        "content_hash": hashlib.sha256(content_bytes).hexdigest(),
+        "title": title,
+        # First meaningful paragraph as description
+        "description": _extract_first_paragraph(lines_list, 0),
+        "size_bytes": len(content_bytes),
+        "line_count": len(lines_list),
+        "code_block_count": len(code_blocks),
+        "text_standards": sorted(text_standards),
+        "sections": sections,
+        "contracts": contracts,
+    }
+
+
+def _normalized(standards: List[str]) -> List[str]:
+    return sorted({normalize_standard(s) for s in standards})
+
+
+def _fragment_from_index(index_data: Dict[str, Any], file_name: str) -> Optional[Dict[str, Any]]:
+    """Recover a module's parse fragment from a previously built index.
+
+    Returns None when the index predates per-module bookkeeping, in which
+    case the caller must reparse the file.
+    """
+    mod = index_data.get("modules", {}).get(file_name)
+    required = ("content_hash", "code_block_count", "text_standards",
+                "section_slugs", "contract_candidates", "shadowed_contracts")
+    if not mod or any(k not in mod for k in required):
+        return None
+
+    all_sections = index_data.get("sections", {})
+    all_contracts = index_data.get("contracts", {})
+    section_ids = mod["sections"]
+    if len(section_ids) != len(mod["section_slugs"]):
+        return None
+    position = {sec_id: i for i, sec_id in enumerate(section_ids)}
+
+    sections = []
+    for sec_id, slug in zip(section_ids, mod["section_slugs"]):
+        sec = all_sections.get(sec_id)
+        if sec is None or "outline" not in sec or "elisions" not in sec \
+                or "subtree_byte_length" not in sec:
+            return None
+        parent = sec.get("parent")
+        if parent is not None and parent not in position:
+            return None
+        sections.append({
+            "slug": slug,
+            "title": sec["title"],
+            "level": sec["level"],
+            "start_line": sec["start_line"],
+            "end_line": sec["end_line"],
+            "byte_offset": sec["byte_offset"],
+            "byte_length": sec["byte_length"],
+            "summary": sec["summary"],
+            "code_block_count": sec["code_block_count"],
+            "outline": sec["outline"],
+            "elisions": sec["elisions"],
+            "parent_index": None if parent is None else position[parent],
+            "subtree_end_line": sec["subtree_end_line"],
+            "subtree_byte_length": sec["subtree_byte_length"],
+        })
+
+    contracts = []
+    for name in mod["contract_candidates"]:
+        c = all_contracts.get(name)
+        if c is not None and c.get("module_file") == file_name:
+            if c["section_id"] not in position:
+                return None
+            src, sec_index = c, position[c["section_id"]]
+        elif name in mod["shadowed_contracts"]:
+            src = mod["shadowed_contracts"][name]
+            sec_index = src["section_index"]
+        else:
+            return None
+        if "inherits" not in src or "elisions" not in src:
+            return None
+        contracts.append({
+            "name": name,
+            "section_index": sec_index,
+            "language": src["language"],
+            "start_line": src["start_line"],
+            "end_line": src["end_line"],
+            "byte_offset": src["byte_offset"],
+            "byte_length": src["byte_length"],
+            "file_path": src.get("file_path"),
+            # Re-normalized so indexes from older spellings ("EIP712") converge
+            "standards": _normalized(src.get("standards", [])),
+            "imports": list(src.get("imports", [])),
+            "inherits": list(src["inherits"]),
+            "elisions": src["elisions"],
+        })
+
+    return {
+        "file_name": file_name,
+        "content_hash": mod["content_hash"],
+        "title": mod["title"],
+        "description": mod["description"],
+        "size_bytes": mod["size_bytes"],
+        "line_count": mod["line_count"],
+        "code_block_count": mod["code_block_count"],
+        "text_standards": _normalized(mod["text_standards"]),
+        "sections": sections,
+        "contracts": contracts,
+    }
+
+
+def _resolve_dependencies(contracts: Dict[str, Any]) -> None:
+    """Set each contract's ``depends_on``: indexed contracts it inherits or imports.
+
+    Relative imports resolve against the importer's ``File:`` path, other
+    paths by suffix ("../contracts/X.sol" -> "contracts/X.sol"), and a
+    file with no annotated contracts by its stem naming a contract.
+    Package imports (``@openzeppelin/...``) stay external.
+    """
+    by_path: Dict[str, List[str]] = {}
+    for name, c in contracts.items():
+        if c.get("file_path"):
+            by_path.setdefault(c["file_path"], []).append(name)
+
+    def resolve(importer: Dict[str, Any], path: str) -> List[str]:
+        if path.startswith("@"):
+            return []
+        if path.startswith(".") and importer.get("file_path"):
+            joined = posixpath.normpath(
+                posixpath.join(posixpath.dirname(importer["file_path"]), path))
+            if joined in by_path:
+                return by_path[joined]
+        rest = path
+        while rest.startswith(("./", "../")):
+            rest = rest.split("/", 1)[1]
+        found = [n for fp, names in by_path.items()
+                 if fp == rest or fp.endswith("/" + rest) for n in names]
+        if found:
+            return found
+        stem = posixpath.basename(path).rsplit(".", 1)[0]
+        return [stem] if stem in contracts else []
+
+    for name, c in contracts.items():
+        deps = {b for b in c.get("inherits", []) if b in contracts}
+        for path in c.get("imports", []):
+            deps.update(resolve(c, path))
+        deps.discard(name)
+        c["depends_on"] = sorted(deps)
+
+
+def _merge_fragments(fragments: List[Dict[str, Any]]) -> Index:
+    """Assemble the global index from per-module fragments.
+
+    Fragments are merged in file-name order, so duplicate section IDs get
+    the same suffixes (``-<module>``, then ``-<start_line>``) and duplicate
+    contract names resolve to the same module no matter which files were
+    reparsed.
+    """
     index = Index(
         version="1.0.0",
         generated_at=datetime.now(timezone.utc).isoformat(),
     )
 
-    all_hashes = []
     total_sections = 0
     total_contracts = 0
     total_code_blocks = 0
     total_bytes = 0
     total_lines = 0
 
-    md_files = sorted(modules_dir.glob("*.md"))
+    for frag in sorted(fragments, key=lambda f: f["file_name"]):
+        file_name = frag["file_name"]
+        total_code_blocks += frag["code_block_count"]
+        total_bytes += frag["size_bytes"]
+        total_lines += frag["line_count"]
 
-    for md_file in md_files:
-        content = md_file.read_text(encoding="utf-8")
-        lines_list = content.split("\n")
-        file_name = md_file.name
-
-        # Hash for cache invalidation
-        file_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
-        all_hashes.append(file_hash)
-
-        # Module info
-        file_bytes = len(content.encode("utf-8"))
-        file_lines = len(lines_list)
-        total_bytes += file_bytes
-        total_lines += file_lines
-
-        # Extract module title from first heading
-        title = file_name.replace(".md", "").replace("-", " ").title()
-        description = ""
-        for line in lines_list[:20]:
-            hm = RE_HEADING.match(line)
-            if hm:
-                title = hm.group(2).strip()
-                break
-
-        # Find sections
-        raw_sections = _find_sections(content, file_name)
         section_ids = []
-        module_contracts = []
-        module_standards = set()
-
-        # Find code blocks
-        code_blocks = _find_code_blocks(content)
-        total_code_blocks += len(code_blocks)
-
-        for sec_data in raw_sections:
-            sec_id = sec_data["id"]
+        for sec in frag["sections"]:
+            sec_id = sec["slug"]
             # Avoid duplicate IDs
             if sec_id in index.sections:
                 sec_id = f"{sec_id}-{file_name.replace('.md', '')}"
             if sec_id in index.sections:
-                sec_id = f"{sec_id}-{sec_data['start_line']}"
-
-            sec_start = sec_data["start_line"]
-            sec_end = sec_data["end_line"]
-
-            byte_off = _byte_offset_of_line(content, sec_start)
-            byte_len = _byte_length_of_range(content, sec_start, sec_end)
-
-            summary = _extract_first_paragraph(
-                lines_list, sec_start + 1
-            )
-
-            # Find contracts in this section's code blocks
-            sec_contracts = []
-            sec_code_count = 0
-            for cb in code_blocks:
-                if cb["start_line"] >= sec_start and cb["end_line"] <= sec_end:
-                    sec_code_count += 1
-                    if cb["language"] in ("solidity", "sol"):
-                        names = _extract_contracts_from_code(cb["content"])
-                        for name in names:
-                            if name not in index.contracts:
-                                cb_off = _byte_offset_of_line(
-                                    content, cb["start_line"]
-                                )
-                                cb_len = _byte_length_of_range(
-                                    content, cb["start_line"], cb["end_line"]
-                                )
-                                fp = _find_file_path_annotation(
-                                    lines_list, cb["start_line"]
-                                )
-                                stds = _extract_standards(cb["content"])
-                                imps = _extract_imports(cb["content"])
-                                module_standards.update(stds)
-
-                                index.contracts[name] = {
-                                    "name": name,
-                                    "module_file": file_name,
-                                    "section_id": sec_id,
-                                    "language": cb["language"],
-                                    "start_line": cb["start_line"],
-                                    "end_line": cb["end_line"],
-                                    "byte_offset": cb_off,
-                                    "byte_length": cb_len,
-                                    "file_path": fp,
-                                    "standards": stds,
-                                    "imports": imps,
-                                }
-                                sec_contracts.append(name)
-                                module_contracts.append(name)
-                                total_contracts += 1
-
-                                # Update standards reverse index
-                                for std in stds:
-                                    if std not in index.standards:
-                                        index.standards[std] = []
-                                    if name not in index.standards[std]:
-                                        index.standards[std].append(name)
-
-            # Also find standards in the section text (not just code)
-            sec_text = "\n".join(
-                lines_list[sec_start : sec_end + 1]
-            )
-            text_stds = _extract_standards(sec_text)
-            module_standards.update(text_stds)
-
+                sec_id = f"{sec_id}-{sec['start_line']}"
+            section_ids.append(sec_id)
+            total_sections += 1
             index.sections[sec_id] = {
                 "id": sec_id,
-                "title": sec_data["title"],
-                "level": sec_data["level"],
+                "title": sec["title"],
+                "level": sec["level"],
                 "module_file": file_name,
-                "start_line": sec_start,
-                "end_line": sec_end,
-                "byte_offset": byte_off,
-                "byte_length": byte_len,
-                "summary": summary,
-                "contracts": sec_contracts,
-                "code_block_count": sec_code_count,
+                "start_line": sec["start_line"],
+                "end_line": sec["end_line"],
+                "byte_offset": sec["byte_offset"],
+                "byte_length": sec["byte_length"],
+                "summary": sec["summary"],
+                "contracts": [],
+                "code_block_count": sec["code_block_count"],
+                # Precomputed so outline and token requests never read the module
+                "outline": sec["outline"],
+                "tokens": sec["byte_length"] // 4,
+                "outline_tokens": len(sec["outline"].encode("utf-8")) // 4,
+                "elisions": sec["elisions"],
+                "parent": None,
+                "subsections": [],
+                "subtree_end_line": sec["subtree_end_line"],
+                "subtree_byte_length": sec["subtree_byte_length"],
             }
-            section_ids.append(sec_id)
-            total_sections += 1
+        for sec_id, sec in zip(section_ids, frag["sections"]):
+            if sec["parent_index"] is not None:
+                parent_id = section_ids[sec["parent_index"]]
+                index.sections[sec_id]["parent"] = parent_id
+                index.sections[parent_id]["subsections"].append(sec_id)
 
-        # First meaningful paragraph as description
-        description = _extract_first_paragraph(lines_list, 0)
+        module_contracts = []
+        module_standards = set(frag["text_standards"])
+        shadowed = {}
+        for c in frag["contracts"]:
+            name = c["name"]
+            if name in index.contracts:
+                shadowed[name] = dict(c)
+                continue
+            sec_id = section_ids[c["section_index"]]
+            index.contracts[name] = {
+                "name": name,
+                "module_file": file_name,
+                "section_id": sec_id,
+                "language": c["language"],
+                "start_line": c["start_line"],
+                "end_line": c["end_line"],
+                "byte_offset": c["byte_offset"],
+                "byte_length": c["byte_length"],
+                "file_path": c["file_path"],
+                "standards": list(c["standards"]),
+                "imports": list(c["imports"]),
+                "inherits": list(c["inherits"]),
+                "depends_on": [],  # Filled in by _resolve_dependencies
+                "tokens": c["byte_length"] // 4,
+                "elisions": c["elisions"],
+            }
+            index.sections[sec_id]["contracts"].append(name)
+            module_contracts.append(name)
+            module_standards.update(c["standards"])
+            total_contracts += 1
+
+            # Update standards reverse index (name is new, so
+            # it cannot already be in any posting list)
+            for std in c["standards"]:
+                index.standards.setdefault(std, []).append(name)
 
         index.modules[file_name] = {
             "file_name": file_name,
-            "title": title,
-            "description": description,
-            "size_bytes": file_bytes,
-            "line_count": file_lines,
+            "title": frag["title"],
+            "description": frag["description"],
+            "size_bytes": frag["size_bytes"],
+            "line_count": frag["line_count"],
             "sections": section_ids,
             "contracts": module_contracts,
             "standards": sorted(module_standards),
+            "outline_tokens": _module_outline_tokens(
+                [index.sections[sec_id] for sec_id in section_ids]),
+            # Bookkeeping for incremental rebuilds
+            "content_hash": frag["content_hash"],
+            "code_block_count": frag["code_block_count"],
+            "text_standards": list(frag["text_standards"]),
+            "section_slugs": [sec["slug"] for sec in frag["sections"]],
+            "contract_candidates": [c["name"] for c in frag["contracts"]],
+            "shadowed_contracts": shadowed,
         }
 
     # Compute combined source hash
-    combined = "".join(all_hashes)
+    combined = "".join(
+        index.modules[name]["content_hash"] for name in index.modules
+    )
     index.source_hash = hashlib.sha256(combined.encode()).hexdigest()
 
+    _resolve_dependencies(index.contracts)
+    index.search = build_search_index(index.sections, index.contracts)
+    index.standard_sets = build_standard_sets(index.contracts, index.modules)
+    index.lookup = build_lookup_index({
+        "contract": index.contracts,
+        "section": index.sections,
+        "standard": index.standards,
+    })
+
     index.stats = {
         "total_modules": len(index.modules),
         "total_sections": total_sections,
@@ -351,10 +818,70 @@ def build_index(modules_dir: Path) -> Index:
     return index
 
 
+def _map_files(parse: Callable[..., Any], items: List[Tuple[Any, ...]], jobs: int) -> List[Any]:
+    """Apply ``parse`` to each argument tuple; results come back in input order.
+
+    With ``jobs`` > 1 (0 = one per CPU) the calls run in a process pool.
+    Callers reduce the results in order, so the index is identical to a
+    serial build.
+    """
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs > 1 and len(items) > 1:
+        workers = min(jobs, len(items))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(parse, *zip(*items),
+                                 chunksize=max(1, len(items) // (workers * 4))))
+    return [parse(*args) for args in items]
+
+
+def source_files(modules_dir: Path) -> List[Path]:
+    """Every module build_index reads (polled by the MCP server's watcher)."""
+    return sorted(modules_dir.glob("*.md"))
+
+
+def build_index_incremental(
+    modules_dir: Path, previous: Optional[Dict[str, Any]] = None, jobs: int = 1
+) -> Tuple[Index, List[str]]:
+    """Rebuild the index, reparsing only modules whose content changed.
+
+    ``previous`` is the loaded index.json dict (or None for a full build).
+    Unchanged modules are recovered from it and merged with the freshly
+    parsed ones; the result is identical to a full build. ``jobs`` > 1
+    parses changed modules in that many worker processes.
+
+    Returns:
+        (index, names of the modules that were reparsed)
+    """
+    md_files = source_files(modules_dir)
+    fragments: List[Optional[Dict[str, Any]]] = []
+    for md_file in md_files:
+        frag = None
+        if previous is not None:
+            content = md_file.read_text(encoding="utf-8")
+            file_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            prev_mod = previous.get("modules", {}).get(md_file.name, {})
+            if prev_mod.get("content_hash") == file_hash:
+                frag = _fragment_from_index(previous, md_file.name)
+        fragments.append(frag)
+
+    to_parse = [i for i, frag in enumerate(fragments) if frag is None]
+    parsed = _map_files(_parse_module, [(md_files[i],) for i in to_parse], jobs)
+    for i, frag in zip(to_parse, parsed):
+        fragments[i] = frag
+    return _merge_fragments(fragments), [md_files[i].name for i in to_parse]
+
+
+def build_index(modules_dir: Path, previous: Optional[Dict[str, Any]] = None,
+                jobs: int = 1) -> Index:
+    """Build the complete index from all markdown modules."""
+    return build_index_incremental(modules_dir, previous, jobs)[0]
+
+
 def check_index_freshness(index: Index, modules_dir: Path) -> bool:
     """Check if the index is still valid (modules haven't changed)."""
     all_hashes = []
-    for md_file in sorted(modules_dir.glob("*.md")):
+    for md_file in source_files(modules_dir):
         content = md_file.read_text(encoding="utf-8")
         all_hashes.append(
             hashlib.sha256(content.encode("utf-8")).hexdigest()
@@ -1,10 +1,16 @@
 """MCP stdio JSON-RPC 2.0 server for NFT Protocol Engine."""
 from __future__ import annotations
 
+import asyncio
 import json
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .searcher import RESULT_CACHE_BYTES
+from .watcher import DEFAULT_INTERVAL, SourceWatcher
 
 SKILL_DIR = Path(__file__).resolve().parent.parent
 MODULES_DIR = SKILL_DIR / "modules"
@@ -12,6 +18,9 @@ DATA_DIR = SKILL_DIR / "data"
 INDEX_PATH = DATA_DIR / "index.json"
 LOG_PATH = DATA_DIR / "token_log.jsonl"
 
+# Worker threads for tools/call (file reads, index rebuilds)
+DEFAULT_WORKERS = 4
+
 TOOLS = [
     {
         "name": "nft_search",
@@ -27,27 +36,65 @@ TOOLS = [
     },
     {
         "name": "nft_get_contract",
-        "description": "Extract a specific Solidity smart contract by name. Returns the full contract code with metadata. ~750 tokens instead of loading the full module (~18,000 tokens).",
+        "description": "Extract a specific Solidity smart contract by name. Returns the full contract code with metadata. ~750 tokens instead of loading the full module (~18,000 tokens). Optional max_tokens elides the longest function bodies until it fits; the budget field reports what was dropped.",
         "inputSchema": {
             "type": "object",
             "properties": {
                 "name": {"type": "string", "description": "Contract name (e.g. FractionalVault, SoulboundNFT, NFTLending)"},
+                "max_tokens": {"type": "integer", "minimum": 1, "description": "Token budget for the returned content"},
+            },
+            "required": ["name"],
+        },
+    },
+    {
+        "name": "nft_get_contracts",
+        "description": "Extract several contracts in one call (each module is read once). Results are in request order; unknown names get a per-item error with suggestions.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "names": {"type": "array", "items": {"type": "string"}, "description": "Contract names"},
+            },
+            "required": ["names"],
+        },
+    },
+    {
+        "name": "nft_get_contract_closure",
+        "description": "Extract a contract together with every local contract and interface it inherits or imports (transitively), in one response. Shared code blocks appear once, grouped by module. Optional max_tokens drops the deepest dependencies first.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Contract name (e.g. NFTLendingTest, RentableNFT)"},
+                "max_tokens": {"type": "integer", "minimum": 1, "description": "Token budget; deepest dependencies are pruned first"},
             },
             "required": ["name"],
         },
     },
     {
         "name": "nft_get_section",
-        "description": "Extract a module section by ID. Returns full section content or outline only. ~1,250 tokens instead of full module.",
+        "description": "Extract a module section by ID. Returns full section content or outline only. ~1,250 tokens instead of full module. Optional max_tokens returns as much as fits: full content, then content with long function bodies elided, then the outline; the budget field reports what was dropped. depth > 0 includes subsections that many heading levels down in the same call (use the parent/subsections fields to navigate).",
         "inputSchema": {
             "type": "object",
             "properties": {
                 "section_id": {"type": "string", "description": "Section ID (e.g. module-3-fractionalization-vault)"},
                 "outline_only": {"type": "boolean", "default": False, "description": "Return headings + declarations only"},
+                "max_tokens": {"type": "integer", "minimum": 1, "description": "Token budget for the returned content"},
+                "depth": {"type": "integer", "minimum": 0, "default": 0, "description": "Subsection levels to include (0 = this section only, 5 = whole subtree)"},
             },
             "required": ["section_id"],
         },
     },
+    {
+        "name": "nft_get_sections",
+        "description": "Extract several module sections in one call (each module is read once). Results are in request order with per-item errors.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "section_ids": {"type": "array", "items": {"type": "string"}, "description": "Section IDs"},
+                "outline_only": {"type": "boolean", "default": False, "description": "Return headings + declarations only"},
+            },
+            "required": ["section_ids"],
+        },
+    },
     {
         "name": "nft_list_modules",
         "description": "List all 19 NFT protocol modules with summaries, sizes, contract counts, and ERC standards. ~800 tokens.",
@@ -64,6 +111,19 @@ TOOLS = [
             "required": ["standard"],
         },
     },
+    {
+        "name": "nft_query_standards",
+        "description": "Find contracts (or modules) matching a boolean expression over ERC standards in one call, e.g. 'ERC-721 AND ERC-2981 AND NOT ERC-5192'. Supports AND, OR, NOT and parentheses.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "expression": {"type": "string", "description": "Standards expression (e.g. 'ERC-721 AND (ERC-2981 OR ERC-4907) AND NOT ERC-5192')"},
+                "scope": {"type": "string", "enum": ["contracts", "modules"], "default": "contracts"},
+                "limit": {"type": "integer", "default": 100, "description": "Maximum results to list (0 = all); count is always exact"},
+            },
+            "required": ["expression"],
+        },
+    },
     {
         "name": "nft_usage_report",
         "description": "Show cumulative token usage statistics and savings vs full-load baseline.",
@@ -92,8 +152,13 @@ TOOLS = [
     },
     {
         "name": "nft_build_index",
-        "description": "Rebuild the search index from all markdown modules. Use after adding or modifying modules.",
-        "inputSchema": {"type": "object", "properties": {}},
+        "description": "Rebuild the search index from the markdown modules. Only changed modules are reparsed unless full=true. Use after adding or modifying modules.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "full": {"type": "boolean", "default": False, "description": "Reparse every module"},
+            },
+        },
     },
     {
         "name": "nft_check_index",
@@ -103,47 +168,113 @@ TOOLS = [
 ]
 
 
+def _string_list(value: Any) -> Optional[List[str]]:
+    """A list-of-strings tool argument; a lone string counts as one item, anything else is None."""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list) and all(isinstance(v, str) for v in value):
+        return value
+    return None
+
+
 class NFTProtocolMCPServer:
     """Minimal MCP server over stdio."""
 
-    def __init__(self):
+    def __init__(self, max_workers: int = DEFAULT_WORKERS,
+                 watch_interval: float = DEFAULT_INTERVAL,
+                 search_cache_bytes: int = RESULT_CACHE_BYTES,
+                 log_path: Path = LOG_PATH):
         self.index = None
         self.extractor = None
         self.searcher = None
         self.tracker = None
+        self.generation = 0  # Bumped on every index swap; reported in tool responses
+        self.max_workers = max_workers
+        self.watch_interval = watch_interval  # 0 disables the module watcher
+        self.search_cache_bytes = search_cache_bytes
+        self.log_path = log_path
+        self.watcher = None
+        # Guards index/extractor/searcher swaps; tool calls run on a pool
+        self._state_lock = threading.Lock()
+        # Serializes rebuilds so concurrent nft_build_index calls don't race
+        self._rebuild_lock = threading.Lock()
 
     def _ensure_loaded(self):
-        if self.index is not None:
-            return
-        if not INDEX_PATH.exists():
-            from .indexer import build_index
-            idx = build_index(MODULES_DIR)
-            try:
-                idx.save(INDEX_PATH)
-            except (OSError, IOError) as e:
-                pass  # Index will be rebuilt next time
+        with self._state_lock:
+            if self.index is not None:
+                return
+            if not INDEX_PATH.exists():
+                from .indexer import build_index
+                idx = build_index(MODULES_DIR)
+                try:
+                    idx.save(INDEX_PATH)
+                except (OSError, IOError) as e:
+                    pass  # Index will be rebuilt next time
 
-        try:
-            with open(INDEX_PATH, "r", encoding="utf-8") as f:
-                self.index = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError, OSError):
-            # Corrupt or missing index — rebuild
-            from .indexer import build_index
-            idx = build_index(MODULES_DIR)
+            from .compact import load_index
             try:
-                idx.save(INDEX_PATH)
-            except (OSError, IOError):
-                pass
-            from dataclasses import asdict
-            self.index = asdict(idx)
+                index = load_index(INDEX_PATH)
+            except (json.JSONDecodeError, FileNotFoundError, OSError):
+                # Corrupt or missing index — rebuild
+                from .indexer import build_index
+                idx = build_index(MODULES_DIR)
+                try:
+                    idx.save(INDEX_PATH)
+                except (OSError, IOError):
+                    pass
+                from dataclasses import asdict
+                index = asdict(idx)
 
+            from .tracker import TokenTracker
+            self._install(index)
+            self.tracker = TokenTracker(self.log_path)
+
+    def _install(self, index: Dict[str, Any]) -> None:
+        """Replace the index and its extractor/searcher (caller holds _state_lock)."""
         from .extractor import Extractor
-        from .searcher import Searcher
-        from .tracker import TokenTracker
+        from .searcher import ResultCache, Searcher
+
+        if self.extractor is not None:
+            # Calls still holding the old extractor finish their reads first
+            self.extractor.close()
+        self.extractor = Extractor(index, MODULES_DIR)
+        # The result cache outlives the swap: its counters carry over and the
+        # new source_hash drops entries computed against the old index
+        if self.searcher is not None:
+            cache = self.searcher.cache
+        else:
+            cache = ResultCache(self.search_cache_bytes)
+        self.searcher = Searcher(index, cache=cache)
+        self.index = index
+        self.generation += 1
+
+    def _snapshot(self):
+        """Consistent (index, extractor, searcher, tracker, generation) for one call."""
+        self._ensure_loaded()
+        with self._state_lock:
+            return self.index, self.extractor, self.searcher, self.tracker, self.generation
+
+    def _rebuild(self, full: bool = False) -> Tuple[Dict[str, Any], List[str]]:
+        """Rebuild, save and swap in the index; returns (index, reparsed modules).
+
+        In-flight calls keep the snapshot they started with.
+        """
+        from dataclasses import asdict
+        from .indexer import build_index_incremental
+        with self._rebuild_lock:
+            with self._state_lock:
+                current = self.index
+            idx, reparsed = build_index_incremental(MODULES_DIR, None if full else current)
+            idx.save(INDEX_PATH)
+            new_index = asdict(idx)
+            with self._state_lock:
+                self._install(new_index)
+        return new_index, reparsed
 
-        self.extractor = Extractor(self.index, MODULES_DIR)
-        self.searcher = Searcher(self.index)
-        self.tracker = TokenTracker(LOG_PATH)
+    def _on_modules_changed(self) -> None:
+        """Watcher callback: modules were edited, added or removed."""
+        self._ensure_loaded()
+        self._rebuild()
 
     def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
         method = request.get("method", "")
@@ -169,61 +300,101 @@ class NFTProtocolMCPServer:
         return self._error(req_id, -32601, f"Method not found: {method}")
 
     def _call_tool(self, req_id: Any, params: Dict[str, Any]) -> Dict[str, Any]:
-        self._ensure_loaded()
+        index, extractor, searcher, tracker, generation = self._snapshot()
         tool_name = params.get("name", "")
         args = params.get("arguments", {})
 
+        for name, minimum, kind in (("max_tokens", 1, "a positive integer"),
+                                    ("depth", 0, "a non-negative integer")):
+            value = args.get(name)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, int)
+                                      or value < minimum):
+                return self._tool_error(req_id, f"Error: {name} must be {kind}")
+
         try:
             if tool_name == "nft_search":
-                result = self.searcher.search(args.get("query", ""), args.get("type", "all"))
+                result = searcher.search(args.get("query", ""), args.get("type", "all"))
             elif tool_name == "nft_get_contract":
-                result = self.extractor.get_contract(args.get("name", ""))
+                result = extractor.get_contract(
+                    args.get("name", ""), max_tokens=args.get("max_tokens"))
+                if not result:
+                    result = {"error": f"Contract '{args.get('name', '')}' not found",
+                              "suggestions": searcher.suggest(args.get("name", ""))}
+            elif tool_name == "nft_get_contracts":
+                names = _string_list(args.get("names", []))
+                if names is None:
+                    return self._tool_error(req_id, "Error: 'names' must be a list of strings")
+                result = extractor.get_contracts(names)
+                for item in result["results"]:
+                    if item.get("missing"):
+                        item["suggestions"] = searcher.suggest(item["name"])
+            elif tool_name == "nft_get_contract_closure":
+                result = extractor.get_contract_closure(
+                    args.get("name", ""), max_tokens=args.get("max_tokens"))
                 if not result:
                     result = {"error": f"Contract '{args.get('name', '')}' not found",
-                              "suggestions": self.searcher.suggest(args.get("name", ""))}
+                              "suggestions": searcher.suggest(args.get("name", ""))}
             elif tool_name == "nft_get_section":
-                result = self.extractor.get_section(
-                    args.get("section_id", ""), outline_only=args.get("outline_only", False))
+                result = extractor.get_section(
+                    args.get("section_id", ""), outline_only=args.get("outline_only", False),
+                    max_tokens=args.get("max_tokens"), depth=args.get("depth") or 0)
                 if not result:
-                    result = {"error": f"Section '{args.get('section_id', '')}' not found"}
+                    result = {"error": f"Section '{args.get('section_id', '')}' not found",
+                              "suggestions": searcher.suggest(args.get("section_id", ""))}
+            elif tool_name == "nft_get_sections":
+                section_ids = _string_list(args.get("section_ids", []))
+                if section_ids is None:
+                    return self._tool_error(req_id,
+                                            "Error: 'section_ids' must be a list of strings")
+                result = extractor.get_sections(
+                    section_ids, outline_only=args.get("outline_only", False))
+                for item in result["results"]:
+                    if item.get("missing"):
+                        item["suggestions"] = searcher.suggest(item["id"])
             elif tool_name == "nft_list_modules":
-                result = self.searcher.list_modules()
+                result = searcher.list_modules()
             elif tool_name == "nft_find_by_standard":
-                result = self.searcher.find_by_standard(args.get("standard", ""))
+                result = searcher.find_by_standard(args.get("standard", ""))
+            elif tool_name == "nft_query_standards":
+                try:
+                    result = searcher.query_standards(
+                        args.get("expression", ""), args.get("scope", "contracts"),
+                        limit=args.get("limit", 100) or None)
+                except ValueError as e:
+                    result = {"error": f"Invalid expression: {e}"}
             elif tool_name == "nft_usage_report":
-                result = self.tracker.report()
+                result = dict(tracker.report(), search_cache=searcher.cache.stats())
             elif tool_name == "nft_list_contracts":
-                result = self.searcher.list_contracts()
+                result = searcher.list_contracts()
             elif tool_name == "nft_list_standards":
-                result = self.searcher.list_standards()
+                result = searcher.list_standards()
             elif tool_name == "nft_outline":
-                result = self.extractor.get_module_outline(args.get("module", ""))
+                result = extractor.get_module_outline(args.get("module", ""))
                 if not result:
                     result = {"error": f"Module '{args.get('module', '')}' not found",
-                              "available": list(self.index.get("modules", {}).keys())}
+                              "available": list(index.get("modules", {}).keys())}
             elif tool_name == "nft_build_index":
-                from .indexer import build_index
-                idx = build_index(MODULES_DIR)
-                idx.save(INDEX_PATH)
-                # Reset all state so _ensure_loaded() rebuilds from fresh index
-                self.index = None
-                self.extractor = None
-                self.searcher = None
-                self.tracker = None
-                self._ensure_loaded()
-                result = {"status": "ok", "stats": self.index.get("stats", {})}
+                new_index, reparsed = self._rebuild(full=args.get("full", False))
+                with self._state_lock:
+                    generation = self.generation
+                result = {"status": "ok", "stats": new_index.get("stats", {}),
+                          "reparsed_modules": reparsed, "index_generation": generation}
             elif tool_name == "nft_check_index":
                 from .indexer import check_index_freshness
                 from .schema import Index
                 idx = Index.load(INDEX_PATH)
                 fresh = check_index_freshness(idx, MODULES_DIR)
-                result = {"fresh": fresh, "source_hash": idx.source_hash}
+                result = {"fresh": fresh, "source_hash": idx.source_hash,
+                          "index_generation": generation,
+                          "watching": self.watcher is not None,
+                          "watcher_error": self.watcher.last_error if self.watcher else None}
             else:
                 return self._error(req_id, -32602, f"Unknown tool: {tool_name}")
 
             text = json.dumps(result, indent=2, ensure_ascii=False)
             return self._response(req_id, {
                 "content": [{"type": "text", "text": text}],
+                "_meta": {"index_generation": generation},
             })
         except Exception as e:
             return self._tool_error(req_id, f"Error: {e}")
@@ -242,22 +413,84 @@ class NFTProtocolMCPServer:
         return {"jsonrpc": "2.0", "id": req_id, "error": {"code": code, "message": message}}
 
     def run(self):
-        """Main stdio loop."""
-        for line in sys.stdin:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                request = json.loads(line)
-                response = self.handle(request)
-                if response is not None:
-                    sys.stdout.write(json.dumps(response) + "\n")
-                    sys.stdout.flush()
-            except json.JSONDecodeError:
-                err = self._error(None, -32700, "Parse error")
-                sys.stdout.write(json.dumps(err) + "\n")
+        """Main stdio loop: tools/call requests run concurrently on a thread pool.
+
+        Unless ``watch_interval`` is 0, a background watcher rebuilds and
+        swaps in the index whenever a module changes on disk.
+        """
+        if self.watch_interval > 0:
+            from .indexer import source_files
+            self.watcher = SourceWatcher(lambda: source_files(MODULES_DIR),
+                                         self._on_modules_changed, self.watch_interval)
+            self.watcher.start()
+        try:
+            asyncio.run(self._serve())
+        finally:
+            if self.watcher is not None:
+                self.watcher.stop()
+
+    async def _serve(self) -> None:
+        loop = asyncio.get_running_loop()
+        pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                  thread_name_prefix="nft-mcp")
+        # Blocking stdin reads get their own thread so they never wait
+        # behind tool calls in the pool
+        stdin_reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nft-mcp-stdin")
+        write_lock = asyncio.Lock()
+        inflight: Dict[Any, asyncio.Task] = {}  # request id -> task, for cancellation
+        pending: Set[asyncio.Task] = set()
+
+        async def write(message: Dict[str, Any]) -> None:
+            async with write_lock:
+                sys.stdout.write(json.dumps(message) + "\n")
                 sys.stdout.flush()
+
+        async def call(request: Dict[str, Any]) -> None:
+            req_id = request.get("id")
+            try:
+                response = await loop.run_in_executor(pool, self.handle, request)
+            except asyncio.CancelledError:
+                return  # Cancelled requests get no response (MCP spec)
             except Exception as e:
-                err = self._error(None, -32603, str(e))
-                sys.stdout.write(json.dumps(err) + "\n")
-                sys.stdout.flush()
+                response = self._error(req_id, -32603, str(e))
+            finally:
+                if inflight.get(req_id) is asyncio.current_task():
+                    del inflight[req_id]
+            if response is not None:
+                await write(response)
+
+        try:
+            while True:
+                line = await loop.run_in_executor(stdin_reader, sys.stdin.readline)
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    request = json.loads(line)
+                    method = request.get("method", "")
+                    if method == "notifications/cancelled":
+                        task = inflight.get(request.get("params", {}).get("requestId"))
+                        if task is not None:
+                            task.cancel()
+                        continue
+                    if method == "tools/call":
+                        task = asyncio.create_task(call(request))
+                        inflight[request.get("id")] = task
+                        pending.add(task)
+                        task.add_done_callback(pending.discard)
+                        continue
+                    response = self.handle(request)
+                    if response is not None:
+                        await write(response)
+                except json.JSONDecodeError:
+                    await write(self._error(None, -32700, "Parse error"))
+                except Exception as e:
+                    await write(self._error(None, -32603, str(e)))
+            # EOF: let queued calls finish before exiting
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            pool.shutdown(wait=True)
+            stdin_reader.shutdown(wait=False)
@@ -0,0 +1,235 @@
+"""Async request scheduling for API batch jobs: rate limits, retries, adaptive concurrency."""
+from __future__ import annotations
+
+import asyncio
+import collections
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, TextIO
+
+# Statuses worth retrying: rate limited, server errors, overloaded
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+DEFAULT_RPM = 50
+DEFAULT_TPM = 40_000
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_TIMEOUT_S = 600.0
+
+
+class TransientError(Exception):
+    """A failure worth retrying (429/5xx/network), with an optional server hint."""
+
+    def __init__(self, message: str, status: Optional[int] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class APIError(Exception):
+    """A non-retryable API failure (bad request, auth, ...)."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class TokenBucket:
+    """Continuous-refill bucket holding at most ``per_minute`` units.
+
+    ``acquire`` waits until ``amount`` units are available; ``consume``
+    charges usage known only afterwards (e.g. output tokens) and may drive
+    the balance negative, which delays later acquires.
+    """
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        # Larger requests than the bucket holds would wait forever
+        amount = min(amount, self.capacity)
+        async with self._lock:  # FIFO: one waiter refills at a time
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self._tokens -= amount
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit driven by latency and throttling.
+
+    The limit grows by ~1 per window while smoothed latency stays within
+    ``tolerance`` x the recent minimum, shrinks by 10% when latency
+    inflates, and halves when the server throttles.
+    """
+
+    def __init__(self, maximum: int, initial: int = 2, minimum: int = 1,
+                 tolerance: float = 2.0, window: int = 50):
+        self.maximum = max(maximum, 1)
+        self.minimum = max(min(minimum, self.maximum), 1)
+        self.limit = float(max(min(initial, self.maximum), self.minimum))
+        self.tolerance = tolerance
+        self.inflight = 0
+        self.peak = 0
+        self._recent: Deque[float] = collections.deque(maxlen=window)
+        self._smoothed: Optional[float] = None
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.inflight < int(self.limit))
+            self.inflight += 1
+            self.peak = max(self.peak, self.inflight)
+
+    async def release(self, latency: Optional[float] = None, throttled: bool = False) -> None:
+        async with self._cond:
+            self.inflight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit / 2)
+            elif latency is not None:
+                self._recent.append(latency)
+                self._smoothed = (latency if self._smoothed is None
+                                  else 0.8 * self._smoothed + 0.2 * latency)
+                if self._smoothed <= min(self._recent) * self.tolerance:
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                else:
+                    self.limit = max(self.minimum, self.limit * 0.9)
+            self._cond.notify_all()
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0,
+                  retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than a Retry-After hint."""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def _retry_after(headers: Any) -> Optional[float]:
+    value = headers.get("retry-after") if headers is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def post_json(url: str, payload: Dict[str, Any], headers: Dict[str, str],
+              timeout: float = DEFAULT_TIMEOUT_S) -> Dict[str, Any]:
+    """Blocking JSON POST; classifies failures as TransientError or APIError."""
+    body = json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(url, data=body, method="POST",
+                                 headers=dict(headers, **{"content-type": "application/json"}))
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        detail = e.read().decode("utf-8", errors="replace")[:500]
+        message = f"HTTP {e.code}: {detail}"
+        if e.code in RETRY_STATUSES:
+            raise TransientError(message, e.code, _retry_after(e.headers)) from None
+        raise APIError(message, e.code) from None
+    except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+        raise TransientError(f"Connection error: {e}") from None
+
+
+class Scheduler:
+    """Run jobs under RPM/TPM token buckets, adaptive concurrency and retries.
+
+    Each job is ``(key, estimated_tokens, call)``; ``call`` is an async
+    function returning ``(result or list of results, extra_tokens)`` where ``extra_tokens`` is
+    usage known only after the response (output tokens). Results are
+    written to ``sink`` as JSON lines the moment they complete, and
+    collected (in completion order) in ``results``.
+    """
+
+    def __init__(self, max_concurrency: int = 8, rpm: float = DEFAULT_RPM,
+                 tpm: float = DEFAULT_TPM, max_retries: int = DEFAULT_MAX_RETRIES,
+                 base_delay: float = 1.0, max_delay: float = 60.0,
+                 sink: Optional[TextIO] = None):
+        self.max_concurrency = max_concurrency
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sink = sink
+        self.results: List[Dict[str, Any]] = []
+        self.stats: Dict[str, Any] = {}
+
+    def emit(self, result: Any) -> None:
+        """Record finished result(s) and stream them to the sink.
+
+        A list fans one job out to several results (de-duplicated jobs).
+        """
+        for r in result if isinstance(result, list) else [result]:
+            self.results.append(r)
+            if self.sink is not None:
+                self.sink.write(json.dumps(r, ensure_ascii=False) + "\n")
+        if self.sink is not None:
+            self.sink.flush()
+
+    async def run(self, jobs: Iterable[tuple],
+                  on_error: Callable[[Any, Exception, int], Any]) -> List[Dict[str, Any]]:
+        requests = TokenBucket(self.rpm)
+        tokens = TokenBucket(self.tpm)
+        limiter = AdaptiveConcurrency(self.max_concurrency)
+        emit = self.emit
+        stats = {"attempts": 0, "retries": 0, "throttled": 0}
+
+        async def run_one(key: Any, estimated: int,
+                          call: Callable[[], Awaitable[tuple]]) -> None:
+            attempt = 0
+            while True:
+                await limiter.acquire()
+                await requests.acquire(1)
+                await tokens.acquire(estimated)
+                stats["attempts"] += 1
+                start = time.monotonic()
+                try:
+                    result, extra = await call()
+                except TransientError as e:
+                    await limiter.release(throttled=e.status in (429, 529))
+                    if e.status in (429, 529):
+                        stats["throttled"] += 1
+                    if attempt >= self.max_retries:
+                        emit(on_error(key, e, attempt + 1))
+                        return
+                    stats["retries"] += 1
+                    await asyncio.sleep(backoff_delay(attempt, self.base_delay,
+                                                      self.max_delay, e.retry_after))
+                    attempt += 1
+                    continue
+                except Exception as e:
+                    await limiter.release()
+                    emit(on_error(key, e, attempt + 1))
+                    return
+                await limiter.release(latency=time.monotonic() - start)
+                tokens.consume(extra)
+                emit(result)
+                return
+
+        await asyncio.gather(*(run_one(*job) for job in jobs))
+        stats["peak_concurrency"] = limiter.peak
+        stats["final_concurrency_limit"] = round(limiter.limit, 2)
+        self.stats = stats
+        return self.results
@@ -6,6 +6,8 @@ from dataclasses import dataclass, field, asdict
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from .compact import save_compact
+
 
 @dataclass
 class CodeBlock:
@@ -31,6 +33,10 @@ class Contract:
     file_path: Optional[str] = None
     standards: List[str] = field(default_factory=list)
     imports: List[str] = field(default_factory=list)
+    inherits: List[str] = field(default_factory=list)  # Base names from `is A, B`
+    depends_on: List[str] = field(default_factory=list)  # Indexed contracts inherited/imported
+    tokens: int = 0  # byte_length // 4
+    elisions: str = ""  # "offset:length:lines" function bodies (get_contract max_tokens)
 
 
 @dataclass
@@ -48,6 +54,12 @@ class Section:
     subsections: List[str] = field(default_factory=list)
     contracts: List[str] = field(default_factory=list)
     code_block_count: int = 0
+    outline: str = ""  # Headings + declarations (get_section outline_only)
+    tokens: int = 0
+    outline_tokens: int = 0
+    elisions: str = ""  # As Contract.elisions, for the whole section
+    subtree_end_line: int = 0  # Last line of the section and all its subsections
+    subtree_byte_length: int = 0  # byte_offset..subtree_end_line (get_section depth)
 
 
 @dataclass
@@ -60,6 +72,14 @@ class ModuleInfo:
     sections: List[str] = field(default_factory=list)
     contracts: List[str] = field(default_factory=list)
     standards: List[str] = field(default_factory=list)
+    outline_tokens: int = 0  # Size of the get_module_outline section list
+    # Incremental rebuild bookkeeping (see indexer.build_index_incremental)
+    content_hash: str = ""
+    code_block_count: int = 0
+    text_standards: List[str] = field(default_factory=list)
+    section_slugs: List[str] = field(default_factory=list)
+    contract_candidates: List[str] = field(default_factory=list)
+    shadowed_contracts: Dict[str, Any] = field(default_factory=dict)
 
 
 @dataclass
@@ -72,11 +92,16 @@ class Index:
     contracts: Dict[str, Any] = field(default_factory=dict)
     standards: Dict[str, List[str]] = field(default_factory=dict)
     stats: Dict[str, int] = field(default_factory=dict)
+    search: Dict[str, Any] = field(default_factory=dict)
+    lookup: Dict[str, Any] = field(default_factory=dict)
+    standard_sets: Dict[str, Any] = field(default_factory=dict)
 
     def save(self, path: Path) -> None:
         path.parent.mkdir(parents=True, exist_ok=True)
+        data = asdict(self)
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(asdict(self), f, indent=2, ensure_ascii=False)
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        save_compact(path, data)
 
     @classmethod
     def load(cls, path: Path) -> "Index":
@@ -87,7 +112,7 @@ class Index:
         idx = cls()
         _expected_types = {
             "modules": dict, "sections": dict, "contracts": dict,
-            "standards": dict, "stats": dict,
+            "standards": dict, "stats": dict, "search": dict, "lookup": dict, "standard_sets": dict,
             "version": str, "generated_at": str, "source_hash": str,
         }
         for k, v in data.items():
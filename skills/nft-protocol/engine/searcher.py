@@ -1,20 +1,128 @@
 """Search and discovery across the NFT Protocol index."""
 from __future__ import annotations
 
-import re
-from typing import Any, Dict, List
+import bisect
+import heapq
+import json
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .indexer import build_search_index, tokenize
+from .stdsets import StandardSets, build_standard_sets, normalize_standard
+from .trigram import LOOKUP_KINDS, lookup_from_index
+
+# BM25F parameters; weights follow the field order in indexer.SEARCH_FIELDS
+BM25_K1 = 1.2
+BM25_B = 0.75
+FIELD_WEIGHTS = {
+    "contract": (3.0, 1.5, 0.5, 2.0),  # name, file_path, imports, standards
+    "section": (3.0, 1.0),             # title, summary
+}
+TOP_K = 20
+MIN_PREFIX_LEN = 3
+MAX_PREFIX_TERMS = 32
+PREFIX_WEIGHT = 0.5
+SUGGEST_LIMIT = 15
+
+# Memory cap for cached search results (JSON-encoded size, LRU eviction)
+RESULT_CACHE_BYTES = 4 * 1024 * 1024
+
+
+class ResultCache:
+    """Thread-safe LRU of search results for one index source_hash.
+
+    Results are kept JSON-encoded, so the cap counts real bytes and every
+    hit is a fresh copy. A lookup under a different source_hash (the
+    index was rebuilt) drops all entries first.
+    """
+
+    def __init__(self, max_bytes: int = RESULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._source_hash: Optional[str] = None
+        self._entries: "OrderedDict[Tuple[Any, ...], str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, source_hash: str, key: Tuple[Any, ...],
+                       compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if source_hash != self._source_hash:
+                if self._source_hash is not None:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._bytes = 0
+                self._source_hash = source_hash
+            stored = self._entries.get(key)
+            if stored is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if stored is not None:
+            return json.loads(stored)
+
+        result = compute()
+        encoded = json.dumps(result)
+        with self._lock:
+            # Skip the store if a rebuild invalidated the cache meanwhile
+            if (len(encoded) <= self.max_bytes and source_hash == self._source_hash
+                    and key not in self._entries):
+                self._entries[key] = encoded
+                self._bytes += len(encoded)
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= len(evicted)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "invalidations": self.invalidations,
+            }
 
 
 class Searcher:
-    """Full-text and fuzzy search over the index."""
+    """Ranked full-text and fuzzy search over the index."""
 
-    def __init__(self, index_data: Dict[str, Any]):
+    def __init__(self, index_data: Dict[str, Any], cache: Optional[ResultCache] = None):
         self.index = index_data
+        self.cache = cache if cache is not None else ResultCache()
+        search = index_data.get("search")
+        if not search or "contract" not in search or "section" not in search:
+            # Index built before the inverted index existed
+            search = build_search_index(
+                index_data.get("sections", {}), index_data.get("contracts", {})
+            )
+        self._search_index = search
+        self.lookup = lookup_from_index(index_data)
+        self._standard_sets: Optional[StandardSets] = None
+        self._vocab: Dict[str, List[str]] = {}
+        self._lengths: Dict[str, List[List[int]]] = {}
+        self._impacts: Dict[Tuple[str, str], Tuple[List[Tuple[int, float]], Dict[int, float]]] = {}
 
     def search(self, query: str, search_type: str = "all") -> Dict[str, Any]:
-        """Search contracts, sections, and standards."""
+        """Search contracts, sections, and standards (cached per normalized query)."""
         q = query.lower().strip()
-        results: Dict[str, Any] = {"query": query, "contracts": [], "sections": [], "standards": []}
+        results = self.cache.get_or_compute(
+            self.index.get("source_hash", ""), (q, search_type),
+            lambda: self._search(q, search_type))
+        results["query"] = query
+        return results
+
+    def _search(self, q: str, search_type: str) -> Dict[str, Any]:
+        results: Dict[str, Any] = {"query": q, "contracts": [], "sections": [], "standards": []}
 
         if not q:
             results["total_results"] = 0
@@ -38,60 +146,35 @@ class Searcher:
 
     def _search_contracts(self, query: str) -> List[Dict[str, Any]]:
         matches = []
-        # Require minimum 2-char query for substring matching to avoid noise
-        min_len = len(query) >= 2
-        for name, c in self.index.get("contracts", {}).items():
-            score = self._score(query, name, c, min_len)
-            if score > 0:
-                matches.append({
-                    "name": name,
-                    "module_file": c["module_file"],
-                    "section_id": c["section_id"],
-                    "file_path": c.get("file_path"),
-                    "standards": c.get("standards", []),
-                    "score": score,
-                })
-        return sorted(matches, key=lambda x: x["score"], reverse=True)[:20]
+        for score, name in self._rank("contract", query):
+            c = self.index["contracts"][name]
+            matches.append({
+                "name": name,
+                "module_file": c["module_file"],
+                "section_id": c["section_id"],
+                "file_path": c.get("file_path"),
+                "standards": c.get("standards", []),
+                "score": score,
+            })
+        return matches
 
     def _search_sections(self, query: str) -> List[Dict[str, Any]]:
         matches = []
-        min_len = len(query) >= 2
-        for sec_id, s in self.index.get("sections", {}).items():
-            title_lower = s.get("title", "").lower()
-            summary_lower = s.get("summary", "").lower()
-            score = 0
-            if query == title_lower:
-                score += 20  # Exact match bonus
-            elif min_len and query in title_lower:
-                score += 10
-            if min_len and query in summary_lower:
-                score += 5
-            if min_len and query in sec_id:
-                score += 8
-            # Fuzzy: check each query word (only words >= 2 chars)
-            for word in query.split():
-                if len(word) < 2:
-                    continue
-                if word in title_lower:
-                    score += 3
-                if word in summary_lower:
-                    score += 1
-            if score > 0:
-                matches.append({
-                    "id": sec_id,
-                    "title": s["title"],
-                    "module_file": s["module_file"],
-                    "contracts": s.get("contracts", []),
-                    "summary": s.get("summary", ""),
-                    "score": score,
-                })
-        return sorted(matches, key=lambda x: x["score"], reverse=True)[:20]
+        for score, sec_id in self._rank("section", query):
+            s = self.index["sections"][sec_id]
+            matches.append({
+                "id": sec_id,
+                "title": s["title"],
+                "module_file": s["module_file"],
+                "contracts": s.get("contracts", []),
+                "summary": s.get("summary", ""),
+                "score": score,
+            })
+        return matches
 
     def _search_standards(self, query: str) -> List[Dict[str, Any]]:
         matches = []
-        # Normalize query for standard matching
-        q_upper = query.upper().replace("EIP-", "ERC-").replace("ERC", "ERC-")
-        q_upper = re.sub(r"ERC--+", "ERC-", q_upper)
+        q_upper = normalize_standard(query)
 
         for std, contract_names in self.index.get("standards", {}).items():
             if query in std.lower() or q_upper in std:
@@ -102,39 +185,111 @@ class Searcher:
                 })
         return sorted(matches, key=lambda x: x["count"], reverse=True)
 
-    def _score(self, query: str, name: str, contract: Dict[str, Any],
-               min_len: bool = True) -> int:
-        score = 0
-        name_lower = name.lower()
-        if query == name_lower:
-            score += 20  # Exact match always scores
-        elif min_len and query in name_lower:
-            score += 10
-        # Check file path
-        fp = (contract.get("file_path") or "").lower()
-        if min_len and query in fp:
-            score += 5
-        # Check standards
-        for std in contract.get("standards", []):
-            if query in std.lower():
-                score += 7
-        # Check imports
-        for imp in contract.get("imports", []):
-            if min_len and query in imp.lower():
-                score += 2
-        # Fuzzy word match (only words >= 2 chars)
-        for word in query.split():
-            if len(word) < 2:
-                continue
-            if word in name_lower:
-                score += 3
-        return score
+    def _rank(self, kind: str, query: str) -> List[Tuple[float, str]]:
+        """BM25F top-k over the inverted index for one document kind.
+
+        A query token missing from the vocabulary matches the index tokens
+        it prefixes ("fract" -> fractional) at PREFIX_WEIGHT of full score.
+        Uses the threshold algorithm over impact-sorted postings, so common
+        terms stop after a few rows instead of scoring every posting.
+        """
+        lists = []
+        seen_terms = set()
+        for tok in tokenize(query):
+            for term, weight in self._expand(kind, tok):
+                if term not in seen_terms:
+                    seen_terms.add(term)
+                    lists.append((weight,) + self._term_impacts(kind, term))
+        if not lists:
+            return []
+
+        heap: List[Tuple[float, int]] = []  # min-heap of (score, -doc)
+        seen_docs = set()
+        max_depth = max(len(ranked) for _, ranked, _ in lists)
+        for depth in range(max_depth):
+            threshold = 0.0
+            for weight, ranked, _ in lists:
+                if depth >= len(ranked):
+                    continue
+                doc, impact = ranked[depth]
+                threshold += weight * impact
+                if doc in seen_docs:
+                    continue
+                seen_docs.add(doc)
+                score = 0.0
+                for w, _, by_doc in lists:
+                    score += w * by_doc.get(doc, 0.0)
+                entry = (score, -doc)
+                if len(heap) < TOP_K:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+            if len(heap) == TOP_K and heap[0][0] >= threshold:
+                break
+
+        docs = self._search_index[kind]["docs"]
+        return [(round(score, 3), docs[-neg]) for score, neg in sorted(heap, reverse=True)]
+
+    def _expand(self, kind: str, token: str) -> List[Tuple[str, float]]:
+        postings = self._search_index[kind]["postings"]
+        if token in postings:
+            return [(token, 1.0)]
+        terms = []
+        if len(token) >= MIN_PREFIX_LEN:
+            vocab = self._vocab.get(kind)
+            if vocab is None:
+                vocab = self._vocab[kind] = sorted(postings)
+            i = bisect.bisect_right(vocab, token)
+            while i < len(vocab) and vocab[i].startswith(token) and len(terms) < MAX_PREFIX_TERMS:
+                terms.append((vocab[i], PREFIX_WEIGHT))
+                i += 1
+        return terms
+
+    def _field_lengths(self, kind: str) -> List[List[int]]:
+        lengths = self._lengths.get(kind)
+        if lengths is None:
+            lengths = self._lengths[kind] = [
+                [int(n) for n in packed.split()]
+                for packed in self._search_index[kind]["lengths"]
+            ]
+        return lengths
+
+    def _term_impacts(
+        self, kind: str, term: str
+    ) -> Tuple[List[Tuple[int, float]], Dict[int, float]]:
+        """Per-document BM25F contribution of one term (cached).
+
+        Returns the (doc, impact) pairs sorted by descending impact and the
+        same impacts keyed by doc for random access.
+        """
+        key = (kind, term)
+        cached = self._impacts.get(key)
+        if cached is not None:
+            return cached
+        sub = self._search_index[kind]
+        weights = FIELD_WEIGHTS[kind]
+        avg = sub["avg_lengths"]
+        lengths = self._field_lengths(kind)
+        # Field-weighted, length-normalised term frequency per document
+        tf_by_doc: Dict[int, float] = {}
+        for entry in sub["postings"].get(term, "").split():
+            doc, fld, tf = map(int, entry.split(":"))
+            norm = 1 - BM25_B + BM25_B * lengths[fld][doc] / max(avg[fld], 1e-9)
+            tf_by_doc[doc] = tf_by_doc.get(doc, 0.0) + weights[fld] * tf / norm
+        n_docs = len(sub["docs"])
+        df = len(tf_by_doc)
+        idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        by_doc = {
+            doc: idf * tf * (BM25_K1 + 1) / (BM25_K1 + tf)
+            for doc, tf in tf_by_doc.items()
+        }
+        ranked = sorted(by_doc.items(), key=lambda x: (-x[1], x[0]))
+        self._impacts[key] = (ranked, by_doc)
+        return ranked, by_doc
 
     def find_by_standard(self, standard: str) -> Dict[str, Any]:
         """Find all contracts implementing a given ERC standard."""
-        # Normalize
-        std = standard.upper().replace("EIP-", "ERC-").replace("ERC", "ERC-")
-        std = re.sub(r"ERC--+", "ERC-", std)
+        std = normalize_standard(standard)
 
         contracts = self.index.get("standards", {}).get(std, [])
         details = []
@@ -154,6 +309,48 @@ class Searcher:
             "contracts": details,
         }
 
+    def query_standards(self, expression: str, scope: str = "contracts",
+                        limit: Optional[int] = None) -> Dict[str, Any]:
+        """Contracts (or modules) matching a boolean standards expression.
+
+        e.g. "ERC-721 AND ERC-2981 AND NOT ERC-5192"; see stdsets.parse_query.
+        Raises ValueError for a malformed expression or unknown scope.
+        """
+        if self._standard_sets is None:
+            data = self.index.get("standard_sets")
+            if not data:
+                # Index built before standard bitsets existed
+                data = build_standard_sets(self.index.get("contracts", {}),
+                                           self.index.get("modules", {}))
+            self._standard_sets = StandardSets(data)
+        found = self._standard_sets.query(expression, scope, limit)
+
+        if scope == "modules":
+            modules = self.index.get("modules", {})
+            results = [{
+                "file_name": name,
+                "title": modules[name]["title"],
+                "contract_count": len(modules[name].get("contracts", [])),
+                "standards": modules[name].get("standards", []),
+            } for name in found["names"]]
+        else:
+            contracts = self.index.get("contracts", {})
+            results = [{
+                "name": name,
+                "module_file": contracts[name]["module_file"],
+                "section_id": contracts[name]["section_id"],
+                "file_path": contracts[name].get("file_path"),
+                "standards": contracts[name].get("standards", []),
+            } for name in found["names"]]
+        return {
+            "query": found["expression"],
+            "scope": scope,
+            "count": found["count"],
+            "truncated": found["count"] > len(results),
+            scope: results,
+            "unknown_standards": found["unknown_standards"],
+        }
+
     def list_modules(self) -> List[Dict[str, Any]]:
         """List all modules with summaries."""
         result = []
@@ -195,16 +392,14 @@ class Searcher:
         return sorted(result, key=lambda x: x["standard"])
 
     def suggest(self, partial: str) -> List[str]:
-        """Autocomplete partial input against contract/section names."""
-        p = partial.lower()
-        suggestions = []
-        for name in self.index.get("contracts", {}):
-            if p in name.lower():
-                suggestions.append(f"contract:{name}")
-        for sec_id in self.index.get("sections", {}):
-            if p in sec_id.lower():
-                suggestions.append(f"section:{sec_id}")
-        for std in self.index.get("standards", {}):
-            if p in std.lower():
-                suggestions.append(f"standard:{std}")
-        return suggestions[:15]
+        """Autocomplete partial input against contract/section/standard names.
+
+        Exact, prefix and substring matches rank first, then typo-tolerant
+        trigram matches; ties break on kind, name length and name.
+        """
+        ranked = []
+        for kind_order, kind in enumerate(LOOKUP_KINDS):
+            for cls, similarity, name in self.lookup.find(kind, partial, limit=SUGGEST_LIMIT):
+                ranked.append((cls, -similarity, kind_order, len(name), name, kind))
+        ranked.sort()
+        return [f"{kind}:{name}" for *_, name, kind in ranked[:SUGGEST_LIMIT]]
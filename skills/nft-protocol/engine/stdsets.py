@@ -0,0 +1,189 @@
+"""Standard bitsets: boolean AND/OR/NOT queries over ERC standards.
+
+For each scope (contracts, modules) the index stores the names in index
+order and, per standard, a bitmask over those positions (bit i set when
+name i implements the standard), hex-encoded. Queries combine the masks
+with integer bitwise ops, so one evaluation costs a few word-parallel
+passes over ``n / 64`` machine words regardless of how many names match.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SCOPES = ("contracts", "modules")
+
+RE_QUERY_TOKEN = re.compile(r"\(|\)|&&?|\|\|?|!|[^\s()&|!]+")
+_OPERATORS = {"and": "AND", "&": "AND", "&&": "AND",
+              "or": "OR", "|": "OR", "||": "OR",
+              "not": "NOT", "!": "NOT"}
+
+
+def normalize_standard(standard: str) -> str:
+    """Canonical standard name ("eip721", "ERC721" -> "ERC-721")."""
+    std = standard.strip().upper().replace("EIP-", "ERC-").replace("EIP", "ERC")
+    std = std.replace("ERC", "ERC-")
+    return re.sub(r"ERC--+", "ERC-", std)
+
+
+def build_standard_sets(contracts: Dict[str, Any], modules: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the persisted bitsets from contract and module records."""
+    result: Dict[str, Any] = {}
+    for scope, records in (("contracts", contracts), ("modules", modules)):
+        names = list(records)
+        masks: Dict[str, int] = {}
+        for i, name in enumerate(names):
+            for std in records[name].get("standards", []):
+                masks[std] = masks.get(std, 0) | (1 << i)
+        result[scope] = {
+            "names": names,
+            "bits": {std: format(mask, "x") for std, mask in sorted(masks.items())},
+        }
+    return result
+
+
+def parse_query(expression: str) -> Tuple[Any, ...]:
+    """Parse a standards expression into a tuple tree.
+
+    Grammar (case-insensitive operators, NOT binds tightest, then AND)::
+
+        expr := term (OR term)*
+        term := factor ([AND] factor)*      # adjacency means AND
+        factor := NOT factor | "(" expr ")" | STANDARD
+
+    Raises ValueError on malformed input.
+    """
+    tokens = RE_QUERY_TOKEN.findall(expression)
+    pos = 0
+
+    def peek() -> Optional[str]:
+        return tokens[pos] if pos < len(tokens) else None
+
+    def op(token: Optional[str]) -> Optional[str]:
+        return _OPERATORS.get(token.lower()) if token is not None else None
+
+    def expr() -> Tuple[Any, ...]:
+        nonlocal pos
+        node = term()
+        while op(peek()) == "OR":
+            pos += 1
+            node = ("or", node, term())
+        return node
+
+    def term() -> Tuple[Any, ...]:
+        nonlocal pos
+        node = factor()
+        while True:
+            token = peek()
+            if op(token) == "AND":
+                pos += 1
+            elif token is None or token == ")" or op(token) == "OR":
+                return node
+            node = ("and", node, factor())
+
+    def factor() -> Tuple[Any, ...]:
+        nonlocal pos
+        token = peek()
+        if token is None:
+            raise ValueError("Unexpected end of query")
+        pos += 1
+        if op(token) == "NOT":
+            return ("not", factor())
+        if token == "(":
+            node = expr()
+            if peek() != ")":
+                raise ValueError("Missing ')'")
+            pos += 1
+            return node
+        if token == ")" or op(token) is not None:
+            raise ValueError(f"Unexpected '{token}'")
+        return ("std", normalize_standard(token))
+
+    node = expr()
+    if pos != len(tokens):
+        raise ValueError(f"Unexpected '{tokens[pos]}'")
+    return node
+
+
+def format_query(node: Tuple[Any, ...]) -> str:
+    """Render a parsed query with explicit operators and parentheses."""
+    kind = node[0]
+    if kind == "std":
+        return node[1]
+    if kind == "not":
+        inner = format_query(node[1])
+        return f"NOT {inner}" if node[1][0] in ("std", "not") else f"NOT ({inner})"
+    parts = []
+    for child in node[1:]:
+        text = format_query(child)
+        # AND inside OR reads unambiguously; OR inside AND needs parens
+        parts.append(f"({text})" if child[0] == "or" and kind == "and" else text)
+    return f" {kind.upper()} ".join(parts)
+
+
+def _standards_in(node: Tuple[Any, ...]) -> Iterable[str]:
+    if node[0] == "std":
+        yield node[1]
+    else:
+        for child in node[1:]:
+            yield from _standards_in(child)
+
+
+def iter_bits(mask: int, limit: Optional[int] = None) -> List[int]:
+    """Positions of the set bits of ``mask``, lowest first."""
+    bits = bin(mask)[:1:-1]  # Least significant first
+    out: List[int] = []
+    i = bits.find("1")
+    while i >= 0 and (limit is None or len(out) < limit):
+        out.append(i)
+        i = bits.find("1", i + 1)
+    return out
+
+
+class StandardSets:
+    """Evaluates standards expressions over persisted bitsets."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self._masks: Dict[Tuple[str, str], int] = {}
+
+    def names(self, scope: str) -> List[str]:
+        return self.data.get(scope, {}).get("names", [])
+
+    def standards(self, scope: str) -> List[str]:
+        return list(self.data.get(scope, {}).get("bits", {}))
+
+    def mask(self, scope: str, standard: str) -> int:
+        key = (scope, standard)
+        cached = self._masks.get(key)
+        if cached is None:
+            packed = self.data.get(scope, {}).get("bits", {}).get(standard)
+            cached = self._masks[key] = int(packed, 16) if packed else 0
+        return cached
+
+    def evaluate(self, node: Tuple[Any, ...], scope: str) -> int:
+        kind = node[0]
+        if kind == "std":
+            return self.mask(scope, node[1])
+        if kind == "not":
+            universe = (1 << len(self.names(scope))) - 1
+            return universe & ~self.evaluate(node[1], scope)
+        left = self.evaluate(node[1], scope)
+        right = self.evaluate(node[2], scope)
+        return left & right if kind == "and" else left | right
+
+    def query(self, expression: str, scope: str = "contracts",
+              limit: Optional[int] = None) -> Dict[str, Any]:
+        """Evaluate ``expression``; return matching names (up to ``limit``) and counts."""
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown scope '{scope}' (expected one of {', '.join(SCOPES)})")
+        node = parse_query(expression)
+        mask = self.evaluate(node, scope)
+        names = self.names(scope)
+        known = self.data.get(scope, {}).get("bits", {})
+        return {
+            "expression": format_query(node),
+            "count": bin(mask).count("1"),
+            "names": [names[i] for i in iter_bits(mask, limit)],
+            "unknown_standards": sorted({s for s in _standards_in(node) if s not in known}),
+        }
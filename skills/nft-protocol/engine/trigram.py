@@ -0,0 +1,130 @@
+"""Trigram index for case-insensitive, partial and typo-tolerant name lookup."""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Kinds of names covered, in suggestion order
+LOOKUP_KINDS = ("contract", "section", "standard")
+
+# Minimum Dice similarity for a typo-tolerant candidate
+MIN_SIMILARITY = 0.3
+
+# Match classes, best first
+EXACT, PREFIX, SUBSTRING, FUZZY = range(4)
+
+
+def trigrams(text: str) -> Set[str]:
+    """Lowercase trigrams of ``text``; names under 3 chars are one gram."""
+    t = text.lower()
+    if len(t) < 3:
+        return {t} if t else set()
+    return {t[i : i + 3] for i in range(len(t) - 2)}
+
+
+def build_lookup_index(names_by_kind: Dict[str, Iterable[str]]) -> Dict[str, Any]:
+    """Build the persisted trigram index.
+
+    For each kind: the names in index order, and a map from trigram to the
+    space-separated positions of the names containing it.
+    """
+    result: Dict[str, Any] = {}
+    for kind, names in names_by_kind.items():
+        names = list(names)
+        grams: Dict[str, List[str]] = {}
+        for i, name in enumerate(names):
+            for g in sorted(trigrams(name)):
+                grams.setdefault(g, []).append(str(i))
+        result[kind] = {
+            "names": names,
+            "trigrams": {g: " ".join(p) for g, p in sorted(grams.items())},
+        }
+    return result
+
+
+class TrigramIndex:
+    """Lookups over a persisted trigram index (see build_lookup_index)."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self._postings: Dict[Tuple[str, str], Set[int]] = {}
+
+    def _names(self, kind: str) -> List[str]:
+        return self.data.get(kind, {}).get("names", [])
+
+    def _posting(self, kind: str, gram: str) -> Set[int]:
+        key = (kind, gram)
+        cached = self._postings.get(key)
+        if cached is None:
+            packed = self.data.get(kind, {}).get("trigrams", {}).get(gram, "")
+            cached = self._postings[key] = {int(i) for i in packed.split()}
+        return cached
+
+    def _containing(self, kind: str, text: str) -> List[int]:
+        """Positions of names containing ``text`` (case-insensitive)."""
+        t = text.lower()
+        names = self._names(kind)
+        if len(t) < 3:
+            # Too short for trigram filtering; scan (names are few and short
+            # queries are rare)
+            return [i for i, n in enumerate(names) if t in n.lower()]
+        postings = sorted((self._posting(kind, g) for g in trigrams(t)), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return sorted(i for i in candidates if t in names[i].lower())
+
+    def exact(self, kind: str, text: str) -> Optional[str]:
+        """Case-insensitive exact match; the first name in index order wins."""
+        if not text:
+            return None
+        t = text.lower()
+        names = self._names(kind)
+        for i in self._containing(kind, t):
+            if names[i].lower() == t:
+                return names[i]
+        return None
+
+    def find(self, kind: str, text: str, limit: int = 15,
+             fuzzy: bool = True) -> List[Tuple[int, float, str]]:
+        """Ranked candidates for ``text`` as (match_class, similarity, name).
+
+        Exact, prefix and substring matches come first (shorter names, then
+        alphabetical, break ties); when ``fuzzy`` is set, names sharing
+        enough trigrams with ``text`` follow by descending Dice similarity.
+        """
+        t = text.lower()
+        if not t:
+            return []
+        names = self._names(kind)
+        results: List[Tuple[int, float, str]] = []
+        matched = set()
+        for i in self._containing(kind, t):
+            low = names[i].lower()
+            cls = EXACT if low == t else PREFIX if low.startswith(t) else SUBSTRING
+            results.append((cls, 1.0, names[i]))
+            matched.add(i)
+
+        if fuzzy:
+            query_grams = trigrams(t)
+            shared: Dict[int, int] = {}
+            for g in query_grams:
+                for i in self._posting(kind, g):
+                    if i not in matched:
+                        shared[i] = shared.get(i, 0) + 1
+            for i, n_shared in shared.items():
+                dice = 2 * n_shared / (len(query_grams) + len(trigrams(names[i])))
+                if dice >= MIN_SIMILARITY:
+                    results.append((FUZZY, round(dice, 3), names[i]))
+
+        results.sort(key=lambda r: (r[0], -r[1], len(r[2]), r[2]))
+        return results[:limit]
+
+
+def lookup_from_index(index_data: Dict[str, Any]) -> TrigramIndex:
+    """TrigramIndex for a loaded index, building it for older index files."""
+    data = index_data.get("lookup")
+    if not data or any(kind not in data for kind in LOOKUP_KINDS):
+        data = build_lookup_index({
+            "contract": index_data.get("contracts", {}),
+            "section": index_data.get("sections", {}),
+            "standard": index_data.get("standards", {}),
+        })
+    return TrigramIndex(data)
@@ -0,0 +1,96 @@
+"""One pass over a markdown document: byte offsets and heading structure.
+
+The index passes need UTF-8 byte offsets for regex matches, the next
+heading after a match and each heading's extent and parent. Recomputing
+those per match (``len(content[:pos].encode())``, re-searching
+``content[end:]``, scanning the heading list) is O(file) each, so large
+documents index in quadratic time. DocText encodes the file once, keeps
+a per-line char/byte offset table and a heading stack, and answers
+every lookup by bisection.
+"""
+from __future__ import annotations
+
+import re
+from bisect import bisect_left, bisect_right
+from typing import List, NamedTuple, Optional
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+)$", re.MULTILINE)
+# Level 2-4 heading that ends a pattern/strategy/function section
+_SUBHEADING_RE = re.compile(r"^#{2,4}\s+", re.MULTILINE)
+_SUBHEADING_AT = re.compile(r"#{2,4}\s")
+
+
+class Heading(NamedTuple):
+    """A ``#`` heading line and the section it opens."""
+    byte_start: int
+    byte_end: int  # next heading at the same or a higher level, or EOF
+    level: int
+    title: str
+    line: int
+    parent: Optional[int]  # index in DocText.headings of the enclosing heading
+
+
+class DocText:
+    """Offset table and heading tree for one document, built once."""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.data = content.encode("utf-8")
+        self._ascii = len(self.data) == len(content)
+        self._line_chars: List[int] = []
+        self._line_bytes: List[int] = []
+
+        found = []  # (byte_start, level, title, line, parent)
+        ends: List[int] = []
+        stack: List[int] = []  # open headings, levels strictly increasing
+        char_pos = byte_pos = 0
+        for line_idx, line in enumerate(content.split("\n")):
+            self._line_chars.append(char_pos)
+            self._line_bytes.append(byte_pos)
+            m = _HEADING_RE.match(line)
+            if m:
+                level = len(m.group(1))
+                # A heading closes every open section at its level or deeper
+                while stack and found[stack[-1]][1] >= level:
+                    ends[stack.pop()] = byte_pos
+                found.append((byte_pos, level, m.group(2).strip(), line_idx,
+                              stack[-1] if stack else None))
+                ends.append(len(self.data))
+                stack.append(len(found) - 1)
+            char_pos += len(line) + 1
+            byte_pos += (len(line) if self._ascii else len(line.encode("utf-8"))) + 1
+        self.headings = [Heading(start, end, level, title, line, parent)
+                         for (start, level, title, line, parent), end in zip(found, ends)]
+
+        # Matched over the whole content, not per line: ``\s+`` may cross a newline here
+        self._heading_matches = list(_HEADING_RE.finditer(content))
+        self._heading_starts = [m.start() for m in self._heading_matches]
+        self._subheading_starts = [m.start() for m in _SUBHEADING_RE.finditer(content)]
+
+    def byte_at(self, pos: int) -> int:
+        """UTF-8 byte offset of character ``pos``."""
+        if self._ascii:
+            return pos
+        line = bisect_right(self._line_chars, pos) - 1
+        start = self._line_chars[line]
+        return self._line_bytes[line] + len(self.content[start:pos].encode("utf-8"))
+
+    def text(self, byte_start: int, byte_end: int) -> str:
+        """Decoded bytes [byte_start, byte_end)."""
+        return self.data[byte_start:byte_end].decode("utf-8", errors="replace")
+
+    def next_subheading(self, pos: int) -> Optional[int]:
+        """Start of the first level 2-4 heading at or after ``pos``.
+
+        Same result as ``re.search(r"^#{2,4}\\s+", content[pos:], re.M)``:
+        ``pos`` itself counts even mid-line, as the slice's start would.
+        """
+        if pos < len(self.content) and _SUBHEADING_AT.match(self.content, pos):
+            return pos
+        i = bisect_left(self._subheading_starts, pos)
+        return self._subheading_starts[i] if i < len(self._subheading_starts) else None
+
+    def heading_before(self, pos: int) -> Optional[re.Match]:
+        """The last ``_HEADING_RE`` match starting before ``pos``, if any."""
+        i = bisect_left(self._heading_starts, pos)
+        return self._heading_matches[i - 1] if i else None
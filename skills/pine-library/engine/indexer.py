@@ -7,16 +7,18 @@ from __future__ import annotations
 
 import hashlib
 import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import asdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 
+from .doctext import DocText
 from .schema import CodeExample, Index, ScriptDoc
 
 _FRONTMATTER_RE = re.compile(r"^---\n(.*?)\n---", re.DOTALL)
-_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+)$", re.MULTILINE)
 _CODE_BLOCK_RE = re.compile(r"```(\w*)\n(.*?)```", re.DOTALL)
 
 
@@ -70,28 +72,13 @@ def _extract_keywords(text: str) -> List[str]:
     return sorted(words)[:50]
 
 
-def _find_section_offsets(content: str) -> Dict[str, Tuple[int, int]]:
+def _find_section_offsets(doc: DocText) -> Dict[str, Tuple[int, int]]:
     """Find byte offsets for Description and Source Code sections."""
-    content_bytes = content.encode("utf-8")
     offsets: Dict[str, Tuple[int, int]] = {}
 
-    byte_pos = 0
-    headings: List[Tuple[int, int, str]] = []  # (byte_start, level, title)
-    for line in content.split("\n"):
-        m = _HEADING_RE.match(line)
-        if m:
-            level = len(m.group(1))
-            title = m.group(2).strip()
-            headings.append((byte_pos, level, title))
-        byte_pos += len(line.encode("utf-8")) + 1
-
-    for i, (byte_start, level, title) in enumerate(headings):
-        byte_end = len(content_bytes)
-        for j in range(i + 1, len(headings)):
-            if headings[j][1] <= level:
-                byte_end = headings[j][0]
-                break
-        offsets[title.lower()] = (byte_start, byte_end - byte_start)
+    for heading in doc.headings:
+        offsets[heading.title.lower()] = (heading.byte_start,
+                                          heading.byte_end - heading.byte_start)
 
     return offsets
 
@@ -105,7 +92,8 @@ def _index_script(content: str, source_file: str) -> Tuple[
     if not meta.get("id"):
         return None, []
 
-    content_bytes = content.encode("utf-8")
+    doc = DocText(content)
+    content_bytes = doc.data
     total_len = len(content_bytes)
 
     # Find frontmatter end
@@ -113,7 +101,7 @@ def _index_script(content: str, source_file: str) -> Tuple[
     body_start = len(fm_match.group(0).encode("utf-8")) + 1 if fm_match else 0
 
     # Find section offsets
-    section_offsets = _find_section_offsets(content)
+    section_offsets = _find_section_offsets(doc)
 
     desc_offset, desc_length = section_offsets.get(
         "description", (body_start, total_len - body_start)
@@ -154,7 +142,7 @@ def _index_script(content: str, source_file: str) -> Tuple[
         lang = m.group(1).lower()
         if lang not in ("pine", "pinescript", ""):
             continue
-        byte_start = len(content[:m.start()].encode("utf-8"))
+        byte_start = doc.byte_at(m.start())
         byte_length = len(m.group(0).encode("utf-8"))
         ex_id = f"ex/{meta['id']}-{i}"
         examples.append(asdict(CodeExample(
@@ -170,22 +158,55 @@ def _index_script(content: str, source_file: str) -> Tuple[
     return script, examples
 
 
-def build_index(raw_dir: Path) -> Index:
-    """Build a complete search index from all raw script markdown files."""
+def _index_file(md_file: Path, raw_dir: Path) -> Tuple[
+    Dict[str, Any] | None,
+    List[Dict[str, Any]],
+]:
+    """Read and index one script file (see _index_script)."""
+    content = md_file.read_text(encoding="utf-8")
+    rel_path = str(md_file.relative_to(raw_dir.parent.parent))
+    return _index_script(content, rel_path)
+
+
+def _map_files(parse: Callable[..., Any], items: List[Tuple[Any, ...]], jobs: int) -> List[Any]:
+    """Apply ``parse`` to each argument tuple; results come back in input order.
+
+    With ``jobs`` > 1 (0 = one per CPU) the calls run in a process pool.
+    build_index reduces the results in order, so the index is identical
+    to a serial build.
+    """
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs > 1 and len(items) > 1:
+        workers = min(jobs, len(items))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(parse, *zip(*items),
+                                 chunksize=max(1, len(items) // (workers * 4))))
+    return [parse(*args) for args in items]
+
+
+def source_files(raw_dir: Path) -> List[Path]:
+    """Every raw script file build_index reads (polled by the MCP server's watcher)."""
+    return sorted(raw_dir.glob("*.md"))
+
+
+def build_index(raw_dir: Path, jobs: int = 1) -> Index:
+    """Build a complete search index from all raw script markdown files.
+
+    Files are parsed in ``jobs`` worker processes (1 = serial, 0 = per
+    CPU); the tag and author postings are built in file order afterwards.
+    """
     all_scripts: Dict[str, Any] = {}
     all_examples: Dict[str, Any] = {}
     all_tags: Dict[str, List[str]] = {}
     all_authors: Dict[str, List[str]] = {}
 
-    md_files = sorted(raw_dir.glob("*.md"))
+    md_files = source_files(raw_dir)
     if not md_files:
         raise FileNotFoundError(f"No markdown files found in {raw_dir}")
 
-    for md_file in md_files:
-        content = md_file.read_text(encoding="utf-8")
-        rel_path = str(md_file.relative_to(raw_dir.parent.parent))
-
-        script, examples = _index_script(content, rel_path)
+    parsed = _map_files(_index_file, [(md_file, raw_dir) for md_file in md_files], jobs)
+    for script, examples in parsed:
         if script is None:
             continue
 
@@ -211,7 +232,7 @@ def build_index(raw_dir: Path) -> Index:
 
     # Compute source hash
     source_hash = hashlib.sha256()
-    for md_file in sorted(raw_dir.glob("*.md")):
+    for md_file in source_files(raw_dir):
         source_hash.update(md_file.read_bytes())
 
     stats = {
@@ -241,6 +262,6 @@ def build_index(raw_dir: Path) -> Index:
 def check_index_freshness(index: Index, raw_dir: Path) -> bool:
     """Check if the index matches the current source files."""
     current_hash = hashlib.sha256()
-    for md_file in sorted(raw_dir.glob("*.md")):
+    for md_file in source_files(raw_dir):
         current_hash.update(md_file.read_bytes())
     return index.source_hash == current_hash.hexdigest()[:16]
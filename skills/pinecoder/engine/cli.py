@@ -24,9 +24,10 @@ def _load_index(command: str = "unknown") -> Dict[str, Any]:
         _out({"status": "error", "command": command,
               "error": "Index not found. Run: python3 -m engine scrape && python3 -m engine build-index"})
         sys.exit(2)
+    from .compact import load_index
     try:
-        with open(INDEX_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
+        # Lazy view over data/index.bin when it mirrors index.json
+        return load_index(INDEX_PATH)
     except json.JSONDecodeError as e:
         _out({"status": "error", "command": command,
               "error": f"Corrupt index JSON: {e}. Run: python3 -m engine build-index"})
@@ -78,7 +79,7 @@ def cmd_build_index(args: argparse.Namespace) -> None:
         _out({"status": "error", "command": "build-index",
               "error": f"No markdown files in {RAW_DIR}. Run: python3 -m engine scrape"})
         sys.exit(2)
-    idx = build_index(RAW_DIR)
+    idx = build_index(RAW_DIR, jobs=args.jobs)
     idx.save(INDEX_PATH)
     _out({
         "status": "ok",
@@ -193,10 +194,35 @@ def cmd_token_report(args: argparse.Namespace) -> None:
     _out({"status": "ok", "command": "token-report", **report})
 
 
+def cmd_bench(args: argparse.Namespace) -> None:
+    """Time the engine on synthetic corpora or one large manual page, optionally against a baseline."""
+    from .bench import bench_parse, compare_to_baseline, run_suite
+
+    if args.target == "parse":
+        sizes = [float(mb) for mb in args.sizes.split(",") if mb.strip()]
+        result = bench_parse(sizes, repeat=args.repeat)
+    else:
+        scales = [int(s) for s in args.scales.split(",") if s.strip()]
+        result = run_suite(SKILL_DIR, scales=scales, repeat=args.repeat, mcp=not args.no_mcp)
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    regressions = []
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(result, baseline, args.tolerance)
+        result["regressions"] = regressions
+    misses = sum(c["extract_misses"] for c in result.get("corpora", {}).values())
+    ok = not regressions and not misses and not result.get("mcp_errors")
+    _out({"status": "ok" if ok else "error", "command": "bench", "result": result})
+    if not ok:
+        sys.exit(1)
+
+
 def cmd_serve(args: argparse.Namespace) -> None:
     """Start MCP stdio server."""
     from .mcp_server import run_server
-    run_server(SKILL_DIR, INDEX_PATH, LOG_PATH)
+    run_server(SKILL_DIR, INDEX_PATH, args.log_path, watch_interval=args.watch_interval,
+               search_cache_bytes=int(args.search_cache_mb * 1024 * 1024))
 
 
 # ---------------------------------------------------------------------------
@@ -220,7 +246,9 @@ def main() -> None:
     p.add_argument("source_dir", help="Directory containing .html or .md files")
 
     # build-index
-    sub.add_parser("build-index", help="Build search index from cached docs")
+    p = sub.add_parser("build-index", help="Build search index from cached docs")
+    p.add_argument("--jobs", type=int, default=1,
+                   help="Parse files in N worker processes (0 = one per CPU)")
 
     # check-index
     sub.add_parser("check-index", help="Check index freshness")
@@ -247,8 +275,29 @@ def main() -> None:
     # token-report
     sub.add_parser("token-report", help="Show token usage report")
 
+    # bench
+    p = sub.add_parser("bench", help="Time build/check/search/extract/MCP on synthetic corpora")
+    p.add_argument("--target", choices=["suite", "parse"], default="suite",
+                   help="suite: engine stages per corpus scale; parse: indexing one large manual page")
+    p.add_argument("--sizes", default="1,4", help="parse: comma-separated manual page sizes in MB")
+    p.add_argument("--scales", default="1,10",
+                   help="Comma-separated corpus multiples of data/raw (e.g. 1,10,100)")
+    p.add_argument("--repeat", type=int, default=3, help="Samples per timing")
+    p.add_argument("--no-mcp", action="store_true", help="Skip MCP round trips")
+    p.add_argument("--baseline", default=None,
+                   help="Baseline JSON to compare against; exits 1 on regressions")
+    p.add_argument("--save-baseline", default=None, help="Write this run's result as JSON")
+    p.add_argument("--tolerance", type=float, default=0.25,
+                   help="Allowed slowdown vs the baseline (0.25 = 25%%)")
+
     # serve
-    sub.add_parser("serve", help="Start MCP stdio server")
+    p = sub.add_parser("serve", help="Start MCP stdio server")
+    p.add_argument("--watch-interval", type=float, default=2.0,
+                   help="Seconds between source change polls; 0 disables hot reload")
+    p.add_argument("--search-cache-mb", type=float, default=4.0,
+                   help="Memory cap for cached search results (default: 4; 0 disables)")
+    p.add_argument("--log-path", type=Path, default=LOG_PATH,
+                   help="Token usage log for tool calls (default: data/token_log.jsonl)")
 
     args = parser.parse_args()
 
@@ -262,6 +311,7 @@ def main() -> None:
         "list": cmd_list,
         "status": cmd_status,
         "token-report": cmd_token_report,
+        "bench": cmd_bench,
         "serve": cmd_serve,
     }
 
@@ -0,0 +1,168 @@
+"""Compact index file: length-prefixed JSON records behind a key directory.
+
+``index.bin`` sits next to ``index.json`` and is opened lazily: only the
+directory is parsed up front, and each top-level value (or, for maps of
+records such as contracts and sections, each record) is decoded on first
+access. It is a cache of ``index.json`` and is ignored (and rewritten on
+the next load) whenever the JSON file's size or mtime no longer match the
+ones recorded in its header.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"SKIDX1"
+_HEADER = struct.Struct("<6sI")  # magic, directory length
+
+
+def compact_path(json_path: Path) -> Path:
+    return json_path.with_suffix(".bin")
+
+
+def _fingerprint(json_path: Path) -> List[int]:
+    st = json_path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _is_record_map(value: Any) -> bool:
+    return (isinstance(value, dict) and bool(value)
+            and all(isinstance(v, dict) for v in value.values()))
+
+
+def write_compact(index_data: Dict[str, Any], path: Path, source: List[int]) -> None:
+    """Write ``index_data`` to ``path``; ``source`` fingerprints the JSON it mirrors."""
+    records = bytearray()
+
+    def add(value: Any) -> List[int]:
+        data = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        offset = len(records)
+        records.extend(data)
+        return [offset, len(data)]
+
+    directory: List[Any] = []
+    for key, value in index_data.items():
+        if _is_record_map(value):
+            directory.append([key, "map", [[k] + add(v) for k, v in value.items()]])
+        else:
+            directory.append([key, "value"] + add(value))
+    head = json.dumps({"source": source, "keys": directory},
+                      ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, len(head)))
+            f.write(head)
+            f.write(records)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def save_compact(json_path: Path, index_data: Dict[str, Any]) -> None:
+    """Best-effort compact copy of a freshly written index.json."""
+    try:
+        write_compact(index_data, compact_path(json_path), _fingerprint(json_path))
+    except OSError:
+        pass
+
+
+class LazyMap(Mapping):
+    """Read-only map whose records are decoded on first access."""
+
+    def __init__(self, buf: Any, base: int, entries: Dict[str, Tuple[int, int]]):
+        self._buf = buf
+        self._base = base
+        self._entries = entries
+        self._cache: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        offset, length = self._entries[key]
+        start = self._base + offset
+        value = self._cache[key] = json.loads(self._buf[start : start + length])
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"<LazyMap {len(self)} records, {len(self._cache)} decoded>"
+
+
+class LazyIndex(LazyMap):
+    """Top level of a compact index; record maps come back as LazyMaps."""
+
+    def __init__(self, buf: Any, base: int, directory: List[Any]):
+        entries: Dict[str, Tuple[int, int]] = {}
+        maps: Dict[str, LazyMap] = {}
+        for item in directory:
+            if item[1] == "map":
+                maps[item[0]] = LazyMap(buf, base, {k: (o, n) for k, o, n in item[2]})
+                entries[item[0]] = (-1, 0)
+            else:
+                entries[item[0]] = (item[2], item[3])
+        super().__init__(buf, base, entries)
+        self._cache.update(maps)
+
+
+def open_compact(path: Path, source: Optional[List[int]] = None) -> Optional[LazyIndex]:
+    """Open a compact index, or None if it is missing, invalid or stale."""
+    try:
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        magic, head_len = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("bad magic")
+        base = _HEADER.size + head_len
+        head = json.loads(buf[_HEADER.size : base])
+        if source is not None and head.get("source") != source:
+            raise ValueError("stale")
+        return LazyIndex(buf, base, head["keys"])
+    except (struct.error, ValueError, KeyError, TypeError, IndexError):
+        buf.close()
+        return None
+
+
+def load_index(json_path: Path) -> Mapping:
+    """Load an index, lazily through its compact copy when that is current.
+
+    Falls back to parsing index.json (refreshing the compact copy);
+    missing-file, permission and JSON errors propagate as from json.load.
+    """
+    source = _fingerprint(json_path)
+    bin_path = compact_path(json_path)
+    lazy = open_compact(bin_path, source)
+    if lazy is not None:
+        return lazy
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        try:
+            write_compact(data, bin_path, source)
+        except OSError:
+            pass  # Read-only data dir: keep using JSON
+    return data
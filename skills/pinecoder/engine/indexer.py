@@ -7,17 +7,19 @@ from __future__ import annotations
 
 import hashlib
 import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import asdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from .doctext import DocText
 from .schema import CodeExample, FunctionDoc, Index, Section, TypeDoc
 
 
 # Regex patterns for Pine Script elements
-_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+)$", re.MULTILINE)
 _CODE_BLOCK_RE = re.compile(r"```(\w*)\n(.*?)```", re.DOTALL)
 _FUNC_CALL_RE = re.compile(r"\b([a-z][a-z0-9]*(?:\.[a-z_][a-z0-9_]*))\s*\(", re.IGNORECASE)
 _FUNC_SIGNATURE_RE = re.compile(
@@ -83,35 +85,17 @@ def _extract_keywords(text: str) -> List[str]:
 
 
 def _index_sections(
-    content: str,
+    doc: DocText,
     source_file: str,
     category: str,
 ) -> Dict[str, Dict[str, Any]]:
     """Extract all heading-based sections with byte offsets."""
     sections: Dict[str, Dict[str, Any]] = {}
-    content_bytes = content.encode("utf-8")
-
-    headings: List[Tuple[int, int, str, int]] = []  # (byte_start, level, title, line_idx)
-
-    byte_pos = 0
-    for line_idx, line in enumerate(content.split("\n")):
-        m = _HEADING_RE.match(line)
-        if m:
-            level = len(m.group(1))
-            title = m.group(2).strip()
-            headings.append((byte_pos, level, title, line_idx))
-        byte_pos += len(line.encode("utf-8")) + 1  # +1 for newline
-
-    for i, (byte_start, level, title, line_idx) in enumerate(headings):
-        # Section ends at next heading at same or higher level (lower number), or EOF
-        byte_end = len(content_bytes)
-        for j in range(i + 1, len(headings)):
-            if headings[j][1] <= level:  # same or higher level heading
-                byte_end = headings[j][0]
-                break
 
+    # Each section ends at the next heading at the same or higher level, or EOF
+    for i, (byte_start, byte_end, level, title, _, parent_idx) in enumerate(doc.headings):
         byte_length = byte_end - byte_start
-        section_content = content_bytes[byte_start:byte_end].decode("utf-8", errors="replace")
+        section_content = doc.text(byte_start, byte_end)
 
         # Count pine code blocks in this section
         code_blocks = len(re.findall(r"```(?:pine|pinescript)?", section_content))
@@ -123,11 +107,8 @@ def _index_sections(
 
         # Build parent chain
         parent = None
-        for j in range(i - 1, -1, -1):
-            if headings[j][1] < level:
-                parent_title = headings[j][2]
-                parent = f"{category}/{_slug(parent_title)}"
-                break
+        if parent_idx is not None:
+            parent = f"{category}/{_slug(doc.headings[parent_idx].title)}"
 
         keywords = _extract_keywords(section_content)
 
@@ -156,12 +137,12 @@ def _index_sections(
 
 
 def _index_functions(
-    content: str,
+    doc: DocText,
     source_file: str,
 ) -> Dict[str, Dict[str, Any]]:
     """Extract Pine Script function references from documentation content."""
     functions: Dict[str, Dict[str, Any]] = {}
-    content_bytes = content.encode("utf-8")
+    content = doc.content
 
     # Look for function documentation patterns:
     # - Headings that match function names (e.g. "## ta.sma")
@@ -171,16 +152,13 @@ def _index_functions(
     # Pattern 1: Headings that look like function names
     for m in re.finditer(r"^#{2,4}\s+((?:[a-z]\w*\.)?[a-z_]\w*)\s*(?:\(|$)", content, re.MULTILINE):
         func_name = m.group(1)
-        byte_start = len(content[:m.start()].encode("utf-8"))
+        byte_start = doc.byte_at(m.start())
 
         # Find the end of this function's section
-        next_heading = re.search(r"^#{2,4}\s+", content[m.end():], re.MULTILINE)
-        if next_heading:
-            byte_end = len(content[:m.end() + next_heading.start()].encode("utf-8"))
-        else:
-            byte_end = len(content_bytes)
+        next_heading = doc.next_subheading(m.end())
+        byte_end = doc.byte_at(next_heading) if next_heading is not None else len(doc.data)
 
-        section = content_bytes[byte_start:byte_end].decode("utf-8", errors="replace")
+        section = doc.text(byte_start, byte_end)
 
         # Extract namespace
         ns_match = _NAMESPACE_RE.match(func_name)
@@ -227,7 +205,7 @@ def _index_functions(
                 if ns in NAMESPACES:
                     func_id = f"fn/{func_name}"
                     if func_id not in functions:
-                        byte_start = len(content[:code_match.start()].encode("utf-8"))
+                        byte_start = doc.byte_at(code_match.start())
                         functions[func_id] = asdict(FunctionDoc(
                             name=func_name,
                             signature=f"{func_name}()",
@@ -242,32 +220,29 @@ def _index_functions(
 
 
 def _index_examples(
-    content: str,
+    doc: DocText,
     source_file: str,
     category: str,
 ) -> Dict[str, Dict[str, Any]]:
     """Extract all code examples with byte offsets."""
     examples: Dict[str, Dict[str, Any]] = {}
-    content_bytes = content.encode("utf-8")
+    content = doc.content
 
     # Find parent section for each code block
     current_section = "root"
-    heading_positions = list(_HEADING_RE.finditer(content))
 
     for i, m in enumerate(_CODE_BLOCK_RE.finditer(content)):
         lang = m.group(1).lower()
         if lang not in ("pine", "pinescript", ""):
             continue
 
-        byte_start = len(content[:m.start()].encode("utf-8"))
+        byte_start = doc.byte_at(m.start())
         byte_length = len(m.group(0).encode("utf-8"))
 
         # Find parent section
-        code_pos = m.start()
-        for hm in reversed(heading_positions):
-            if hm.start() < code_pos:
-                current_section = _slug(hm.group(2).strip())
-                break
+        hm = doc.heading_before(m.start())
+        if hm:
+            current_section = _slug(hm.group(2).strip())
 
         example_id = f"ex/{category}/{current_section}-{i}"
 
@@ -289,11 +264,47 @@ def _index_examples(
     return examples
 
 
-def build_index(raw_dir: Path) -> Index:
+def _index_file(md_file: Path, raw_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """Parse one markdown file into its sections, functions and examples."""
+    content = md_file.read_text(encoding="utf-8")
+    rel_path = str(md_file.relative_to(raw_dir.parent.parent))  # relative to skill root
+    category = _category_from_path(md_file.name)
+    doc = DocText(content)
+    return {
+        "sections": _index_sections(doc, rel_path, category),
+        "functions": _index_functions(doc, rel_path),
+        "examples": _index_examples(doc, rel_path, category),
+    }
+
+
+def _map_files(parse: Callable[..., Any], items: List[Tuple[Any, ...]], jobs: int) -> List[Any]:
+    """Apply ``parse`` to each argument tuple; results come back in input order.
+
+    With ``jobs`` > 1 (0 = one per CPU) the calls run in a process pool.
+    build_index reduces the results in order, so the index is identical
+    to a serial build.
+    """
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs > 1 and len(items) > 1:
+        workers = min(jobs, len(items))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(parse, *zip(*items),
+                                 chunksize=max(1, len(items) // (workers * 4))))
+    return [parse(*args) for args in items]
+
+
+def source_files(raw_dir: Path) -> List[Path]:
+    """Every raw doc build_index reads (polled by the MCP server's watcher)."""
+    return sorted(raw_dir.glob("*.md"))
+
+
+def build_index(raw_dir: Path, jobs: int = 1) -> Index:
     """Build a complete search index from all cached markdown files.
 
     Args:
         raw_dir: Directory containing scraped .md files.
+        jobs: Worker processes for per-file parsing (1 = serial, 0 = per CPU).
 
     Returns:
         Populated Index object.
@@ -303,33 +314,21 @@ def build_index(raw_dir: Path) -> Index:
     all_types: Dict[str, Any] = {}
     all_examples: Dict[str, Any] = {}
 
-    md_files = sorted(raw_dir.glob("*.md"))
+    md_files = source_files(raw_dir)
     if not md_files:
         raise FileNotFoundError(f"No markdown files found in {raw_dir}")
 
-    for md_file in md_files:
-        if md_file.name.startswith("_"):
-            continue  # Skip manifest
-
-        content = md_file.read_text(encoding="utf-8")
-        rel_path = str(md_file.relative_to(raw_dir.parent.parent))  # relative to skill root
-        category = _category_from_path(md_file.name)
-
-        # Index sections
-        sections = _index_sections(content, rel_path, category)
-        all_sections.update(sections)
-
-        # Index functions
-        functions = _index_functions(content, rel_path)
-        all_functions.update(functions)
-
-        # Index code examples
-        examples = _index_examples(content, rel_path, category)
-        all_examples.update(examples)
+    # Skip the manifest (_*.md)
+    items = [(md_file, raw_dir) for md_file in md_files if not md_file.name.startswith("_")]
+    # Later files win on duplicate IDs, as in a serial build
+    for frag in _map_files(_index_file, items, jobs):
+        all_sections.update(frag["sections"])
+        all_functions.update(frag["functions"])
+        all_examples.update(frag["examples"])
 
     # Compute source hash for freshness checks
     source_hash = hashlib.sha256()
-    for md_file in sorted(raw_dir.glob("*.md")):
+    for md_file in source_files(raw_dir):
         source_hash.update(md_file.read_bytes())
 
     stats = {
@@ -356,6 +355,6 @@ def build_index(raw_dir: Path) -> Index:
 def check_index_freshness(index: Index, raw_dir: Path) -> bool:
     """Check if the index matches the current source files."""
     current_hash = hashlib.sha256()
-    for md_file in sorted(raw_dir.glob("*.md")):
+    for md_file in source_files(raw_dir):
         current_hash.update(md_file.read_bytes())
     return index.source_hash == current_hash.hexdigest()[:16]